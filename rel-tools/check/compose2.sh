@@ -54,3 +54,33 @@ test003 () {
 }
 
 test003
+
+test004 () {
+    setup $FUNCNAME
+    printf 'id\tnum\n2\tII\n1\tI\n2\tzwei\n3\tIII\n1\teins\n' > "$DIR/num"
+    printf 'id\tcol\n1\tred\n2\tblue\n2\tgreen\n4\tx\n' > "$DIR/col"
+    ./rel-compose2 "$DIR/num" "$DIR/col" \
+	       1> "$DIR/tsv" \
+	       2> "$DIR/err" &&
+    ./rel-compose2 --partitions=3 "$DIR/num" "$DIR/col" \
+	       1> "$DIR/out" \
+	       2>> "$DIR/err"
+    test $? = 0 -a -s "$DIR/out" -a ! -s "$DIR/err" &&
+	cmp --quiet "$DIR/out" "$DIR/tsv"
+    report "--partitions=3"
+    cleanup
+}
+
+test004
+
+test005 () {
+    setup $FUNCNAME
+    ./rel-compose2 --partitions=0 check/tau.tsv check/tau.tsv \
+	       1> "$DIR/out" \
+	       2> "$DIR/err"
+    test $? = 2 -a ! -s "$DIR/out" -a -s "$DIR/err"
+    report "--partitions=0 fails as usage"
+    cleanup
+}
+
+test005
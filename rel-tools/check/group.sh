@@ -0,0 +1,85 @@
+#! /bin/bash
+
+# a rel-tools/check/ test script
+# - call in rel-tools
+# - scratch rel-tools/tmp/
+
+source check/libtest.sh
+
+TOPIC="${0##*/}"
+TOPIC="${TOPIC%.sh}"
+
+test001 () {
+    setup $FUNCNAME
+    ./rel-group --help \
+	       1> "$DIR/out" \
+	       2> "$DIR/err"
+    test $? = 0 -a -s "$DIR/out" -a ! -s "$DIR/err"
+    report "--help"
+    cleanup
+}
+
+test001
+
+test002 () {
+    setup $FUNCNAME
+    ./rel-group --field=mean --count=ct check/luku8.tsv \
+	       1> "$DIR/out" \
+	       2> "$DIR/err"
+    ./rel-keepc --field=mean --count=ct check/luku8.tsv \
+	       1> "$DIR/exp" \
+	       2>> "$DIR/err"
+    test $? = 0 -a ! -s "$DIR/err" &&
+	./rel-cmp --quiet --eq "$DIR/out" "$DIR/exp"
+    report "count as rel-keepc"
+    cleanup
+}
+
+test002
+
+test003 () {
+    setup $FUNCNAME
+    {
+	echo "word	mean"
+	for k in $(seq 1 2000) ; do
+	    echo "w$((k % 300))	$((k % 7 - 3))"
+	done
+    } > "$DIR/in"
+    ./rel-group --field=word --count=ct \
+		--sum=mean --min=mean --max=mean \
+		"$DIR/in" \
+		1> "$DIR/out" \
+		2> "$DIR/err"
+    ./rel-group --field=word --count=ct \
+		--sum=mean --min=mean --max=mean \
+		--memory=4K \
+		"$DIR/in" \
+		1> "$DIR/spill" \
+		2>> "$DIR/err"
+    test $? = 0 -a ! -s "$DIR/err" &&
+	./rel-cmp --quiet --eq "$DIR/out" "$DIR/spill" &&
+	./rel-group --field=word --count=ct \
+		    --sum=mean --min=mean --max=mean \
+		    --memory=0 \
+		    "$DIR/in" \
+		    1> "$DIR/zero" \
+		    2>> "$DIR/err" &&
+	test ! -s "$DIR/err" &&
+	./rel-cmp --quiet --eq "$DIR/out" "$DIR/zero"
+    report "aggregates the same when spilled"
+    cleanup
+}
+
+test003
+
+test004 () {
+    setup $FUNCNAME
+    ./rel-group --field=word --sum=word check/luku8.tsv \
+	       1> "$DIR/out" \
+	       2> "$DIR/err"
+    test $? = 1 -a -s "$DIR/err"
+    report "not a number fails"
+    cleanup
+}
+
+test004
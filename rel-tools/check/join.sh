@@ -50,3 +50,137 @@ test003 () {
 }
 
 test003
+
+test004 () {
+    setup $FUNCNAME
+    printf 'id\tnum\n2\tII\n1\tI\n2\tzwei\n3\tIII\n1\teins\n' > "$DIR/num"
+    ./rel-join --hash-size=0 "$DIR/num" check/note.tsv \
+	       1> "$DIR/merge" \
+	       2> "$DIR/err" &&
+    ./rel-join --hash --sorted --cache 1 "$DIR/num" check/note.tsv \
+	       1> "$DIR/out" \
+	       2>> "$DIR/err" &&
+    cat check/note.tsv |
+    ./rel-join --hash --sorted --cache 1 "$DIR/num" \
+	       1> "$DIR/out2" \
+	       2>> "$DIR/err"
+    test $? = 0 -a -s "$DIR/out" -a ! -s "$DIR/err" &&
+	cmp --quiet "$DIR/out" "$DIR/merge" &&
+	cmp --quiet "$DIR/out2" "$DIR/merge"
+    report "--hash --sorted, same as sorting join"
+    cleanup
+}
+
+test004
+
+test005 () {
+    setup $FUNCNAME
+    printf 'id\tnum\n2\tII\n1\tI\n2\tzwei\n3\tIII\n1\teins\n' > "$DIR/num"
+    ./rel-join check/note.tsv "$DIR/num" \
+	       1> "$DIR/merge" \
+	       2> "$DIR/err" &&
+    ./rel-join --hash-size=16M check/note.tsv "$DIR/num" \
+	       1> "$DIR/out" \
+	       2>> "$DIR/err"
+    test $? = 0 -a -s "$DIR/out" -a ! -s "$DIR/err" &&
+	./rel-cmp --quiet --eq "$DIR/out" "$DIR/merge"
+    report "automatic hash, same records as sorting join"
+    cleanup
+}
+
+test005
+
+test006 () {
+    setup $FUNCNAME
+    printf 'id\tnum\n2\tII\n1\tI\n2\tzwei\n3\tIII\n1\teins\n' > "$DIR/num"
+    printf 'id\tcol\n1\tred\n2\tblue\n2\tgreen\n4\tx\n' > "$DIR/col"
+    ./rel-join --hash-size=0 "$DIR/num" check/note.tsv \
+	       1> "$DIR/two" \
+	       2> "$DIR/err" &&
+    ./rel-join --hash-size=0 "$DIR/two" "$DIR/col" \
+	       1> "$DIR/pairs" \
+	       2>> "$DIR/err" &&
+    ./rel-join --cache 1 "$DIR/num" check/note.tsv "$DIR/col" \
+	       1> "$DIR/out" \
+	       2>> "$DIR/err"
+    test $? = 0 -a -s "$DIR/out" -a ! -s "$DIR/err" &&
+	cmp --quiet "$DIR/out" "$DIR/pairs"
+    report "three files on the same key in one pass, same as in pairs"
+    cleanup
+}
+
+test006
+
+test007 () {
+    setup $FUNCNAME
+    printf 'id\tnum\n2\tII\n1\tI\n2\tzwei\n3\tIII\n1\teins\n' > "$DIR/num"
+    printf 'num\tlang\nI\tla\nII\tla\nzwei\tde\neins\tde\n' > "$DIR/lang"
+    printf 'lang\tname\nla\tLatin\nde\tGerman\n' > "$DIR/name"
+    ./rel-join "$DIR/name" "$DIR/lang" \
+	       1> "$DIR/two" \
+	       2> "$DIR/err" &&
+    ./rel-join "$DIR/two" "$DIR/num" \
+	       1> "$DIR/pairs" \
+	       2>> "$DIR/err" &&
+    ./rel-join "$DIR/num" "$DIR/name" "$DIR/lang" \
+	       1> "$DIR/out" \
+	       2>> "$DIR/err"
+    test $? = 0 -a -s "$DIR/out" -a ! -s "$DIR/err" &&
+	test "$(head -n 1 "$DIR/out")" = "$(printf 'id\tnum\tlang\tname')" &&
+	./rel-cmp --quiet --eq "$DIR/out" "$DIR/pairs"
+    report "three files on different keys, joined in a better order"
+    cleanup
+}
+
+test007
+
+test008 () {
+    setup $FUNCNAME
+    printf 'id\tnum\n2\tII\n1\tI\n2\tzwei\n3\tIII\n1\teins\n' > "$DIR/num"
+    ./rel-join --hash-size=0 "$DIR/num" "$DIR/num" \
+	       1> "$DIR/tsv" \
+	       2> "$DIR/err" &&
+    ./rel-join --hash-size=0 --cache-memory=0 "$DIR/num" "$DIR/num" \
+	       1> "$DIR/out" \
+	       2>> "$DIR/err"
+    test $? = 0 -a -s "$DIR/out" -a ! -s "$DIR/err" &&
+	cmp --quiet "$DIR/out" "$DIR/tsv"
+    report "--cache-memory=0, groups spill"
+    cleanup
+}
+
+test008
+
+test009 () {
+    setup $FUNCNAME
+    printf 'id\tnum\n2\tII\n1\tI\n2\tzwei\n3\tIII\n1\teins\n' > "$DIR/num"
+    printf 'id\tcol\n1\tred\n2\tblue\n2\tgreen\n4\tx\n' > "$DIR/col"
+    ./rel-join --hash-size=0 "$DIR/num" "$DIR/col" \
+	       1> "$DIR/tsv" \
+	       2> "$DIR/err" &&
+    ./rel-join --hash-size=0 --partitions=3 "$DIR/num" "$DIR/col" \
+	       1> "$DIR/out" \
+	       2>> "$DIR/err" &&
+    ./rel-join --hash-size=0 --partitions=3 --sorted "$DIR/num" "$DIR/col" \
+	       1> "$DIR/merged" \
+	       2>> "$DIR/err"
+    test $? = 0 -a -s "$DIR/out" -a ! -s "$DIR/err" &&
+	./rel-cmp --quiet --eq "$DIR/out" "$DIR/tsv" &&
+	cmp --quiet "$DIR/merged" "$DIR/tsv"
+    report "--partitions=3, concatenated or merged"
+    cleanup
+}
+
+test009
+
+test010 () {
+    setup $FUNCNAME
+    ./rel-join --partitions=0 check/tau.tsv check/tau.tsv \
+	       1> "$DIR/out" \
+	       2> "$DIR/err"
+    test $? = 2 -a ! -s "$DIR/out" -a -s "$DIR/err"
+    report "--partitions=0 fails as usage"
+    cleanup
+}
+
+test010
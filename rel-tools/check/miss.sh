@@ -59,3 +59,22 @@ test004 () {
 }
 
 test004
+
+test005 () {
+    setup $FUNCNAME
+    printf 'id\tnum\n2\tII\n1\tI\n2\tzwei\n3\tIII\n1\teins\n' > "$DIR/num"
+    printf 'id\tcol\n1\tred\n2\tblue\n2\tgreen\n4\tx\n' > "$DIR/col"
+    ./rel-miss "$DIR/num" "$DIR/col" \
+	       1> "$DIR/tsv" \
+	       2> "$DIR/err" &&
+    ./rel-miss --key-memory=0 "$DIR/num" "$DIR/col" \
+	       1> "$DIR/out" \
+	       2>> "$DIR/err"
+    test $? = 0 -a -s "$DIR/out" -a ! -s "$DIR/err" &&
+	test "$(wc -l < "$DIR/out")" = 2 &&
+	./rel-cmp --quiet --eq "$DIR/out" "$DIR/tsv"
+    report "--key-memory=0, Bloom filter and verification"
+    cleanup
+}
+
+test005
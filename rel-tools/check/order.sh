@@ -46,3 +46,25 @@ test003 () {
 }
 
 test003
+
+test004 () {
+    setup $FUNCNAME
+    printf '#order\ta\tb\na\tb\n1\t2\n1\t2\n1\t3\n' > "$DIR/inp"
+    printf '1\t2\n1\t3\n' > "$DIR/exp"
+    python3 -c '
+import sys
+from librel.data import readhead, records
+ins = open(sys.argv[1], "rb")
+head = readhead(ins)
+for r in records(ins, head = head, unique = True):
+    print(*(f.decode("UTF-8") for f in r), sep = "\t")
+' "$DIR/inp" \
+	       1> "$DIR/out" \
+	       2> "$DIR/err"
+    test $? = 0 -a ! -s "$DIR/err" &&
+	cmp --quiet "$DIR/out" "$DIR/exp"
+    report "declared order, unique records without key"
+    cleanup
+}
+
+test004
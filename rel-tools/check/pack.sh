@@ -0,0 +1,74 @@
+#! /bin/bash
+
+# a rel-tools/check/ test script
+# - call in rel-tools
+# - scratch rel-tools/tmp/
+
+source check/libtest.sh
+
+TOPIC="${0##*/}"
+TOPIC="${TOPIC%.sh}"
+
+test001 () {
+    setup $FUNCNAME
+    for name in tau dee dum
+    do
+	./rel-sort --pack check/$name.tsv \
+		   1> "$DIR/$name.pack" \
+		   2>> "$DIR/err" &&
+	./rel-cmp --quiet --eq "$DIR/$name.pack" check/$name.tsv ||
+	    break
+    done
+    test $? = 0 -a -s "$DIR/tau.pack" -a ! -s "$DIR/err" &&
+	test "$(head -c 10 "$DIR/tau.pack" | tr -d '\0')" = 'rel-pack '
+    report "--pack, read back, tau dee dum"
+    cleanup
+}
+
+test001
+
+test002 () {
+    setup $FUNCNAME
+    ./rel-join check/word.tsv check/note.tsv \
+	       1> "$DIR/tsv" \
+	       2> "$DIR/err" &&
+    ./rel-sort --pack check/word.tsv --out "$DIR/word" \
+	       2>> "$DIR/err" &&
+    ./rel-sort --pack check/note.tsv --out "$DIR/note" \
+	       2>> "$DIR/err" &&
+    ./rel-join --pack "$DIR/word" "$DIR/note" \
+	       1> "$DIR/out" \
+	       2>> "$DIR/err" &&
+    ./rel-keep --field=word,id,note "$DIR/out" \
+	       1> "$DIR/back" \
+	       2>> "$DIR/err"
+    test $? = 0 -a -s "$DIR/back" -a ! -s "$DIR/err" &&
+	./rel-cmp --quiet --eq "$DIR/back" "$DIR/tsv"
+    report "join packed to packed, same records"
+    cleanup
+}
+
+test002
+
+test003 () {
+    setup $FUNCNAME
+    ./rel-join check/word.tsv check/note.tsv \
+	       1> "$DIR/tsv" \
+	       2> "$DIR/err" &&
+    ./rel-sort --pack check/word.tsv 2>> "$DIR/err" |
+	./rel-join --pack check/note.tsv 2>> "$DIR/err" |
+	./rel-keep --field=word,id,note \
+		   1> "$DIR/back" \
+		   2>> "$DIR/err" &&
+    ./rel-sort check/tau.tsv 2>> "$DIR/err" |
+	./rel-keep --field=tau,pi,pos \
+		   1> "$DIR/tau" \
+		   2>> "$DIR/err"
+    test $? = 0 -a -s "$DIR/back" -a ! -s "$DIR/err" &&
+	./rel-cmp --quiet --eq "$DIR/back" "$DIR/tsv" &&
+	./rel-cmp --quiet --eq "$DIR/tau" check/tau.tsv
+    report "packed and TSV in pipes, same records"
+    cleanup
+}
+
+test003
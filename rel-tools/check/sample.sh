@@ -59,3 +59,54 @@ test004 () {
 }
 
 test004
+
+test005 () {
+    setup $FUNCNAME
+    ./rel-sample --records=3 --seed=rel --positions=at check/tau.tsv \
+	       1> "$DIR/out" \
+	       2> "$DIR/err" &&
+    ./rel-sample --records=3 --seed=rel --positions=at check/tau.tsv \
+	       1> "$DIR/again" \
+	       2>> "$DIR/err" &&
+    ./rel-drop --field=at "$DIR/out" \
+	       1> "$DIR/sans" \
+	       2>> "$DIR/err"
+    test $? = 0 -a -s "$DIR/out" -a ! -s "$DIR/err" &&
+	cmp --quiet "$DIR/out" "$DIR/again" &&
+	test "$(head -n 1 "$DIR/out")" = "$(printf 'pi\ttau\tpos\tat')" &&
+	test "$(wc -l < "$DIR/out")" = 4 &&
+	./rel-cmp --quiet --lt "$DIR/sans" check/tau.tsv &&
+	awk -F '\t' 'NR > 1 { print $3, 1 - $4 }' "$DIR/out" |
+	    while read pos at; do test "$pos" = "$at" || exit 1; done
+    report "--seed repeats, --positions"
+    cleanup
+}
+
+test005
+
+test006 () {
+    setup $FUNCNAME
+    ./rel-sample --records=2 --weight=pos --positions=at check/tau.tsv \
+	       1> "$DIR/out" \
+	       2> "$DIR/err"
+    test $? = 0 -a -s "$DIR/out" -a ! -s "$DIR/err" &&
+	test "$(wc -l < "$DIR/out")" = 1
+    report "--weight, no positive weights"
+    cleanup
+}
+
+test006
+
+test007 () {
+    setup $FUNCNAME
+    ./rel-sample --records=3 --weight=pi check/tau.tsv \
+	       1> "$DIR/out" \
+	       2> "$DIR/err"
+    test $? = 0 -a -s "$DIR/out" -a ! -s "$DIR/err" &&
+	test "$(wc -l < "$DIR/out")" = 4 &&
+	./rel-cmp --quiet --lt "$DIR/out" check/tau.tsv
+    report "--weight=pi"
+    cleanup
+}
+
+test007
@@ -46,3 +46,48 @@ test003 () {
 }
 
 test003
+
+test004 () {
+    setup $FUNCNAME
+    ./rel-sort --sort=gnu --field=tau check/tau.tsv \
+	       1> "$DIR/gnu" \
+	       2> "$DIR/err" &&
+    ./rel-sort --sort=python --sort-memory=1 --sort-dir="$DIR" \
+	       --field=tau check/tau.tsv \
+	       1> "$DIR/out" \
+	       2>> "$DIR/err"
+    test $? = 0 -a -s "$DIR/out" -a ! -s "$DIR/err" &&
+	cmp --quiet "$DIR/out" "$DIR/gnu" &&
+	test -z "$(ls "$DIR" | grep '^sort-')"
+    report "--sort=python spilling, same as gnu"
+    cleanup
+}
+
+test004
+
+test005 () {
+    setup $FUNCNAME
+    ./rel-sort --mark-order --field=pos,pi check/tau.tsv \
+	       1> "$DIR/out" \
+	       2> "$DIR/err"
+    test $? = 0 -a -s "$DIR/out" -a ! -s "$DIR/err" &&
+	test "$(head -n 1 "$DIR/out")" = "$(printf '#order\tpos\tpi')" &&
+	./rel-cmp --quiet --eq "$DIR/out" check/tau.tsv
+    report "--mark-order"
+    cleanup
+}
+
+test005
+
+test006 () {
+    setup $FUNCNAME
+    printf '#order\tpi\npi\ttau\n3\t6\n1\t2\n' > "$DIR/lie"
+    ./rel-sort --field=pi "$DIR/lie" \
+	       1> "$DIR/out" \
+	       2> "$DIR/err"
+    test $? = 1 -a -s "$DIR/err"
+    report "order declared falsely"
+    cleanup
+}
+
+test006
@@ -35,3 +35,25 @@ test002 () {
 }
 
 test002
+
+test003 () {
+    setup $FUNCNAME
+    for name in number numero luku3
+    do
+	./rel-sort --mark-order check/$name.tsv \
+		   1> "$DIR/$name" \
+		   2>> "$DIR/err"
+    done
+    ./rel-union check/number.tsv check/numero.tsv check/luku3.tsv \
+	       1> "$DIR/tsv" \
+	       2>> "$DIR/err" &&
+    ./rel-union "$DIR/number" "$DIR/numero" "$DIR/luku3" \
+	       1> "$DIR/out" \
+	       2>> "$DIR/err"
+    test $? = 0 -a -s "$DIR/out" -a ! -s "$DIR/err" &&
+	cmp --quiet "$DIR/out" "$DIR/tsv"
+    report "three files declared sorted, merged"
+    cleanup
+}
+
+test003
@@ -12,6 +12,8 @@ import os, sys, traceback
 
 from .bad import BadData, BadCode
 from .datasum import sumfile
+from .extsort import size
+from .packed import unpacked, packing
 
 VERSION = '0.1.3 (2020-05-12)'
 
@@ -99,6 +101,15 @@ def transput_args(*, description, inplace = True,
 
                        ''')
 
+    parser.add_argument('--pack', action = 'store_true',
+                        help = '''
+
+                        write output as a packed relation, a binary
+                        container that any rel tool reads from a file
+                        as if it were TSV
+
+                        ''')
+
     parser.add_argument('--version',
                         action = 'version',
                         version = '%(prog)s: FIN-CLARIN rel tools {}'
@@ -106,6 +117,81 @@ def transput_args(*, description, inplace = True,
 
     return parser
 
+def sort_args(parser):
+    '''Add options to parser to select and configure the sort that the
+    tool uses (see extsort). The options are passed on to the sort as
+    environment variables, by transput.
+
+    '''
+
+    parser.add_argument('--sort', choices = [ 'gnu', 'python' ],
+                        help = '''
+
+                        sort with GNU sort in a subprocess or with an
+                        external merge sort in Python (default from
+                        REL_SORT or gnu)
+
+                        ''')
+    parser.add_argument('--sort-memory', metavar = 'size',
+                        dest = 'sort_memory', type = sortsize,
+                        help = '''
+
+                        memory budget of a Python sort in bytes, or
+                        with a K, M, or G suffix, before sorted runs
+                        spill to files (default from REL_SORT_MEMORY
+                        or 256M)
+
+                        ''')
+    parser.add_argument('--sort-dir', metavar = 'dir',
+                        dest = 'sort_dir',
+                        help = '''
+
+                        directory of spill files of a Python sort
+                        (default from REL_SORT_DIR or the usual
+                        temporary directory)
+
+                        ''')
+
+def order_args(parser):
+    '''Add --mark-order to parser, for a tool that knows its output to be
+    sorted on some fields.
+
+    '''
+
+    parser.add_argument('--mark-order', dest = 'mark_order',
+                        action = 'store_true',
+                        help = '''
+
+                        precede the head of the output with a line
+                        that declares the fields that the records
+                        are sorted on, so that the next rel tool need
+                        not sort them again
+
+                        ''')
+
+def sortsize(arg):
+    '''Argument type for --sort-memory: a number of bytes, optionally
+    with a K, M, or G suffix.
+
+    '''
+    try:
+        size(arg)
+    except ValueError:
+        raise ArgumentTypeError('not a size: {}'.format(arg))
+    return arg
+
+def positive(arg):
+    '''Argument type for --partitions: a positive integer.
+
+    '''
+    try:
+        value = int(arg)
+    except ValueError:
+        raise ArgumentTypeError('not an integer: {}'.format(arg))
+    if value < 1:
+        raise ArgumentTypeError('not positive: {}'.format(arg))
+    return value
+
 def bakfix(arg):
     '''Argument type for --backup: argument must be a valid and proper and
     safe suffix to a filename.
@@ -154,16 +240,23 @@ def inputstream(infile):
         # .detach() appears to be the magic that allows to
         # read the first line and pass on the rest to a
         # subprocess (buffering could not even be disabled)
-        return sys.stdin.buffer.detach()
+        return unpacked(sys.stdin.buffer.detach())
 
     # .detach() appears to allow to read the first line and
     # pass on the rest to a subprocess (disabling buffering
     # seemed to also work or was anything even needed)
-    return open(infile, mode = 'br').detach()
+    return unpacked(open(infile, mode = 'br').detach())
+
+def outputstream(outfile, *, pack = False):
+    if outfile is None:
+        ous = sys.stdout.buffer
+    else:
+        ous = open(outfile, mode = 'bw')
+
+    if pack:
+        return packing(ous, own = outfile is not None)
 
-def outputstream(outfile):
-    if outfile is None: return sys.stdout.buffer
-    return open(outfile, mode = 'bw')
+    return ous
 
 def transput(args, main, *,
              summing = False,
@@ -189,6 +282,12 @@ def transput(args, main, *,
               file = sys.stderr)
         exit(1)
 
+    for option, variable in (('sort', 'REL_SORT'),
+                             ('sort_memory', 'REL_SORT_MEMORY'),
+                             ('sort_dir', 'REL_SORT_DIR')):
+        if getattr(args, option, None) is not None:
+            os.environ[variable] = getattr(args, option)
+
     if args.backup is not None:
         backfile = infile + args.backup
     else:
@@ -235,13 +334,15 @@ def transput(args, main, *,
     else:
         temp = None
 
+    pack = getattr(args, 'pack', False)
+
     status = 1
     tmpsum = None
     try:
         if joining or matching:
             with inputstream(infile) as ins1, \
                  inputstream(args.inf2) as ins2, \
-                 outputstream(temp) as ous:
+                 outputstream(temp, pack = pack) as ous:
                 status = main(args, ins1, ins2, ous)
 
         elif summing:
@@ -252,12 +353,12 @@ def transput(args, main, *,
                                  tag = args.tag)
 
             with inputstream(tmpsum) as ins, \
-                 outputstream(temp) as ous:
+                 outputstream(temp, pack = pack) as ous:
                 status = main(args, ins, ous)
 
         else:
             with inputstream(infile) as ins, \
-                 outputstream(temp) as ous:
+                 outputstream(temp, pack = pack) as ous:
                 status = main(args, ins, ous)
 
     except BadData as exn:
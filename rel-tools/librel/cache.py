@@ -5,51 +5,116 @@ join-family operations, using backing store (aka a temporary file) to
 hold remaining records when the group is too large for the in-memory
 cache.
 
+The backing store is written in blocks of records, each block the
+records as tab-separated fields, separated by newlines, and is memory
+mapped for iteration. Since the positions of the blocks are kept in
+memory, each iteration over the cache only slices and splits the
+blocks from the map, instead of opening and reading the file again
+line by line.
+
 '''
 
-from itertools import islice
+from itertools import chain
+from mmap import mmap, ACCESS_READ
 from tempfile import mkstemp
 
 import os
 
-from .data import records
+# default byte budget of the in-memory part of a cache
+BUDGET = 1 << 26
+
+# rough estimate of the memory of a record, and of a field, beyond
+# the bytes of the fields
+RECORD = 64
+FIELD = 40
+
+# size of a block of records in the backing store, in bytes
+BLOCK = 1 << 16
 
 class Cache():
 
     '''Provides an iterable cache of a group rel-tools records that also
     knows its length (number of records currently in the cache).
 
-    Creates a temp file if cache limit is exceeded. Reuses the same
-    temp file. The release() method removes the temp file when the
-    cache is no longer needed.
+    Keeps records in memory up to the limit (number of records, or None
+    for no limit) and the budget (estimated bytes). Creates a temp file
+    if either is exceeded. Reuses the same temp file. The release()
+    method removes the temp file when the cache is no longer needed.
 
     Warning! Existing iterators over the cache become invalid when a
     new group is cached. Best not to keep iterators around.
 
     '''
 
-    def __init__(self, limit, *, head):
+    def __init__(self, limit, *, head, budget = BUDGET):
         self._head_ = head
         self._limit_ = limit
+        self._budget_ = budget
         self._cache_ = []
         self._store_ = None
+        self._map_ = None
+        self._blocks_ = [] # (start, end, count) in store
         self._count_ = None # no group yet
 
     def cache(self, group):
-        self._cache_[:] = islice(group, self._limit_)
-        self._count_ = len(self._cache_)
-        if self._count_ < self._limit_:
+        self._unmap()
+        self._cache_[:] = ()
+        self._blocks_[:] = ()
+
+        group = iter(group)
+        held = 0
+        for r in group:
+            if (self._limit_ is not None and
+                len(self._cache_) >= self._limit_ or
+                held > self._budget_):
+                group = chain([r], group)
+                break
+            self._cache_.append(r)
+            held += RECORD + FIELD * len(r) + sum(map(len, r))
+        else:
+            self._count_ = len(self._cache_)
             return
 
+        self._count_ = len(self._cache_)
+
         if self._store_ is None:
             fd, self._store_ = mkstemp(prefix = 'cache-', suffix = '.tmp')
             os.close(fd)
 
+        at = 0
         with open(self._store_, 'wb') as ous:
+            lines, size = [], 0
             for r in group:
-                ous.write(b'\t'.join(r))
-                ous.write(b'\n')
-                self._count_ += 1
+                line = b'\t'.join(r)
+                lines.append(line)
+                size += len(line) + 1
+                if size >= BLOCK:
+                    at = self._block(ous, at, lines)
+                    lines, size = [], 0
+            if lines:
+                at = self._block(ous, at, lines)
+
+        if at:
+            with open(self._store_, 'rb') as ins:
+                self._map_ = mmap(ins.fileno(), 0, access = ACCESS_READ)
+
+    def _block(self, ous, at, lines):
+        '''Write the lines to ous at at as a block, note the block, and
+        return the position after the block.
+
+        '''
+
+        data = b'\n'.join(lines)
+        ous.write(data)
+        ous.write(b'\n')
+        self._blocks_.append((at, at + len(data), len(lines)))
+        self._count_ += len(lines)
+        return at + len(data) + 1
+
+    def _unmap(self):
+        if self._map_ is not None:
+            self._map_.close()
+            self._map_ = None
 
     def __len__(self):
         if self._count_ is None:
@@ -62,13 +127,24 @@ class Cache():
 
         def it():
             yield from self._cache_
-            if self._count_ < self._limit_: return
-            yield from records(open(self._store_, 'rb'), head = self._head_)
+            if not self._blocks_: return
+            mm = self._map_
+            for start, end, count in self._blocks_:
+                if self._head_:
+                    for line in mm[start:end].split(b'\n'):
+                        yield line.split(b'\t')
+                else:
+                    # empty records, as of dee
+                    for k in range(count):
+                        yield []
 
         return it()
 
     def release(self):
+        self._unmap()
         if self._store_ is not None:
             os.remove(self._store_)
+            self._store_ = None
         self._cache_[:] = ()
+        self._blocks_[:] = ()
         self._count_ = None
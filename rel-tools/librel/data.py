@@ -1,7 +1,8 @@
 '''Support library for rel-tools (relation tools).
 
 Heavily relies on GNU sort, or possibly another implementation of
-sort(1) that has the same options -- are they Posix?
+sort(1) that has the same options -- are they Posix? Or, when so
+selected, on an external merge sort in Python (see extsort).
 
 '''
 
@@ -9,12 +10,17 @@ from itertools import groupby
 from operator import itemgetter
 from subprocess import Popen, PIPE
 
-import os
+import io, os
 
 from .bad import BadData
+from .extsort import method, sortedrecords
 from .names import checknames
 from .bins import SORT
 
+# first word of an optional line before the head that names the fields
+# that the records are sorted on
+ORDER = b'#order'
+
 def record(line):
     '''Split a tab-separated (binary) line into its fields.'''
 
@@ -49,6 +55,9 @@ def records(ins, *, head, unique = False, key = ()):
     Optionally sort the input by key fields.
     The key is specified as a tuple of 0-based indices.
 
+    Sort with GNU sort in a subprocess, or in Python when REL_SORT
+    is python (see extsort).
+
     '''
 
     if head is not None and len(head) == 0:
@@ -59,6 +68,21 @@ def records(ins, *, head, unique = False, key = ()):
     if not unique and not key:
         return (record(line) for line in ins)
 
+    if issorted(ins, head, key):
+        # as declared, or from a packed relation, checked on the way
+        data = verified((record(line) for line in buffered(ins)),
+                        head = head, key = key)
+        if unique:
+            same = getter(key) if key else None
+            return (next(group) for k, group in groupby(data, key = same))
+        return data
+
+    if method() == 'python':
+        return sortedrecords(buffered(ins),
+                             split = record,
+                             key = key and getter(key),
+                             unique = unique)
+
     options = []
     options.append('--unique' if unique else '--stable')
     if key:
@@ -76,6 +100,55 @@ def records(ins, *, head, unique = False, key = ()):
 
     return (record(line) for line in proc.stdout)
 
+def buffered(ins):
+    '''Return binary stream ins, in a buffer if it is a raw stream, to
+    read the rest of it in Python.
+
+    '''
+
+    return io.BufferedReader(ins) if isinstance(ins, io.RawIOBase) else ins
+
+def issorted(ins, head, key):
+    '''Whether the records in ins are known to be sorted on the key (or
+    on all fields when no key), as ins tells in its order attribute.
+
+    '''
+
+    order = getattr(ins, 'order', None)
+    if order is None or head is None:
+        return False
+
+    names = tuple(head[k] for k in key) if key else tuple(head)
+    return order[:len(names)] == names
+
+def verified(data, *, head, key):
+    '''Generate the records in data, raising an exception if they turn
+    out not to be sorted on the key (or on all fields when no key) as
+    they were declared to be.
+
+    '''
+
+    get = getter(key) if key else tuple
+    prev = None
+    for r in data:
+        this = get(r)
+        if prev is not None and this < prev:
+            names = [ head[k] for k in key ] if key else head
+            raise BadData('not sorted as declared on: ' +
+                          b' '.join(names).decode('UTF-8'))
+        prev = this
+        yield r
+
+def markorder(ous, names):
+    '''Write to ous the line that declares the records, after the head
+    that is written next, to be sorted on the named fields, so that a
+    tool that reads them need not sort them again on those fields.
+
+    '''
+
+    ous.write(b'\t'.join((ORDER, *names)))
+    ous.write(b'\n')
+
 def empty_records(ins):
     for line in ins:
         line = line.rstrip(b'\r\n')
@@ -99,13 +172,19 @@ def groups(ins, *, head, key):
 
 def readhead(ins, *, old = (), new = ()):
     '''Return the assumed-first tab-separated line from binary stream.
-    Raise an exception if the fields are not valid names, or if any of
-    the specified old names is not in the head, or if any of the
-    specified new is in the head.
+    If it is preceded by an order line (see markorder), note the order
+    in an order attribute of the stream. Raise an exception if the
+    fields are not valid names, or if any of the specified old names
+    is not in the head, or if any of the specified new is in the head.
 
     '''
 
     line = next(ins, None)
+    order = None
+    if line is not None and record(line)[0] == ORDER:
+        order = tuple(record(line)[1:])
+        line = next(ins, None)
+
     if line is None:
         raise BadData('no head')
 
@@ -117,6 +196,14 @@ def readhead(ins, *, old = (), new = ()):
         # line.split(b'\t') => [b'']
         head = []
 
+    if order is not None:
+        bad = [name for name in order if name not in head]
+        if bad:
+            raise BadData('order not in head: ' +
+                          b' '.join(bad).decode('UTF-8'))
+        # records will see that the data is sorted
+        ins.order = order
+
     bad = [name for name in old if name not in head]
     if bad:
         raise BadData('not in head: ' + b' '.join(bad).decode('UTF-8'))
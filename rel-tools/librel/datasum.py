@@ -1,9 +1,14 @@
-import os
+from contextlib import ExitStack
+from heapq import merge
+from itertools import chain
 from tempfile import mkstemp
 
+import os
+
 from .args import BadData
-from .data import getter, records, readhead
+from .data import getter, markorder, records, readhead
 from .names import makenames
+from .packed import unpacked
 
 def sumfile(ins1, ins2, *, rest = (), tag):
     '''Concatenate the two or more input relations in a new temp file in
@@ -54,35 +59,54 @@ def sumfile(ins1, ins2, *, rest = (), tag):
 
         return headk
 
-    def append(ins, ous, permute, tk, *, head):
-        '''Append the permuted body from ins to ous with the byte string tk
-        appended to each record as a tag of origin.
+    def tagged(ins, tk, *, head, merging):
+        '''Generate the body from ins, permuted to the order of head1,
+        with the byte string tk appended to each record as a tag of
+        origin. When merging, the body is declared to be sorted on
+        head1 and is checked to be so.
 
         '''
 
-        for r in records(ins, head = head):
-            ous.write(b'\t'.join(permute(r)))
-            head1 and ous.write(b'\t')
-            ous.write(tk)
-            ous.write(b'\n')
+        permute = getter(tuple(map(head.index, head1)))
+        key = tuple(map(head.index, head1)) if merging else ()
+        for r in records(ins, head = head, key = key):
+            r = list(permute(r))
+            r.append(tk)
+            yield r
 
     try:
-        head2 = checkhead(ins2)
-        get1 = getter(tuple(map(head1.index, head1)))
-        get2 = getter(tuple(map(head2.index, head1)))
-        with open(ouf, 'wb') as ous:
-            ous.write(b'\t'.join(head1))
-            head1 and ous.write(b'\t')
-            ous.write(tag)
-            ous.write(b'\n')
-            append(ins1, ous, get1, b'1', head = head1)
-            append(ins2, ous, get2, b'2', head = head2)
-            for k, path in enumerate(rest, start = 3):
-                with open(path, 'rb') as insk:
-                    tk = str(k).encode('UTF-8')
-                    headk = checkhead(insk)
-                    getk = getter(tuple(map(headk.index, head1)))
-                    append(insk, ous, getk, tk, head = headk)
+        with ExitStack() as stack:
+            inputs = [ (ins1, head1), (ins2, checkhead(ins2)) ]
+            for path in rest:
+                insk = stack.enter_context(unpacked(open(path, 'rb')
+                                                    .detach()))
+                inputs.append((insk, checkhead(insk)))
+
+            # when all inputs are declared sorted on head1, as from
+            # rel-sort or rel-union with --mark-order, they are merged
+            # so that the sum is sorted on head1 (and stable)
+            merging = bool(head1) and all(
+                getattr(ins, 'order', None) == tuple(head1)
+                for ins, head in inputs
+            )
+
+            bodies = [
+                tagged(ins, str(k).encode('UTF-8'),
+                       head = head, merging = merging)
+                for k, (ins, head) in enumerate(inputs, start = 1)
+            ]
+
+            with open(ouf, 'wb') as ous:
+                merging and markorder(ous, head1)
+                ous.write(b'\t'.join(head1))
+                head1 and ous.write(b'\t')
+                ous.write(tag)
+                ous.write(b'\n')
+                for r in (merge(*bodies, key = lambda r: r[:-1])
+                          if merging else
+                          chain(*bodies)):
+                    ous.write(b'\t'.join(r))
+                    ous.write(b'\n')
     except Exception:
         os.remove(ouf)
         raise
@@ -0,0 +1,109 @@
+'''Support library for rel tools (relation tools).
+
+External merge sort of records, in Python, as an alternative to
+sorting with GNU sort in a subprocess. Sorted runs that exceed a
+memory budget spill to temp files in a spill directory and are then
+merged with a heap. Comparison is bytewise, as sort(1) does with
+LC_ALL=C, and stable.
+
+Selected and configured with environment variables (which the
+--sort options of some tools set, see args.sort_args):
+
+REL_SORT=python (default gnu) to sort in Python,
+REL_SORT_MEMORY=size (bytes, or with K, M, G suffix) for the budget,
+REL_SORT_DIR=dir for the spill files (default the usual temp dir).
+
+'''
+
+from heapq import merge
+from itertools import groupby
+from tempfile import mkstemp
+
+import os
+
+from .bad import BadData
+from .cache import RECORD, FIELD
+
+def method():
+    '''Return the name of the selected sort method, gnu or python.'''
+
+    name = os.environ.get('REL_SORT', 'gnu')
+    if name not in ('gnu', 'python'):
+        raise BadData('REL_SORT not gnu or python: ' + name)
+    return name
+
+def budget():
+    '''Return the selected memory budget in bytes.'''
+
+    return size(os.environ.get('REL_SORT_MEMORY', '256M'))
+
+def size(arg):
+    '''Return the number of bytes in arg, a non-negative integer with an
+    optional K, M, or G suffix. Raise ValueError if it is not.
+
+    '''
+
+    arg = arg.strip()
+    scale = dict(K = 1 << 10, M = 1 << 20, G = 1 << 30).get(arg[-1:].upper())
+    number = int(arg[:-1] if scale else arg)
+    if number < 0:
+        raise ValueError('negative size')
+    return number * (scale or 1)
+
+def sortedrecords(lines, *, split, key = None, unique = False,
+                  memory = None, spill = None):
+    '''Generate the records from binary lines, as split by split, sorted
+    stably by the key function of a record (default the whole line).
+    With unique, generate only the first record of each run of equal
+    keys. Spill sorted runs to temp files in the spill directory when
+    the records held in memory exceed the memory budget in bytes.
+
+    '''
+
+    memory = budget() if memory is None else memory
+    spill = os.environ.get('REL_SORT_DIR') if spill is None else spill
+    order = key or b'\t'.join
+
+    runs = []
+    try:
+        chunk, held = [], 0
+        for line in lines:
+            record = split(line)
+            chunk.append(record)
+            # the same estimate as in a record cache, and as much
+            # again as a record for the sort key of the record
+            held += 2 * RECORD + FIELD * len(record) + len(line)
+            if held > memory:
+                chunk.sort(key = order)
+                runs.append(_spilled(chunk, spill))
+                chunk, held = [], 0
+
+        chunk.sort(key = order)
+        data = merge(*map(_spilling, runs), chunk, key = order)
+        if unique:
+            data = (next(group) for k, group in groupby(data, key = order))
+
+        yield from data
+    finally:
+        for run in runs:
+            os.remove(run)
+
+def _spilled(chunk, spill):
+    '''Write sorted chunk to a new temp file in the spill directory and
+    return the path to the file.
+
+    '''
+
+    fd, path = mkstemp(prefix = 'sort-', suffix = '.tmp', dir = spill)
+    with open(fd, mode = 'wb') as ous:
+        for record in chunk:
+            ous.write(b'\t'.join(record))
+            ous.write(b'\n')
+    return path
+
+def _spilling(path):
+    '''Generate the records in a spilled run.'''
+
+    with open(path, mode = 'rb') as ins:
+        for line in ins:
+            yield line.rstrip(b'\n').split(b'\t')
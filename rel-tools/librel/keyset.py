@@ -0,0 +1,107 @@
+'''Support library for rel tools (relation tools).
+
+Key set is the set of the key values of the records of a relation, for
+semijoin-family operations (rel-match, rel-miss) to stream the other
+relation unsorted and look up the key of each record. The key values
+are kept in an exact in-memory set as long as they fit in a memory
+budget. Beyond that, all key values are written to a temp file that
+is a relation of the key fields, and what is kept in memory is a
+Bloom filter of them: a key not in the filter is certainly not in the
+relation, while a key in the filter is only a candidate, to be
+verified against the temp file by the usual sort and merge.
+
+'''
+
+from hashlib import blake2b
+from math import ceil, log
+from tempfile import mkstemp
+
+import os
+
+from .data import buffered, getter, readhead, records
+
+# rough estimate of the memory of a key in a set, beyond the bytes of
+# the fields
+KEY = 100
+
+# rate of false positives in a Bloom filter
+RATE = 0.01
+
+def keyset(ins, *, head, key, budget):
+    '''Return the key values of the named key fields of the records in
+    binary stream ins, its head already read, as a set (when they fit
+    the budget in bytes) and None, or as a Bloom filter and the path to
+    a temp file of the key values, with the key names as head.
+
+    '''
+
+    get = getter(tuple(map(head.index, key)))
+    data = (get(r) for r in records(buffered(ins), head = head))
+
+    keys, held = set(), 0
+    for k in data:
+        if k in keys: continue
+        keys.add(k)
+        held += KEY + sum(map(len, k))
+        if held > budget:
+            break
+    else:
+        return keys, None
+
+    fd, path = mkstemp(prefix = 'keys-', suffix = '.tsv.tmp')
+    try:
+        count = len(keys)
+        with open(fd, 'wb') as ous:
+            ous.write(b'\t'.join(key))
+            ous.write(b'\n')
+            for k in keys:
+                ous.write(b'\t'.join(k))
+                ous.write(b'\n')
+            keys.clear()
+            for k in data:
+                ous.write(b'\t'.join(k))
+                ous.write(b'\n')
+                count += 1
+
+        bloom = Bloom(count)
+        with open(path, 'rb') as ins:
+            readhead(ins)
+            for k in records(ins, head = list(key)):
+                bloom.add(tuple(k))
+    except BaseException:
+        os.remove(path)
+        raise
+
+    return bloom, path
+
+class Bloom():
+
+    '''Bloom filter of tuples of bytes, sized for count keys and the
+    RATE of false positives. A key that was added is always in the
+    filter, and a key that was not added is in it only at that rate.
+
+    '''
+
+    def __init__(self, count, *, rate = RATE):
+        count = max(1, count)
+        self._size_ = max(64, ceil(- count * log(rate) / log(2) ** 2))
+        self._hashes_ = max(1, round(self._size_ / count * log(2)))
+        self._bits_ = bytearray((self._size_ + 7) // 8)
+
+    def _positions(self, key):
+        # double hashing, from the two halves of one digest
+        digest = blake2b(b'\t'.join(key), digest_size = 16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        size = self._size_
+        return ((h1 + k * h2) % size for k in range(self._hashes_))
+
+    def add(self, key):
+        bits = self._bits_
+        for at in self._positions(key):
+            bits[at >> 3] |= 1 << (at & 7)
+
+    def __contains__(self, key):
+        bits = self._bits_
+        return all(bits[at >> 3] & (1 << (at & 7))
+                   for at in self._positions(key))
@@ -0,0 +1,365 @@
+'''Support library for rel tools (relation tools).
+
+Packed relation is a binary container of a relation: a magic line,
+blocks of up to BLOCK records, and a footer that tells the head, the
+number of records, and the names of the head fields (a prefix of the
+head) that the records are known to be sorted on. The footer is
+followed by its own length so that it can be found at the end of a
+file. In each block, each field is encoded as a dictionary of the
+distinct values in the block and an array of indices to the
+dictionary, and the block is then compressed with zlib.
+
+A packed relation is written through the write end of a pipe from
+which a thread reads the TSV of a tool and packs it, and read through
+the read end of a pipe to which a thread writes it unpacked as TSV,
+so that tools, and any subprocesses they run, can read and write TSV
+as before. A packed relation is recognized by its magic line. In a
+regular file, the line is read in place. Other input, such as a pipe,
+is read up to where it differs from the magic line: a packed relation
+is then read into a temp file first, because the footer is at the
+end, and anything else is read through yet another pipe, to which a
+thread writes what was read and then copies the rest.
+
+'''
+
+from array import array
+from shutil import copyfileobj
+from tempfile import TemporaryFile
+from threading import Thread
+
+import io, json, os, stat, struct, sys, zlib
+
+from .bad import BadData
+
+MAGIC = b'\0rel-pack 1\n'
+BLOCK = 1 << 16
+
+def isregular(ins):
+    '''Whether the binary stream ins is a regular file.'''
+
+    try:
+        return stat.S_ISREG(os.fstat(ins.fileno()).st_mode)
+    except (AttributeError, OSError, ValueError, io.UnsupportedOperation):
+        return False
+
+def ispacked(ins):
+    '''Whether the binary stream ins is a regular file that contains a
+    packed relation. The position of ins is not changed.
+
+    '''
+
+    return isregular(ins) and os.pread(ins.fileno(), len(MAGIC), 0) == MAGIC
+
+def unpacked(ins):
+    '''Return ins as it is, or a stream of the relation in ins as TSV if
+    ins contains a packed relation. When ins is not a regular file,
+    return a stream of what was read of it to recognize a packed
+    relation followed by the rest of it, or of the packed relation in
+    it as TSV.
+
+    '''
+
+    if isregular(ins):
+        return Unpacking(ins) if ispacked(ins) else ins
+
+    start = _start(ins)
+    if start != MAGIC:
+        return Prefixing(start, ins)
+
+    spool = TemporaryFile(prefix = 'pack-', suffix = '.tmp')
+    try:
+        with ins:
+            spool.write(start)
+            copyfileobj(ins, spool)
+        spool.flush()
+    except BaseException:
+        spool.close()
+        raise
+
+    return Unpacking(spool)
+
+def _start(ins):
+    '''Read from binary stream ins the magic line, or as much as agrees
+    with it, and return what was read.
+
+    '''
+
+    data = b''
+    while len(data) < len(MAGIC) and MAGIC.startswith(data):
+        more = ins.read(len(MAGIC) - len(data))
+        if not more:
+            break
+        data += more
+    return data
+
+def packing(ous, *, own):
+    '''Return a buffered stream of TSV to be written packed to binary
+    stream ous, closing ous at the end if own, else flushing it.
+
+    '''
+
+    return io.BufferedWriter(Packing(ous, own = own))
+
+class Unpacking(io.FileIO):
+
+    '''Read end of a pipe, with a thread writing to the other end the
+    relation in a packed file as TSV. Attributes head, count and order
+    tell what the footer of the file told.
+
+    '''
+
+    def __init__(self, source):
+        fd = source.fileno()
+        end = os.fstat(fd).st_size - 8
+        if end < len(MAGIC):
+            raise BadData('truncated packed relation')
+        [size] = struct.unpack('<Q', os.pread(fd, 8, end))
+        if size > end - len(MAGIC):
+            raise BadData('truncated packed relation')
+        end -= size
+        try:
+            footer = json.loads(os.pread(fd, size, end).decode('UTF-8'))
+        except ValueError:
+            raise BadData('truncated packed relation')
+
+        self.head = [ name.encode('UTF-8') for name in footer['head'] ]
+        self.count = footer['count']
+        self.order = tuple(name.encode('UTF-8') for name in footer['order'])
+
+        r, w = os.pipe()
+        super().__init__(r, 'rb')
+
+        self._source = source
+        self._failure = None
+        self._thread = Thread(target = self._unpack,
+                              args = (open(w, 'wb'), end),
+                              daemon = True)
+        self._thread.start()
+
+    def _unpack(self, ous, end):
+        try:
+            with ous:
+                ous.write(b'\t'.join(self.head))
+                ous.write(b'\n')
+                self._source.seek(len(MAGIC))
+                for data in _blocks(self._source, end):
+                    ous.write(_decode(data, len(self.head)))
+        except BrokenPipeError:
+            # reader closed its end
+            pass
+        except Exception as exn:
+            self._failure = exn
+
+    def close(self):
+        if self.closed: return
+        super().close()
+        self._thread.join()
+        self._source.close()
+        if self._failure is not None:
+            raise BadData('unpacking: {}'.format(self._failure))
+
+class Prefixing(io.FileIO):
+
+    '''Read end of a pipe, with a thread writing to the other end the
+    bytes in start and then the rest of binary stream source, so that
+    also a subprocess can read it.
+
+    '''
+
+    def __init__(self, start, source):
+        r, w = os.pipe()
+        super().__init__(r, 'rb')
+
+        self._failure = None
+        self._thread = Thread(target = self._copy,
+                              args = (start, source, open(w, 'wb')),
+                              daemon = True)
+        self._thread.start()
+
+    def _copy(self, start, source, ous):
+        try:
+            with source, ous:
+                ous.write(start)
+                copyfileobj(source, ous)
+        except BrokenPipeError:
+            # reader closed its end
+            pass
+        except Exception as exn:
+            self._failure = exn
+
+    def close(self):
+        if self.closed: return
+        super().close()
+        # the thread may be waiting for more of source, which is not
+        # waited for when the reader is done
+        if self._failure is not None:
+            raise BadData('reading: {}'.format(self._failure))
+
+class Packing(io.FileIO):
+
+    '''Write end of a pipe, with a thread reading TSV from the other end
+    and writing it to a binary stream as a packed relation.
+
+    '''
+
+    def __init__(self, target, *, own):
+        r, w = os.pipe()
+        super().__init__(w, 'wb')
+
+        self._target = target
+        self._own = own
+        self._failure = None
+        self._thread = Thread(target = self._pack,
+                              args = (open(r, 'rb'),),
+                              daemon = True)
+        self._thread.start()
+
+    def _pack(self, ins):
+        try:
+            with ins:
+                _pack(ins, self._target)
+        except Exception as exn:
+            self._failure = exn
+
+    def close(self):
+        if self.closed: return
+        super().close()
+        self._thread.join()
+        if self._own:
+            self._target.close()
+        else:
+            self._target.flush()
+        if self._failure is not None:
+            if isinstance(self._failure, BadData):
+                raise self._failure
+            raise BadData('packing: {}'.format(self._failure))
+
+def _pack(ins, ous):
+    '''Read TSV from binary stream ins and write it to binary stream ous
+    as a packed relation, noting how long a prefix of the head the
+    records are sorted on. Write nothing if there is no head.
+
+    '''
+
+    line = next(ins, None)
+    if line is not None and line.startswith(b'#order'):
+        # the order is noted anyway
+        line = next(ins, None)
+
+    if line is None:
+        return
+
+    head = _fields(line)
+    width = len(head)
+
+    ous.write(MAGIC)
+
+    count, prefix, prev, rows = 0, width, None, []
+    for line in ins:
+        row = _fields(line)
+        if len(row) != width:
+            raise BadData('different number of fields: {} fields, {} names'
+                          .format(len(row), width))
+        if prefix and prev is not None and (
+                prev > row if prefix == width else
+                prev[:prefix] > row[:prefix]):
+            prefix = next(k for k, (a, b) in enumerate(zip(prev, row))
+                          if a != b)
+        prev = row
+        rows.append(row)
+        if len(rows) == BLOCK:
+            ous.write(_encode(rows, width))
+            count += len(rows)
+            rows = []
+
+    if rows:
+        ous.write(_encode(rows, width))
+        count += len(rows)
+
+    footer = json.dumps(dict(head = [ name.decode('UTF-8')
+                                      for name in head ],
+                             count = count,
+                             order = [ name.decode('UTF-8')
+                                       for name in head[:prefix] ]))
+    footer = footer.encode('UTF-8')
+    ous.write(footer)
+    ous.write(struct.pack('<Q', len(footer)))
+
+def _fields(line):
+    '''Split a TSV line, which may be empty, to its fields.'''
+
+    line = line.rstrip(b'\r\n')
+    return line.split(b'\t') if line else []
+
+def _encode(rows, width):
+    '''Return the block of the rows, as the compressed length followed by
+    the compressed data: the number of rows, and for each field the
+    number and total length of the distinct values, the type code of
+    the indices, the values separated by newlines, and the indices.
+
+    '''
+
+    parts = [ struct.pack('<I', len(rows)) ]
+    for column in (zip(*rows) if width else ()):
+        index = {}
+        codes = [ index.setdefault(value, len(index)) for value in column ]
+        code = ('B' if len(index) <= 1 << 8 else
+                'H' if len(index) <= 1 << 16 else
+                'I')
+        codes = array(code, codes)
+        if sys.byteorder == 'big':
+            codes.byteswap()
+        values = b'\n'.join(index)
+        parts.append(struct.pack('<IIc', len(index), len(values),
+                                 code.encode('ascii')))
+        parts.append(values)
+        parts.append(codes.tobytes())
+
+    data = zlib.compress(b''.join(parts), 1)
+    return struct.pack('<I', len(data)) + data
+
+def _blocks(ins, end):
+    '''Generate the uncompressed data of each block in binary stream ins
+    from the current position to end.
+
+    '''
+
+    at = ins.tell()
+    while at < end:
+        [size] = struct.unpack('<I', _exactly(ins, 4))
+        yield zlib.decompress(_exactly(ins, size))
+        at += 4 + size
+
+def _exactly(ins, size):
+    '''Read exactly size bytes from binary stream ins.'''
+
+    data = b''
+    while len(data) < size:
+        more = ins.read(size - len(data))
+        if not more:
+            raise BadData('truncated packed relation')
+        data += more
+    return data
+
+def _decode(data, width):
+    '''Return the records in the uncompressed data of a block as TSV.'''
+
+    [count] = struct.unpack_from('<I', data, 0)
+    at = 4
+    columns = []
+    for k in range(width):
+        many, size, code = struct.unpack_from('<IIc', data, at)
+        at += 9
+        values = data[at:at + size].split(b'\n')
+        at += size
+        codes = array(code.decode('ascii'))
+        codes.frombytes(data[at:at + count * codes.itemsize])
+        at += count * codes.itemsize
+        if sys.byteorder == 'big':
+            codes.byteswap()
+        columns.append(map(values.__getitem__, codes))
+
+    if not width:
+        return b'\n' * count
+
+    return b'\n'.join(map(b'\t'.join, zip(*columns))) + b'\n'
@@ -0,0 +1,123 @@
+'''Support library for rel tools (relation tools).
+
+Partitioned execution splits the body of each input relation into a
+number of partitions by a hash of the values in the key fields, so
+that the records that agree on the key are in the same partition of
+each input, runs an operation on each partition in a pool of worker
+processes, and then combines the results, either concatenated or,
+when the result of each partition is sorted on the key, merged.
+
+Partitions and results are temp files that begin with a head, so that
+a worker reads and writes relations as usual.
+
+'''
+
+from concurrent.futures import ProcessPoolExecutor
+from heapq import merge
+from shutil import copyfileobj
+from tempfile import mkstemp
+
+import os
+
+from .data import buffered, getter, markorder, readhead, records
+
+def partition(ins, *, head, key, count):
+    '''Write the body of the relation in binary stream ins, its head
+    already read, to count new temp files by the hash of the values of
+    the named key fields, and return the paths to the files. Each file
+    begins with the head (after the order line of ins, if any, since
+    each partition is in the same order as ins).
+
+    '''
+
+    get = getter(tuple(map(head.index, key)))
+    order = getattr(ins, 'order', None)
+    paths = temps(count, prefix = 'part-')
+    outs = []
+    try:
+        outs.extend(open(path, 'wb') for path in paths)
+        for ous in outs:
+            order and markorder(ous, order)
+            ous.write(b'\t'.join(head))
+            ous.write(b'\n')
+        for r in records(buffered(ins), head = head):
+            ous = outs[hash(get(r)) % count]
+            ous.write(b'\t'.join(r))
+            ous.write(b'\n')
+    except BaseException:
+        remove(paths)
+        raise
+    finally:
+        for ous in outs:
+            ous.close()
+
+    return paths
+
+def temps(count, *, prefix):
+    '''Return the paths to count new empty temp files.'''
+
+    paths = []
+    try:
+        for k in range(count):
+            fd, path = mkstemp(prefix = prefix, suffix = '.tsv.tmp')
+            os.close(fd)
+            paths.append(path)
+    except BaseException:
+        remove(paths)
+        raise
+
+    return paths
+
+def remove(paths):
+    '''Remove the files that exist of the paths.'''
+
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
+
+def execute(function, jobs, *, workers):
+    '''Call function with the arguments of each job in a pool of at most
+    workers processes (but no more than there are processors). Return
+    the results in the order of the jobs, or raise the exception of
+    the first job that failed.
+
+    '''
+
+    workers = max(1, min(workers, len(jobs), os.cpu_count() or 1))
+    with ProcessPoolExecutor(max_workers = workers) as pool:
+        futures = [ pool.submit(function, *job) for job in jobs ]
+        return [ future.result() for future in futures ]
+
+def combine(paths, ous, *, key = None, mark = False):
+    '''Write to ous the head of the relations in the files, which must
+    all have the same head, followed by their bodies, concatenated or,
+    if key names the fields that each is sorted on, merged on the key
+    (and then marked as so sorted if mark).
+
+    '''
+
+    inputs = []
+    try:
+        for path in paths:
+            inputs.append(open(path, 'rb').detach()) # magic
+        heads = [ readhead(ins) for ins in inputs ]
+
+        head = heads[0] if heads else []
+        mark and key and markorder(ous, key)
+        ous.write(b'\t'.join(head))
+        ous.write(b'\n')
+
+        if key is None:
+            for ins in inputs:
+                copyfileobj(ins, ous)
+            return
+
+        get = getter(tuple(map(head.index, key)))
+        for r in merge(*(records(buffered(ins), head = head)
+                         for ins in inputs),
+                       key = get):
+            ous.write(b'\t'.join(r))
+            ous.write(b'\n')
+    finally:
+        for ins in inputs:
+            ins.close()
@@ -6,7 +6,7 @@
 
 import sys
 
-from .args import version_args
+from .args import version_args, inputstream
 from .args import BadData
 from .names import makenames
 from .data import readhead, getter, records
@@ -131,13 +131,8 @@ def main(args):
 
     status = 200 # this cannot happen
     try:
-        with open(args.inf1, 'rb').detach() as ins1, \
-             (
-                 sys.stdin.buffer
-                 if args.inf2 is None else
-                 open(args.inf2, 'rb')
-
-             ).detach() as ins2:
+        with inputstream(args.inf1) as ins1, \
+             inputstream(args.inf2) as ins2:
 
             status = compare(args, ins1, ins2)
     except Exception as exn:
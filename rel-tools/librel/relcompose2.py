@@ -8,11 +8,12 @@
 
 import os
 import subprocess
-from tempfile import mkstemp
 
-from .args import transput_args
+from .args import transput_args, positive
 from .data import getter, readhead, groups
 from .cache import Cache
+from .extsort import size
+from .partition import partition, temps, remove, execute
 from .bins import SORT
 
 def parsearguments(argv, *, prog = None):
@@ -37,6 +38,29 @@ def parsearguments(argv, *, prog = None):
 
                         ''')
 
+    parser.add_argument('--cache-memory', metavar = 'size',
+                        dest = 'cache_memory',
+                        type = size, default = size('64M'),
+                        help = '''
+
+                        In-memory record cache budget in bytes, with
+                        optional K, M, or G suffix (default 64M, any
+                        excess spills to a temp file).
+
+                        ''')
+
+    parser.add_argument('--partitions', metavar = 'N',
+                        type = positive,
+                        default = 1,
+                        help = '''
+
+                        Split the inputs into N partitions by a hash
+                        of the key and compose the partitions in
+                        parallel, in as many processes as there are
+                        processors (default 1, no partitions).
+
+                        ''')
+
     args = parser.parse_args(argv)
     args.prog = prog or parser.prog
 
@@ -47,6 +71,80 @@ def main(args, ins1, ins2, ous):
     head1 = readhead(ins1)
     head2 = readhead(ins2)
 
+    key = tuple(name for name in head1 if name in head2)
+    oth1 = tuple(name for name in head1 if name not in head2)
+    oth2 = tuple(name for name in head2 if name not in head1)
+
+    # the composite of each partition, or of the whole when not
+    # partitioned, goes to a temp file, and the temp files are then
+    # sorted together, removing duplicates
+
+    paths = []
+    try:
+        if args.partitions > 1:
+            parts1 = partition(ins1, head = head1, key = key,
+                               count = args.partitions)
+            paths.extend(parts1)
+            parts2 = partition(ins2, head = head2, key = key,
+                               count = args.partitions)
+            paths.extend(parts2)
+            results = temps(args.partitions, prefix = 'compose2-')
+            paths.extend(results)
+            jobs = [ (args, part1, part2, result)
+                     for part1, part2, result
+                     in zip(parts1, parts2, results) ]
+            execute(composepart, jobs, workers = args.partitions)
+        else:
+            results = temps(1, prefix = 'compose2-')
+            paths.extend(results)
+            with open(results[0], 'wb') as out:
+                compose(ins1, ins2, out, head1 = head1, head2 = head2,
+                        many = args.cache,
+                        memory = args.cache_memory)
+
+        ous.write(b'\t'.join(oth1))
+        oth1 and oth2 and ous.write(b'\t')
+        ous.write(b'\t'.join(oth2))
+        ous.write(b'\n')
+        ous.flush()
+        subprocess.run([ SORT, '--unique', *results ],
+                       env = dict(os.environ,
+                                  LC_ALL = 'C'),
+                       stdout = ous,
+                       stderr = None)
+    finally:
+        remove(paths)
+
+    return 0
+
+def composepart(args, path1, path2, path):
+    '''Compose the partitions in the files at path1 and path2 to the
+    file at path, in a worker process.
+
+    '''
+
+    ins1 = open(path1, 'rb').detach() # magic
+    try:
+        ins2 = open(path2, 'rb').detach() # magic
+        try:
+            with open(path, 'wb') as out:
+                compose(ins1, ins2, out,
+                        head1 = readhead(ins1),
+                        head2 = readhead(ins2),
+                        many = args.cache,
+                        memory = args.cache_memory)
+        finally:
+            ins2.close()
+    finally:
+        ins1.close()
+
+def compose(ins1, ins2, out, *, head1, head2, many, memory):
+    '''Write to out the other fields of the records of the relations
+    in binary streams ins1 and ins2, their heads already read, that
+    match on the key, without a head, unsorted, and with duplicates.
+
+    '''
+
     key = tuple(name for name in head1 if name in head2)
     oth1 = tuple(name for name in head1 if name not in head2)
     oth2 = tuple(name for name in head2 if name not in head1)
@@ -56,53 +154,34 @@ def main(args, ins1, ins2, ous):
     other2 = getter(tuple(k for k, name in enumerate(head2)
                           if name not in key))
 
-    cache1 = Cache(args.cache, head = head1)
-    cache2 = Cache(args.cache, head = head2)
+    cache1 = Cache(many, head = head1, budget = memory)
+    cache2 = Cache(many, head = head2, budget = memory)
 
-    fd, tmp = mkstemp(prefix = 'compose2-', suffix = '.tsv.tmp')
-    os.close(fd)
     try:
         body1 = groups(ins1, head = head1, key = tuple(map(head1.index, key)))
         body2 = groups(ins2, head = head2, key = tuple(map(head2.index, key)))
         k1, g1 = next(body1, (None, None))
         k2, g2 = next(body2, (None, None))
-        with open(tmp, 'wb') as out:
-            while k1 is not None is not k2:
-                if k1 == k2:
-                    cache1.cache(g1)
-                    cache2.cache(g2)
-                    for r1 in cache1:
-                        for r2 in cache2:
-                            out.write(b'\t'.join(other1(r1)))
-                            oth1 and oth2 and out.write(b'\t')
-                            out.write(b'\t'.join(other2(r2)))
-                            out.write(b'\n')
-                    else:
-                        k1, g1 = next(body1, (None, None))
-                        k2, g2 = next(body2, (None, None))
-                elif k1 < k2:
-                    k1, g1 = next(body1, (None, None))
+        while k1 is not None is not k2:
+            if k1 == k2:
+                cache1.cache(g1)
+                cache2.cache(g2)
+                for r1 in cache1:
+                    for r2 in cache2:
+                        out.write(b'\t'.join(other1(r1)))
+                        oth1 and oth2 and out.write(b'\t')
+                        out.write(b'\t'.join(other2(r2)))
+                        out.write(b'\n')
                 else:
+                    k1, g1 = next(body1, (None, None))
                     k2, g2 = next(body2, (None, None))
+            elif k1 < k2:
+                k1, g1 = next(body1, (None, None))
             else:
-                # any reason to drain ins1 or ins2?
-                pass
-
-        ous.write(b'\t'.join(oth1))
-        oth1 and oth2 and ous.write(b'\t')
-        ous.write(b'\t'.join(oth2))
-        ous.write(b'\n')
-        ous.flush()
-        subprocess.run([ SORT, '--unique', tmp ],
-                       env = dict(os.environ,
-                                  LC_ALL = 'C'),
-                       stdout = ous,
-                       stderr = None)
-    except Exception:
-        raise
+                k2, g2 = next(body2, (None, None))
+        else:
+            # any reason to drain ins1 or ins2?
+            pass
     finally:
-        os.remove(tmp)
         cache1.release()
         cache2.release()
-
-    return 0
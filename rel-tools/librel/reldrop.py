@@ -6,10 +6,10 @@
 
 import sys
 
-from .args import transput_args
+from .args import transput_args, order_args
 from .args import BadData
 from .names import makenames
-from .data import readhead, groups
+from .data import markorder, readhead, groups
 
 def parsearguments(argv, *, prog = None):
     description = '''
@@ -30,6 +30,8 @@ def parsearguments(argv, *, prog = None):
 
                         ''')
 
+    order_args(parser)
+
     args = parser.parse_args(argv)
     args.prog = prog or parser.prog
 
@@ -42,6 +44,7 @@ def main(args, ins, ous):
     head = readhead(ins, old = key)
     key = [name for name in head if name not in key]
 
+    args.mark_order and markorder(ous, key)
     ous.write(b'\t'.join(key))
     ous.write(b'\n')
 
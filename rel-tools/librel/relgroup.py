@@ -0,0 +1,253 @@
+# -*- mode: Python; -*-
+
+# Implementation of a command-line tool ../rel-group,
+# hopefully also usable with synthetic arguments in
+# a Mylly (Chipster) tool, to be tested.
+
+from tempfile import mkstemp
+
+import os
+
+from .args import transput_args
+from .args import BadData
+from .names import makenames
+from .data import getter, readhead, records
+from .extsort import size
+
+# number of partitions to spill to when the groups exceed the budget
+PARTITIONS = 16
+
+# rough estimate of the memory of a group beyond the bytes of its key
+GROUP = 200
+
+# depth of partitioning beyond which a partition is aggregated in
+# memory regardless of the budget (16 ** 4 partitions is many)
+DEPTH = 4
+
+def parsearguments(argv, *, prog = None):
+    description = '''
+
+    Keep only the specified fields, grouping the records that agree on
+    them, with the count of each group and the sum, minimum, and
+    maximum of numeric fields in each group. Groups are kept in a hash
+    table, so the input need not be sorted, and spill to temp files
+    when they exceed a memory budget. Output is in no particular
+    order.
+
+    '''
+
+    parser = transput_args(description = description)
+
+    parser.add_argument('--field', '-f', metavar = 'name*',
+                        action = 'append', default = [],
+                        help = '''
+
+                        fields to group by, can be separated by commas
+                        or spaces, or option can be repeated
+
+                        ''')
+
+    parser.add_argument('--count', '-c', metavar = 'name',
+                        help = '''
+
+                        field name for the count of each group,
+                        different from any other output name
+
+                        ''')
+
+    for op in ('sum', 'min', 'max'):
+        parser.add_argument('--' + op, metavar = 'name*',
+                            action = 'append', default = [],
+                            help = '''
+
+                            numeric fields to compute the {} of in
+                            each group, as new field {}_name
+
+                            '''.format(dict(sum = 'sum',
+                                            min = 'minimum',
+                                            max = 'maximum')[op],
+                                       op))
+
+    parser.add_argument('--memory', metavar = 'size',
+                        type = size, default = size('256M'),
+                        help = '''
+
+                        memory budget for the groups in bytes, with
+                        optional K, M, or G suffix (default 256M)
+
+                        ''')
+
+    args = parser.parse_args(argv)
+    args.prog = prog or parser.prog
+
+    return args
+
+def main(args, ins, ous):
+
+    key = makenames(args.field)
+    [count] = makenames([args.count]) if args.count else [None]
+    sums = makenames(args.sum)
+    mins = makenames(args.min)
+    maxs = makenames(args.max)
+
+    head = readhead(ins, old = key + sums + mins + maxs)
+
+    names = [
+        *key,
+        *([count] if count else []),
+        *(b'sum_' + name for name in sums),
+        *(b'min_' + name for name in mins),
+        *(b'max_' + name for name in maxs),
+    ]
+    bad = set(name for name in names if names.count(name) > 1)
+    if bad:
+        raise BadData('ambiguous output names: ' +
+                      b' '.join(sorted(bad)).decode('UTF-8'))
+
+    ous.write(b'\t'.join(names))
+    ous.write(b'\n')
+
+    ops = Ops(len(sums), len(mins), len(maxs))
+    getkey = getter(tuple(map(head.index, key)))
+    getval = getter(tuple(map(head.index, sums + mins + maxs)))
+
+    data = (
+        (getkey(r), ops.start(number(v) for v in getval(r)))
+        for r in records(ins, head = head)
+    )
+
+    for k, agg in aggregate(data, ops, width = len(key),
+                            budget = args.memory):
+        ous.write(b'\t'.join(k))
+        k and (count or agg[1:]) and ous.write(b'\t')
+        ous.write(b'\t'.join(str(v).encode('UTF-8')
+                             for v in (agg if count else agg[1:])))
+        ous.write(b'\n')
+
+    return 0
+
+def number(value):
+    '''Return the int or float that value (bytes) is.'''
+
+    try:
+        return int(value)
+    except ValueError:
+        pass
+
+    try:
+        return float(value)
+    except ValueError:
+        raise BadData('not a number: ' +
+                      value.decode('UTF-8', errors = 'replace'))
+
+class Ops():
+
+    '''Aggregation of a group as a list: count, sums, minimums,
+    maximums.
+
+    '''
+
+    def __init__(self, nsum, nmin, nmax):
+        self.nsum = nsum
+        self.nmin = nmin
+        self.nmax = nmax
+
+    def start(self, values):
+        '''Return the aggregate of one record with the values.'''
+
+        return [1, *values]
+
+    def combine(self, agg, more):
+        '''Add the aggregate more to the aggregate agg, in place.'''
+
+        agg[0] += more[0]
+        at = 1
+        for k in range(at, at + self.nsum):
+            agg[k] += more[k]
+        at += self.nsum
+        for k in range(at, at + self.nmin):
+            if more[k] < agg[k]: agg[k] = more[k]
+        at += self.nmin
+        for k in range(at, at + self.nmax):
+            if more[k] > agg[k]: agg[k] = more[k]
+
+def aggregate(data, ops, *, width, budget, depth = 0):
+    '''Generate each key and the aggregate of the group of that key in
+    data, which consists of a key (of width fields) and an aggregate
+    for each record (or for part of a group, when aggregating a
+    spilled partition).
+
+    Aggregate in a hash table. When the table exceeds the budget,
+    spill it as partial aggregates to partition files by the hash of
+    the key, and eventually aggregate each partition in turn (again
+    partitioning a partition that still exceeds the budget).
+
+    A table of one group is not spilled, since partitioning it would
+    not reduce it, and nothing is spilled at DEPTH, so that a
+    partition that cannot be reduced is aggregated in memory.
+
+    '''
+
+    table = {}
+    held = 0
+    parts = None
+    try:
+        for k, agg in data:
+            old = table.get(k)
+            if old is None:
+                table[k] = agg
+                held += GROUP + sum(map(len, k)) + 32 * len(agg)
+            else:
+                ops.combine(old, agg)
+
+            if held > budget and len(table) > 1 and depth < DEPTH:
+                if parts is None:
+                    parts = [ Part() for _ in range(PARTITIONS) ]
+                for k, agg in table.items():
+                    parts[hash((depth, k)) % PARTITIONS].write(k, agg)
+                table.clear()
+                held = 0
+
+        if parts is None:
+            yield from table.items()
+            return
+
+        for k, agg in table.items():
+            parts[hash((depth, k)) % PARTITIONS].write(k, agg)
+        table.clear()
+
+        for part in parts:
+            yield from aggregate(part.read(width), ops, width = width,
+                                 budget = budget, depth = depth + 1)
+    finally:
+        for part in (parts or ()):
+            part.remove()
+
+class Part():
+
+    '''A temp file of partial aggregates of a partition of the groups,
+    as key fields and aggregate values, tab-separated.
+
+    '''
+
+    def __init__(self):
+        fd, self.path = mkstemp(prefix = 'group-', suffix = '.tsv.tmp')
+        self.ous = open(fd, 'wb')
+
+    def write(self, k, agg):
+        self.ous.write(b'\t'.join((*k, *(str(v).encode('UTF-8')
+                                         for v in agg))))
+        self.ous.write(b'\n')
+
+    def read(self, width):
+        '''Generate the key (of width fields) and aggregate of each line.'''
+
+        self.ous.close()
+        with open(self.path, 'rb') as ins:
+            for line in ins:
+                r = line.rstrip(b'\n').split(b'\t')
+                yield tuple(r[:width]), [ number(v) for v in r[width:] ]
+
+    def remove(self):
+        self.ous.close()
+        os.remove(self.path)
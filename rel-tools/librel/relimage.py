@@ -10,8 +10,9 @@ import os
 import subprocess
 from tempfile import mkstemp
 
-from .args import transput_args
-from .data import getter, readhead, groups
+from .args import transput_args, sort_args
+from .data import getter, readhead, groups, record
+from .extsort import method, sortedrecords
 from .bins import SORT
 
 def parsearguments(argv, *, prog = None):
@@ -25,6 +26,8 @@ def parsearguments(argv, *, prog = None):
 
     parser = transput_args(description = description, matching = True)
 
+    sort_args(parser)
+
     args = parser.parse_args(argv)
     args.prog = prog or parser.prog
 
@@ -68,11 +71,17 @@ def main(args, ins1, ins2, ous):
         ous.write(b'\t'.join(oth))
         ous.write(b'\n')
         ous.flush()
-        subprocess.run([ SORT, '--unique', tmp ],
-                       env = dict(os.environ,
-                                  LC_ALL = 'C'),
-                       stdout = ous,
-                       stderr = None)
+        if method() == 'python':
+            with open(tmp, 'rb') as ins:
+                for r in sortedrecords(ins, split = record, unique = True):
+                    ous.write(b'\t'.join(r))
+                    ous.write(b'\n')
+        else:
+            subprocess.run([ SORT, '--unique', tmp ],
+                           env = dict(os.environ,
+                                      LC_ALL = 'C'),
+                           stdout = ous,
+                           stderr = None)
     except Exception:
         raise
     finally:
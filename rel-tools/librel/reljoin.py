@@ -4,14 +4,17 @@
 # hopefully also usable with synthetic arguments in
 # a Mylly (Chipster) tool, to be tested.
 
-import os
+import os, stat
 from tempfile import mkstemp
 
-from .args import transput_args
+from .args import transput_args, sort_args, order_args, inputstream
+from .args import positive
 from .args import BadData
 from .names import makenames
-from .data import getter, readhead, groups
+from .data import getter, markorder, readhead, groups, records
 from .cache import Cache
+from .extsort import size
+from .partition import partition, temps, remove, execute, combine
 
 def parsearguments(argv, *, prog = None):
     description = '''
@@ -33,6 +36,68 @@ def parsearguments(argv, *, prog = None):
 
                         ''')
 
+    parser.add_argument('--cache-memory', metavar = 'size',
+                        dest = 'cache_memory',
+                        type = size, default = size('64M'),
+                        help = '''
+
+                        In-memory record cache budget in bytes, with
+                        optional K, M, or G suffix (default 64M, any
+                        excess spills to a temp file).
+
+                        ''')
+
+    parser.add_argument('--hash', action = 'store_true',
+                        help = '''
+
+                        Build an in-memory hash table of the records
+                        of the smaller input (the first input when the
+                        size of the second is not known) and stream
+                        the other input unsorted, instead of sorting
+                        both inputs.
+
+                        ''')
+
+    parser.add_argument('--hash-size', metavar = 'size',
+                        dest = 'hash_size',
+                        type = size, default = 0,
+                        help = '''
+
+                        Join by hashing, as with --hash, whenever the
+                        smaller input is a file of at most size bytes
+                        (with optional K, M, or G suffix; default 0,
+                        never unless --hash, so that the output is in
+                        key order).
+
+                        ''')
+
+    parser.add_argument('--sorted', action = 'store_true',
+                        help = '''
+
+                        When joining by hashing, sort the streamed
+                        input on the key, so that the output is in the
+                        same order as without hashing. When joining in
+                        partitions, merge the results of the
+                        partitions on the key instead of concatenating
+                        them.
+
+                        ''')
+
+    parser.add_argument('--partitions', metavar = 'N',
+                        type = positive,
+                        default = 1,
+                        help = '''
+
+                        Split each pair of inputs into N partitions
+                        by a hash of the key and join the partitions
+                        in parallel, in as many processes as there are
+                        processors (default 1, no partitions).
+
+                        ''')
+
+    sort_args(parser)
+    order_args(parser)
+
     args = parser.parse_args(argv)
     args.prog = prog or parser.prog
 
@@ -41,37 +106,313 @@ def parsearguments(argv, *, prog = None):
 def main(args, ins1, ins2, ous):
 
     # transput arranges to open two input streams, with the path names
-    # to remaining input relations in args.rest (if any) and it seems
-    # quite tricky to pass only the final result to the provided
-    # stream while removing all temp files of temporary results:
+    # to remaining input relations in args.rest (if any); all heads
+    # are read first, to see whether all the relations are joined on
+    # the same key, in one pass, or else in which order to join them
+    # in pairs, through temp files that are then removed
 
-    tmp1 = None
+    head1 = readhead(ins1)
+    head2 = readhead(ins2)
+
+    if not args.rest:
+        pairjoin(args, ins1, ins2, ous, head1 = head1, head2 = head2,
+                 ordered = args.sorted,
+                 mark = args.mark_order)
+        return 0
+
+    rest = []
     try:
         for infk in args.rest:
+            rest.append(inputstream(infk))
+        inputs = [
+            (ins1, head1),
+            (ins2, head2),
+            *((ins, readhead(ins)) for ins in rest)
+        ]
+
+        if (args.hash or args.partitions > 1 or
+            not samekey([ head for ins, head in inputs ])):
+            joinmany(args, inputs, ous)
+        else:
+            multijoin(inputs, ous,
+                      many = args.cache,
+                      memory = args.cache_memory,
+                      mark = args.mark_order)
+    finally:
+        for ins in rest:
+            ins.close()
+
+    return 0
+
+def samekey(heads):
+    '''Return True if the relations with the heads are all joined on the
+    same fields, so that no other field is in more than one head.
+
+    '''
+
+    key = set(heads[0]).intersection(*heads[1:])
+    seen = set()
+    for head in heads:
+        if seen & (set(head) - key):
+            return False
+        seen.update(head)
+
+    return True
+
+def joinmany(args, inputs, ous):
+    '''Join the inputs, a list of binary streams with their heads
+    already read, in pairs, through temp files. The order of the joins
+    is chosen to start from the smallest input and to join each time
+    the smallest remaining input that shares fields with the result
+    so far, to avoid a large intermediate result. The fields of the
+    final result are in the order they would be in when joining in
+    the given order.
+
+    '''
+
+    names = []
+    for ins, head in inputs:
+        names.extend(name for name in head if name not in names)
+
+    def cost(ins):
+        size = filesize(ins)
+        return float('inf') if size is None else size
+
+    inputs = sorted(inputs, key = lambda input: cost(input[0]))
+    (ins1, head1), *inputs = inputs
+
+    tmp1 = None
+    try:
+        while inputs:
+            shares = [ input for input in inputs
+                       if any(name in head1 for name in input[1]) ]
+            ins2, head2 = (shares or inputs)[0]
+            inputs.remove((ins2, head2))
+
+            final = not inputs and (
+                head1 + [ name for name in head2 if name not in head1 ]
+                == names
+            )
+
+            if final:
+                pairjoin(args, ins1, ins2, ous,
+                         head1 = head1, head2 = head2,
+                         ordered = args.sorted,
+                         mark = args.mark_order)
+                break
+
             fd, tmp2 = mkstemp(prefix = 'join-', suffix = '.tsv.tmp')
             os.close(fd)
             with open(tmp2, 'wb') as ous2:
-                join(ins1, ins2, ous2, many = 3)
+                # marked so that the next join need not sort on a key
+                # that happens to be the same
+                pairjoin(args, ins1, ins2, ous2,
+                         head1 = head1, head2 = head2,
+                         mark = True)
             if tmp1 is not None:
                 ins1.close()
                 os.remove(tmp1)
             tmp1 = tmp2
             ins1 = open(tmp1, 'rb').detach() # magic
-            ins2 = open(infk, 'rb').detach() # magic
+            head1 = readhead(ins1)
         else:
-            join(ins1, ins2, ous, many = args.cache)
-    except Exception:
-        raise
+            # last join was to a temp file, to put fields in order
+            reorder(ins1, ous, head = head1, names = names,
+                    mark = args.mark_order)
     finally:
         if tmp1 is not None:
             ins1.close()
             os.remove(tmp1)
 
-    return 0
+def reorder(ins, ous, *, head, names, mark = False):
+    '''Copy the relation in binary stream ins, its head already read,
+    to ous with the fields in the order of names, marking the order
+    that ins is declared to be in if mark.
 
-def join(ins1, ins2, ous, *, many):
-    head1 = readhead(ins1)
-    head2 = readhead(ins2)
+    '''
+
+    get = getter(tuple(map(head.index, names)))
+    order = getattr(ins, 'order', None)
+    mark and order and markorder(ous, order)
+    ous.write(b'\t'.join(names))
+    ous.write(b'\n')
+    for r in records(ins, head = head):
+        ous.write(b'\t'.join(get(r)))
+        ous.write(b'\n')
+
+def multijoin(inputs, ous, *, many, memory, mark = False):
+    '''Join the inputs, a list of binary streams with their heads
+    already read, all on the same key, in one pass over all the
+    inputs sorted on the key. The output is the same as from joining
+    them in pairs in the given order.
+
+    '''
+
+    heads = [ head for ins, head in inputs ]
+    key = tuple(name for name in heads[0]
+                if all(name in head for head in heads[1:]))
+
+    names = list(heads[0])
+    for head in heads[1:]:
+        names.extend(name for name in head if name not in key)
+    mark and key and markorder(ous, key)
+    ous.write(b'\t'.join(names))
+    ous.write(b'\n')
+
+    others = [
+        getter(tuple(k for k, name in enumerate(head) if name not in key))
+        for head in heads
+    ]
+
+    bodies = [
+        groups(ins, head = head, key = tuple(map(head.index, key)))
+        for ins, head in inputs
+    ]
+    caches = [ Cache(many, head = head, budget = memory)
+               for head in heads[1:] ]
+
+    def write(fields, k):
+        if k == len(caches):
+            ous.write(b'\t'.join(fields))
+            ous.write(b'\n')
+            return
+        for r in caches[k]:
+            write(fields + list(others[k + 1](r)), k + 1)
+
+    try:
+        current = [ next(body, (None, None)) for body in bodies ]
+        while all(k is not None for k, g in current):
+            top = max(k for k, g in current)
+            if all(k == top for k, g in current):
+                for cache, (k, g) in zip(caches, current[1:]):
+                    cache.cache(g)
+                for r in current[0][1]:
+                    write(r, 0)
+                current = [ next(body, (None, None)) for body in bodies ]
+            else:
+                current = [
+                    (next(body, (None, None)) if k < top else (k, g))
+                    for body, (k, g) in zip(bodies, current)
+                ]
+    finally:
+        for cache in caches:
+            cache.release()
+
+def pairjoin(args, ins1, ins2, ous, *, head1, head2,
+             ordered = False, mark = False):
+    '''Join the relations in binary streams ins1 and ins2, their heads
+    already read, to ous, as join does, or in partitions if args so
+    request.
+
+    '''
+
+    if args.partitions > 1:
+        partjoin(args, ins1, ins2, ous, head1 = head1, head2 = head2,
+                 ordered = ordered, mark = mark)
+        return
+
+    join(ins1, ins2, ous, head1 = head1, head2 = head2,
+         many = args.cache,
+         memory = args.cache_memory,
+         hash = hashside(args, ins1, ins2),
+         ordered = ordered,
+         mark = mark)
+
+def partjoin(args, ins1, ins2, ous, *, head1, head2,
+             ordered = False, mark = False):
+    '''Join the relations in binary streams ins1 and ins2, their heads
+    already read, to ous by partitioning both into args.partitions
+    temp files on the key and joining each pair of partitions in a
+    worker process. The results are merged on the key if ordered (and
+    then marked as so sorted if mark), else concatenated.
+
+    '''
+
+    key = tuple(name for name in head1 if name in head2)
+
+    paths = []
+    try:
+        parts1 = partition(ins1, head = head1, key = key,
+                           count = args.partitions)
+        paths.extend(parts1)
+        parts2 = partition(ins2, head = head2, key = key,
+                           count = args.partitions)
+        paths.extend(parts2)
+        results = temps(args.partitions, prefix = 'join-')
+        paths.extend(results)
+
+        jobs = [ (args, ordered, part1, part2, result)
+                 for part1, part2, result in zip(parts1, parts2, results) ]
+        execute(joinpart, jobs, workers = args.partitions)
+
+        combine(results, ous, key = key if ordered else None, mark = mark)
+    finally:
+        remove(paths)
+
+def joinpart(args, ordered, path1, path2, path):
+    '''Join the partitions in the files at path1 and path2 to the file
+    at path, in a worker process, sorted on the key if ordered.
+
+    '''
+
+    ins1 = open(path1, 'rb').detach() # magic
+    try:
+        ins2 = open(path2, 'rb').detach() # magic
+        try:
+            with open(path, 'wb') as ous:
+                join(ins1, ins2, ous,
+                     head1 = readhead(ins1),
+                     head2 = readhead(ins2),
+                     many = args.cache,
+                     memory = args.cache_memory,
+                     hash = hashside(args, ins1, ins2),
+                     ordered = ordered)
+        finally:
+            ins2.close()
+    finally:
+        ins1.close()
+
+def hashside(args, ins1, ins2):
+    '''Return 1 or 2 to join by hashing the records of the first or the
+    second input, which is then the smaller by file size, or None to
+    join by sorting both inputs.
+
+    '''
+
+    size1, size2 = filesize(ins1), filesize(ins2)
+    small = (2
+             if size2 is not None and (size1 is None or size2 < size1)
+             else 1)
+    smallsize = size1 if small == 1 else size2
+
+    if args.hash:
+        return small
+
+    if smallsize is not None and smallsize <= args.hash_size:
+        return small
+
+    return None
+
+def filesize(ins):
+    '''Return the size in bytes of the regular file that binary stream
+    ins reads, or None if it does not read a regular file.
+
+    '''
+
+    try:
+        info = os.fstat(ins.fileno())
+    except (AttributeError, OSError, ValueError):
+        return None
+
+    return info.st_size if stat.S_ISREG(info.st_mode) else None
+
+def join(ins1, ins2, ous, *, head1, head2, many, memory,
+         hash = None, ordered = False, mark = False):
+    '''Join the relations in binary streams ins1 and ins2, their heads
+    already read, to ous, marking the output sorted on the key if mark
+    and it is so sorted.
+
+    '''
 
     key = tuple(name for name in head1 if name in head2)
     oth = tuple(name for name in head2 if name not in head1)
@@ -79,13 +420,22 @@ def join(ins1, ins2, ous, *, many):
     other = getter(tuple(k for k, name in enumerate(head2)
                          if name not in key))
 
+    if mark and key and (hash is None or ordered):
+        markorder(ous, key)
+
     ous.write(b'\t'.join(head1))
     head1 and oth and ous.write(b'\t')
     ous.write(b'\t'.join(oth))
     ous.write(b'\n')
 
-    cache1 = Cache(many, head = head1)
-    cache2 = Cache(many, head = head2)
+    if hash is not None:
+        hashjoin(ins1, ins2, ous, many = many, memory = memory,
+                 head1 = head1, head2 = head2, key = key,
+                 other = other, hash = hash, ordered = ordered)
+        return
+
+    cache1 = Cache(many, head = head1, budget = memory)
+    cache2 = Cache(many, head = head2, budget = memory)
 
     try:
         body1 = groups(ins1, head = head1, key = tuple(map(head1.index, key)))
@@ -99,7 +449,7 @@ def join(ins1, ins2, ous, *, many):
                 for r1 in cache1:
                     for r2 in cache2:
                         ous.write(b'\t'.join(r1))
-                        r1 and ous.write(b'\t')
+                        r1 and oth and ous.write(b'\t')
                         ous.write(b'\t'.join(other(r2)))
                         ous.write(b'\n')
                 k1, g1 = next(body1, (None, None))
@@ -116,3 +466,66 @@ def join(ins1, ins2, ous, *, many):
     finally:
         cache1.release()
         cache2.release()
+
+def hashjoin(ins1, ins2, ous, *, many, memory, head1, head2, key, other,
+             hash, ordered):
+    '''Join the bodies of ins1 and ins2 on key by building a hash table
+    of the records of the input that hash indicates (1 or 2) and then
+    streaming the other input, sorted on key if ordered, so that the
+    output is then in the same order as from a sorting join.
+
+    '''
+
+    if hash == 1:
+        table = tabulate(ins1, head = head1, key = key)
+        head, ins = head2, ins2
+    else:
+        table = tabulate(ins2, head = head2, key = key)
+        head, ins = head1, ins1
+
+    get = getter(tuple(map(head.index, key)))
+
+    def write(r1, r2):
+        r2 = other(r2)
+        ous.write(b'\t'.join(r1))
+        r1 and r2 and ous.write(b'\t')
+        ous.write(b'\t'.join(r2))
+        ous.write(b'\n')
+
+    if ordered:
+        body = groups(ins, head = head, key = tuple(map(head.index, key)))
+    else:
+        body = ((get(r), (r,)) for r in records(ins, head = head))
+
+    cache = Cache(many, head = head, budget = memory)
+    try:
+        for k, g in body:
+            if k not in table: continue
+            if hash == 2:
+                for r1 in g:
+                    for r2 in table[k]:
+                        write(r1, r2)
+            elif len(table[k]) == 1:
+                [r1] = table[k]
+                for r2 in g:
+                    write(r1, r2)
+            else:
+                # records of the first input go first in the output
+                cache.cache(g)
+                for r1 in table[k]:
+                    for r2 in cache:
+                        write(r1, r2)
+    finally:
+        cache.release()
+
+def tabulate(ins, *, head, key):
+    '''Return a dict from the key values of each record in binary stream
+    ins to the list of such records, in input order.
+
+    '''
+
+    get = getter(tuple(map(head.index, key)))
+    table = {}
+    for r in records(ins, head = head):
+        table.setdefault(get(r), []).append(r)
+    return table
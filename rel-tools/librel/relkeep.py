@@ -6,9 +6,9 @@
 
 import sys
 
-from .args import transput_args
+from .args import transput_args, order_args
 from .names import makenames
-from .data import readhead, groups
+from .data import markorder, readhead, groups
 
 def parsearguments(argv, *, prog = None):
     description = '''
@@ -29,6 +29,8 @@ def parsearguments(argv, *, prog = None):
 
                         ''')
 
+    order_args(parser)
+
     args = parser.parse_args(argv)
     args.prog = prog or parser.prog
 
@@ -40,6 +42,7 @@ def main(args, ins, ous):
 
     head = readhead(ins, old = key)
 
+    args.mark_order and markorder(ous, key)
     ous.write(b'\t'.join(key))
     ous.write(b'\n')
 
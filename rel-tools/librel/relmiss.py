@@ -4,8 +4,14 @@
 # hopefully also usable with synthetic arguments in
 # a Mylly (Chipster) tool, to be tested.
 
+from tempfile import mkstemp
+
+import os
+
 from .args import transput_args
-from .data import readhead, groups
+from .data import buffered, getter, readhead, groups, records
+from .extsort import size
+from .keyset import keyset
 
 def parsearguments(argv, *, prog = None):
     description = '''
@@ -17,6 +23,19 @@ def parsearguments(argv, *, prog = None):
 
     parser = transput_args(description = description, matching = True)
 
+    parser.add_argument('--key-memory', metavar = 'size',
+                        dest = 'key_memory',
+                        type = size, default = size('64M'),
+                        help = '''
+
+                        In-memory budget for the set of the keys of
+                        the second input in bytes, with optional K, M,
+                        or G suffix (default 64M, beyond which only a
+                        Bloom filter of the keys is kept in memory and
+                        candidate records are verified by sorting).
+
+                        ''')
+
     args = parser.parse_args(argv)
     args.prog = prog or parser.prog
 
@@ -32,6 +51,58 @@ def main(args, ins1, ins2, ous):
     ous.write(b'\t'.join(head1))
     ous.write(b'\n')
 
+    # the keys of ins2 in a set, when they fit in memory, and then
+    # ins1 is streamed unsorted; else in a Bloom filter and a temp
+    # file, and then only the records of ins1 whose key is in the
+    # filter are verified by merging them with the keys
+
+    keys, path = keyset(ins2, head = head2, key = key,
+                        budget = args.key_memory)
+    get = getter(tuple(map(head1.index, key)))
+
+    if path is None:
+        for r1 in records(buffered(ins1), head = head1):
+            if get(r1) not in keys:
+                ous.write(b'\t'.join(r1))
+                ous.write(b'\n')
+        return 0
+
+    fd, tmp = mkstemp(prefix = 'miss-', suffix = '.tsv.tmp')
+    try:
+        with open(fd, 'wb') as out:
+            out.write(b'\t'.join(head1))
+            out.write(b'\n')
+            for r1 in records(buffered(ins1), head = head1):
+                if get(r1) in keys:
+                    out.write(b'\t'.join(r1))
+                    out.write(b'\n')
+                else:
+                    ous.write(b'\t'.join(r1))
+                    ous.write(b'\n')
+
+        ins3 = open(tmp, 'rb').detach() # magic
+        ins4 = open(path, 'rb').detach() # magic
+        try:
+            miss(ins3, ins4, ous,
+                 head1 = readhead(ins3),
+                 head2 = readhead(ins4))
+        finally:
+            ins3.close()
+            ins4.close()
+    finally:
+        os.remove(tmp)
+        os.remove(path)
+
+    return 0
+
+def miss(ins1, ins2, ous, *, head1, head2):
+    '''Write to ous the records of ins1 that do not match any record of
+    ins2 on the key, both heads already read, by sorting and merging.
+
+    '''
+
+    key = tuple(name for name in head1 if name in head2)
+
     body1 = groups(ins1, head = head1, key = tuple(map(head1.index, key)))
     body2 = groups(ins2, head = head2, key = tuple(map(head2.index, key)))
     k1, g1 = next(body1, (None, None))
@@ -57,5 +128,3 @@ def main(args, ins1, ins2, ous):
                 ous.write(b'\t'.join(r1))
                 ous.write(b'\n')
         # any reason to drain g2, body2?
-
-    return 0
@@ -7,10 +7,10 @@
 
 import sys
 
-from .args import transput_args
+from .args import transput_args, sort_args, order_args
 from .args import BadData
 from .names import makenames, fillnames, checknames
-from .data import readhead, records
+from .data import markorder, readhead, records
 
 def parsearguments(argv, *, prog = None):
     description = '''
@@ -31,6 +31,9 @@ def parsearguments(argv, *, prog = None):
 
                         ''')
 
+    sort_args(parser)
+    order_args(parser)
+
     args = parser.parse_args(argv)
     args.prog = prog or parser.prog
 
@@ -44,6 +47,7 @@ def main(args, ins, ous):
 
     key = key or head
 
+    args.mark_order and markorder(ous, key)
     ous.write(b'\t'.join(head))
     ous.write(b'\n')
 
@@ -4,10 +4,10 @@
 # hopefully also usable with synthetic arguments in
 # a Mylly (Chipster) tool, to be tested.
 
-from .args import transput_args
+from .args import transput_args, order_args
 from .args import BadData
 from .names import makenames
-from .data import readhead, groups
+from .data import markorder, readhead, groups
 
 def parsearguments(argv, *, prog = None):
     description = '''
@@ -19,6 +19,8 @@ def parsearguments(argv, *, prog = None):
 
     parser = transput_args(description = description, summing = True)
 
+    order_args(parser)
+
     args = parser.parse_args(argv)
     args.prog = prog or parser.prog
 
@@ -32,6 +34,7 @@ def main(args, ins, ous):
     # tags of origin (so ins already is the sum) at end
 
     head = readhead(ins)
+    args.mark_order and markorder(ous, head[:len(head) - 1])
     ous.write(b'\t'.join(head[:len(head) - 1])) # drop tag
     ous.write(b'\n')
     for k, g in groups(ins, head = head, key = tuple(range(len(head) - 1))):
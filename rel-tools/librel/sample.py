@@ -1,50 +1,81 @@
 '''Rel tools support library.
 
-Performance turned out to be *prohibitively* low. Moved to shuf(1),
-which apparently does reservoir sampling since many years. Giving up
-on both repeatability and the tracking of input positions. Nice try.
+Reservoir sampling of the lines in a binary stream, uniform or
+weighted, repeatable with a seed, keeping the 1-based position of
+each sampled line in the stream.
+
+Performance of a per-line loop in Python turned out to be
+*prohibitively* low, which is why rel-sample moved to shuf(1) for a
+time. Uniform sampling (Algorithm L) now reads the stream in large
+blocks of whole lines and only counts the newlines in each block
+(which happens in C) until the next line to be sampled is in the
+block, and only then splits the block into lines. Early on, when most
+lines are sampled, this is about a per-line loop; later, when lines to
+be sampled are far apart, most blocks are skipped without looking at
+their lines. Weighted sampling (Algorithm A-ExpJ) needs the weight of
+every line, so it is a per-line loop that only skips the random
+draws.
 
 '''
 
-from itertools import islice, repeat
-from math import exp, log, floor
+from heapq import heapify, heapreplace
+from itertools import repeat
+from math import exp, log, log1p, floor
 from random import Random
 
-def fill(reservoir, *, source, seed = None):
-    '''Fill reservoir (a list) with numbered elements from source (an
-    iterator), with uniform probability of inclusion in the sample.
+BLOCK = 1 << 20
+
+def blocks(ins, size = BLOCK):
+    '''Generate blocks of whole lines of roughly size bytes from binary
+    stream ins, each ending in a newline (a final line without a
+    newline is given one).
+
+    '''
+
+    rest = b''
+    for data in iter(lambda: ins.read(size), b''):
+        data = rest + data
+        end = data.rfind(b'\n') + 1
+        if end:
+            rest = data[end:]
+            yield data[:end]
+        else:
+            rest = data
+    if rest:
+        yield rest + b'\n'
+
+def uniform(ins, k, *, seed = None):
+    '''Return a uniform random sample of k lines from binary stream ins,
+    or all lines if there are no more than k, as a list of 1-based
+    position and line (with its newline removed), in input order.
 
     The random seed can be a string (or a bytes object), to set the
     random generator to repeat. If seed is None, the generator is
     initialized from the state of the environment.
 
-    In the event of fewer elements being available from source, the
-    reservoir is truncated. Reservoir is also sorted by the 1-based
-    index of each element in source.
-
     '''
 
-    if not isinstance(reservoir, list) or not reservoir:
-        raise ValueError('reservoir must be a non-empty list')
+    if k < 1:
+        raise ValueError('sample size must be positive')
 
     # 2020-04-30 https://en.wikipedia.org/wiki/Reservoir_sampling
-    #     
+    #
     # "Algorithm L"
-    # 
+    #
     # (* S has items to sample, R will contain the result *)
     # ReservoirSample(S[1..n], R[1..k])
     #   // fill the reservoir array
     #   for i = 1 to k
     #       R[i] := S[i]
-    # 
+    #
     #   (* random() generates a uniform (0,1) random number *)
     #   W := exp(log(random())/k)
-    # 
+    #
     #   while i <= n
     #       i := i + floor(log(random())/log(1-W)) + 1
     #       if i <= n
     #           (* replace a random item of the reservoir with item i *)
-    #           R[randomInteger(1,k)] := S[i]  // random index between 1 and k, inclusive
+    #           R[randomInteger(1,k)] := S[i]
     #           W := W * exp(log(random())/k)
 
     bits = Random()
@@ -53,20 +84,104 @@ def fill(reservoir, *, source, seed = None):
     # [0.0..1.0) => (0.0..1.0)
     rnd = filter(None, (bits.random() for _ in repeat(None)))
 
-    # {1,...,k}
-    ind = (bits.randint(1,k) for _ in repeat(None))
-
-    R = reservoir
-    k = len(R)
-    R[:] = enumerate(islice(source, k), start = 1)
-    i = k
-
-    W = exp(log(next(rnd))/k)
-    try:
-        while True:
-            s = floor(log(next(rnd))/log(1 - W))
-            i += s + 1
-            R[next(ind) - 1] = (i, next(islice(source, s, s + 1)))
-            W *= exp(log(next(rnd))/k)
-    except StopIteration:
-        reservoir.sort()
+    R = []
+    W = None
+    i = 1 # position of the next line to take
+    at = 0 # lines before the current block
+    for block in blocks(ins):
+        n = block.count(b'\n')
+        if at + n < i:
+            at += n
+            continue
+
+        lines = block.split(b'\n')
+        while i <= at + n:
+            line = lines[i - at - 1].rstrip(b'\r')
+            if len(R) < k:
+                R.append((i, line))
+                i += 1
+                if len(R) == k:
+                    W = exp(log(next(rnd))/k)
+                    i = skip(i - 1, W, rnd)
+            else:
+                R[bits.randrange(k)] = (i, line)
+                W *= exp(log(next(rnd))/k)
+                i = skip(i, W, rnd)
+        at += n
+
+    R.sort()
+    return R
+
+def skip(i, W, rnd):
+    '''Return the position of the next line to sample after the line at
+    position i, with Algorithm L's W.
+
+    '''
+
+    base = log1p(-W)
+    if base == 0.0:
+        # W too small to ever sample again
+        return float('inf')
+    return i + floor(log(next(rnd))/base) + 1
+
+def weighted(ins, k, *, weight, seed = None):
+    '''Return a weighted random sample of k lines from binary stream ins,
+    or all lines of positive weight if there are no more than k, as a
+    list of 1-based position and line (with its newline removed), in
+    input order. The weight of a line is what weight returns for the
+    line, lines of weight zero or less are never sampled.
+
+    The seed is as in uniform.
+
+    '''
+
+    if k < 1:
+        raise ValueError('sample size must be positive')
+
+    # Efraimidis and Spirakis, "Algorithm A-ExpJ": each line has key
+    # r^(1/w), here as its logarithm log(r)/w, the k largest keys are
+    # kept in a heap, and the lines between replacements are skipped
+    # by their accumulated weight
+
+    bits = Random()
+    bits.seed(seed)
+
+    rnd = filter(None, (bits.random() for _ in repeat(None)))
+
+    H = []
+    X = None
+    i = 0
+    for block in blocks(ins):
+        for line in block.split(b'\n')[:-1]:
+            i += 1
+            w = weight(line)
+            if w <= 0:
+                continue
+
+            if len(H) < k:
+                H.append((log(next(rnd))/w, i, line.rstrip(b'\r')))
+                if len(H) == k:
+                    heapify(H)
+                    X = jump(H[0][0], rnd)
+                continue
+
+            X -= w
+            if X <= 0:
+                t = exp(H[0][0] * w)
+                r = bits.uniform(t, 1) or next(rnd)
+                heapreplace(H, (log(r)/w, i, line.rstrip(b'\r')))
+                X = jump(H[0][0], rnd)
+
+    return sorted((i, line) for key, i, line in H)
+
+def jump(T, rnd):
+    '''Return the weight to skip before the next replacement in
+    Algorithm A-ExpJ, when the smallest key in the reservoir has the
+    logarithm T.
+
+    '''
+
+    if T == 0.0:
+        # no key can be larger
+        return float('inf')
+    return log(next(rnd))/T
@@ -4,20 +4,19 @@
 # hopefully also usable with synthetic arguments in
 # a Mylly (Chipster) tool, to be tested.
 
-import subprocess
-import sys
-
 from librel.args import transput_args
 from librel.args import BadData
 from librel.names import makenames
-from librel.data import getter, readhead, records
-from librel.bins import SHUF
+from librel.data import readhead
+from librel.sample import uniform, weighted
 
 def parsearguments(argv, *, prog = None):
     description = '''
 
     A uniform random sample of a desired number of the records in the
-    relation.
+    relation, or a weighted random sample where the probability of a
+    record to be included is in proportion to a numeric field. The
+    sample is in input order.
 
     '''
 
@@ -32,6 +31,31 @@ def parsearguments(argv, *, prog = None):
 
                         ''')
 
+    parser.add_argument('--seed', metavar = 'string',
+                        help = '''
+
+                        random seed, to draw the same sample again
+                        from the same input (default from the
+                        environment)
+
+                        ''')
+
+    parser.add_argument('--positions', metavar = 'name',
+                        help = '''
+
+                        new field to hold the 1-based position of each
+                        sampled record in the input relation
+
+                        ''')
+
+    parser.add_argument('--weight', metavar = 'name',
+                        help = '''
+
+                        numeric field to weigh the records by (records
+                        of zero or negative weight are not sampled)
+
+                        ''')
+
     args = parser.parse_args(argv)
     args.prog = prog or parser.prog
 
@@ -39,13 +63,43 @@ def parsearguments(argv, *, prog = None):
 
 def main(args, ins, ous):
 
-    head = readhead(ins)
+    if args.records < 1:
+        raise BadData('sample size must be positive')
+
+    [tag] = makenames([args.positions]) if args.positions else [None]
+    [weight] = makenames([args.weight]) if args.weight else [None]
+
+    head = readhead(ins,
+                    old = [weight] if weight else [],
+                    new = [tag] if tag else [])
 
     ous.write(b'\t'.join(head))
+    head and tag and ous.write(b'\t')
+    tag and ous.write(tag)
     ous.write(b'\n')
-    ous.flush()
 
-    subprocess.run([ SHUF, '--head-count', str(args.records) ],
-                   stdin = ins,
-                   stdout = ous,
-                   stderr = None)
+    if weight is None:
+        sample = uniform(ins, args.records, seed = args.seed)
+    else:
+        k = head.index(weight)
+        def weigh(line):
+            value = line.split(b'\t')[k]
+            try:
+                return float(value)
+            except ValueError:
+                raise BadData('not a number: {}: {}'
+                              .format(weight.decode('UTF-8'),
+                                      value.decode('UTF-8',
+                                                   errors = 'replace')))
+
+        sample = weighted(ins, args.records,
+                          weight = weigh, seed = args.seed)
+
+    for position, line in sample:
+        ous.write(line)
+        if tag:
+            head and ous.write(b'\t')
+            ous.write(str(position).encode('UTF-8'))
+        ous.write(b'\n')
+
+    return 0
@@ -0,0 +1,50 @@
+# Support for writing to external processes (UDPipe, mainly) in
+# batches, distributed over several copies of the process.
+
+import time
+
+class Batch:
+    '''Collect what is written to the stdin streams of one or more
+    processes and write it on to one of them when there is at least
+    size bytes of it or when it has been collected for secs seconds,
+    so that a sentence costs neither a write nor a flush of its own.
+    Each batch goes to the next stream in turn; which tells where the
+    current batch will go. Blocking on a full pipe is the
+    backpressure: whoever reads the processes must keep reading them
+    all the while.
+
+    '''
+
+    def __init__(self, streams, size, secs):
+        self.streams = streams
+        self.size = size
+        self.secs = secs
+        self.which = 0
+        self.parts = []
+        self.count = 0
+        self.since = time.monotonic()
+
+    def write(self, data):
+        if not self.parts:
+            self.since = time.monotonic()
+        self.parts.append(data)
+        self.count += len(data)
+        if (self.count >= self.size or
+            time.monotonic() - self.since >= self.secs):
+            self.flush()
+
+    def flush(self):
+        '''Write the current batch, if any, and start the next batch for
+        the next stream.
+
+        '''
+        if self.parts:
+            stream = self.streams[self.which]
+            stream.write(b''.join(self.parts))
+            stream.flush()
+            self.parts, self.count = [], 0
+            self.which = (self.which + 1) % len(self.streams)
+
+    def close(self):
+        self.flush()
+        for stream in self.streams: stream.close()
@@ -5,6 +5,7 @@ from string import ascii_letters
 from threading import Thread
 
 from vrtargslib import BadData
+from batchlib import Batch
 from vrtdatalib import binunescape
 
 def tokenize(inf, proc, combine, ouf):
@@ -72,3 +73,76 @@ def tokenize(inf, proc, combine, ouf):
 
     proc.stdin.close()
     meta.join()
+
+def tokenize_many(inf, procs, combine, ouf, *, size, secs):
+    '''Like tokenize, but distributes the text blocks from inf over the
+    procs, which should be copies of an external tokenizer process, in
+    batches (see batchlib.Batch), each block followed (rather than
+    preceded) by the sentinel so that a proc need not see the next
+    block before the end of a block can be recognized; puts in the
+    meta Queue, after each markup-line group, the index of the proc
+    that gets the next text block, and None after the last group.
+
+    Runs combine(procs, meta, sentinel, ouf) as a Thread that is
+    supposed to read each text block from the indicated proc.
+
+    '''
+
+    sent = bytes(map(ord, (choice(ascii_letters) for k in range(16))))
+
+    meta = Queue()
+    batch = Batch([ proc.stdin for proc in procs ], size, secs)
+
+    def send(group):
+        # the index is in meta before the block is sent to that proc;
+        # the last line of inf may lack its newline, and without it
+        # the sentinel would go in the same paragraph as the block
+        meta.put(batch.which)
+        block = b''.join(map(binunescape, group))
+        if not block.endswith(b'\n'): block += b'\n'
+        batch.write(block + b'\n' + sent + b'\n\n')
+
+    def issome(line): return not line.isspace()
+    def ismeta(line): return line.startswith(b'<')
+    def checked(meta):
+        if any(line.startswith((b'<sentence ',
+                                b'<sentence>',
+                                b'</sentence>'))
+               for line in meta):
+            raise BadData('sentence tag not allowed')
+        else:
+            return meta
+
+    combiner = Thread(target=combine, args=[procs, meta, sent, ouf])
+    combiner.start()
+
+    try:
+        todo = groupby(filter(issome, inf), ismeta)
+
+        # ensure meta group before first data group;
+        # default empty meta group is for empty inf
+        kind, group = next(todo, (True, ()))
+        if kind:
+            meta.put(checked(tuple(group)))
+        else:
+            meta.put(())
+            send(group)
+
+        # meta and data alternate
+        for kind, group in todo:
+            if kind:
+                meta.put(checked(tuple(group)))
+            else:
+                send(group)
+
+        # ensure meta group after last data group
+        if not kind: meta.put(())
+
+        meta.put(None)
+        batch.close()
+    except BaseException:
+        for proc in procs: proc.terminate()
+        meta.put(None)
+        raise
+    finally:
+        combiner.join()
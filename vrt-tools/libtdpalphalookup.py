@@ -1,6 +1,9 @@
 # The additions to the particular Omorfi transducer used by the alpha
 # pipeline are used twice: in vrt-tdp-alpha-lookup before Marmot, then
 # in vrt-tdp-alpha-fillup after Marmot. Hence this library module.
+# So is the cache of transducer lookups, used by both.
+
+from collections import OrderedDict
 
 additions = {
     # form : { (base, tags), ... }
@@ -542,6 +545,70 @@ TAGCAT = {
     'UNK' : 'OTHER',
 }
 
+class Lookup:
+    '''Stands for the transducer, remembering the analyses of the size
+    most recently looked-up word forms, and of every form in a table
+    loaded from a file made by maketable. Word forms in a corpus
+    repeat a lot, and each traversal of the transducer is costly.
+
+    '''
+
+    def __init__(self, transducer, *, size = 100000, table = None):
+        self.transducer = transducer
+        self.size = size
+        self.recent = OrderedDict()
+        self.table = {} if table is None else loadtable(table)
+
+    def lookup(self, form):
+        '''Return the (analysis, weight) pairs of form, as a tuple.'''
+
+        if form in self.table:
+            return self.table[form]
+
+        if form in self.recent:
+            self.recent.move_to_end(form)
+            return self.recent[form]
+
+        analyses = tuple(self.transducer.lookup(form))
+        if self.size:
+            self.recent[form] = analyses
+            if len(self.recent) > self.size:
+                self.recent.popitem(last = False)
+
+        return analyses
+
+def loadtable(tablefile):
+    '''Return the dict of form : ((analysis, weight), ...) in tablefile,
+    where each line is either form, analysis, weight separated by tabs,
+    or a form alone that has no analyses.
+
+    '''
+
+    table = {}
+    with open(tablefile, encoding = 'UTF-8') as ins:
+        for line in ins:
+            if line.isspace(): continue
+            form, *analysis = line.rstrip('\n').split('\t')
+            analyses = table.setdefault(form, [])
+            if analysis:
+                analysis, weight = analysis
+                analyses.append((analysis, float(weight)))
+
+    return { form : tuple(analyses) for form, analyses in table.items() }
+
+def maketable(transducer, forms, ous):
+    '''Write to text stream ous the table of the analyses of each word
+    form in forms by transducer, for loadtable.
+
+    '''
+
+    for form in forms:
+        analyses = tuple(transducer.lookup(form))
+        if not analyses:
+            print(form, file = ous)
+        for analysis, weight in analyses:
+            print(form, analysis, repr(weight), sep = '\t', file = ous)
+
 if __name__ == '__main__':
     print('sanity check on all additions table entries:')
 
@@ -9,9 +9,10 @@ from argparse import ArgumentParser, ArgumentTypeError
 from pathlib import Path
 from string import ascii_letters, digits as ascii_digits
 from tempfile import mkstemp
-import re, os, sys, traceback
+import io, re, os, sys, traceback
 
 from .bad import BadData, BadCode
+from .compressed import decompressed
 
 VERSION = '0.8.6 (2021-08-20)'
 
@@ -178,9 +179,12 @@ def inputstream(infile, as_text):
     if infile is None:
         return (sys.stdin if as_text else
                 sys.stdin.buffer)
-    return ( open(infile, mode = 'r', encoding = 'UTF-8')
+    # a compressed file (such as a packed fragment) is read as if it
+    # were not compressed
+    ins = decompressed(open(infile, mode = 'br'))
+    return ( io.TextIOWrapper(ins, encoding = 'UTF-8')
              if as_text else
-             open(infile, mode = 'br') )
+             ins )
 
 def outputstream(outfile, as_text):
     if outfile is None:
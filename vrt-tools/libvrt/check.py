@@ -1,43 +1,161 @@
 # Support for various check tools,
 # to provide uniform output format.
 
-import sys
+import re, sys
 
-_binary = None
-_output_stream = None
+class Report:
+    '''Report messages to an output stream in the uniform format, the
+    stream being binary or text. Many reports can be written at once
+    (see checking below).
+
+    '''
+
+    def __init__(self, ous, *, binary):
+        self._binary = binary
+        self._output_stream = ous
+        if binary:
+            ous.write(b'\t'.join((b'line', b'level', b'kind', b'what')))
+            ous.write(b'\n')
+        else:
+            print('line', 'level', 'kind', 'what',
+                  sep = '\t',
+                  file = ous)
+
+    def _message(self, k, level, kind, what):
+        if self._binary:
+            self._output_stream.write(b'\t'.join((str(k).encode('UTF-8'),
+                                                  level, kind, what)))
+            self._output_stream.write(b'\n')
+        else:
+            print(k, level, kind, what, sep = '\t',
+                  file = self._output_stream)
+
+    def error(self, k, kind, what):
+        self._message(k, (b'error' if self._binary else 'error'),
+                      kind, what)
+
+    def warn(self, k, kind, what):
+        self._message(k, (b'warning' if self._binary else 'warning'),
+                      kind, what)
+
+    def info(self, k, kind, what):
+        self._message(k, (b'info' if self._binary else 'info'),
+                      kind, what)
+
+_report = None
 
 def setup_binary(ous):
-    global _binary, _output_stream
-    _binary = True
-    _output_stream = ous
-    ous.write(b'\t'.join((b'line', b'level', b'kind', b'what')))
-    ous.write(b'\n')
+    global _report
+    _report = Report(ous, binary = True)
+    return _report
 
 def setup_text(ous):
-    global _binary, _output_stream
-    _binary = False
-    _output_stream = ous
-    print('line', 'level', 'kind', 'what',
-          sep = '\t',
-          file = ous)
-
-def _message(k, level, kind, what):
-    if _output_stream is None:
-        raise Exception('libvrt.check: output stream not set')
+    global _report
+    _report = Report(ous, binary = False)
+    return _report
 
-    if _binary:
-        _output_stream.write(b'\t'.join((str(k).encode('UTF-8'),
-                                         level, kind, what)))
-        _output_stream.write(b'\n')
-    else:
-        print(k, level, kind, what, sep = '\t',
-              file = _output_stream)
+def _current():
+    if _report is None:
+        raise Exception('libvrt.check: output stream not set')
+    return _report
 
 def error(k, kind, what):
-    _message(k, (b'error' if _binary else 'error'), kind, what)
+    _current().error(k, kind, what)
 
 def warn(k, kind, what):
-    _message(k, (b'warning' if _binary else 'warning'), kind, what)
+    _current().warn(k, kind, what)
 
 def info(k, kind, what):
-    _message(k, (b'info' if _binary else 'info'), kind, what)
+    _current().info(k, kind, what)
+
+# A checker is a generator that is first advanced to its first yield,
+# then sent each numbered input line as (k, line), and finally sent
+# None to indicate the end of input. A checker that has seen enough
+# returns early and is sent nothing more.
+
+def check(checker, ins):
+    '''Run checker over the numbered lines of ins, either binary or
+    text stream.
+
+    '''
+    feed(checker, enumerate(ins, start = 1))
+
+def feed(checker, items):
+    '''Run checker over items that are already numbered lines.'''
+    next(checker)
+    try:
+        for item in items:
+            checker.send(item)
+        checker.send(None)
+    except StopIteration:
+        pass
+
+def checking(ins, *, binary = (), text = (), count = False):
+    '''Run binary checkers over the numbered lines of binary ins and text
+    checkers over the same lines decoded as UTF-8 and split at
+    universal newlines, numbered as if read in text mode, so that each
+    line is read and decoded only once. Text checkers are not sent
+    lines that fail to decode. Stop reading when every checker has
+    returned, unless count is true.
+
+    Return the number of binary lines and text lines read.
+
+    '''
+
+    binary, text = list(binary), list(text)
+    for checker in binary + text:
+        next(checker)
+
+    b, k = 0, 0
+    for line in ins:
+        b += 1
+        binary = _sent(binary, (b, line))
+        if text:
+            for part in decoded(line):
+                k += 1
+                if part is None: continue
+                text = _sent(text, (k, part))
+        elif b'\r' in line:
+            k += len(decoded(line))
+        else:
+            k += 1
+
+        if not (binary or text or count):
+            return b, k
+
+    _sent(binary, None)
+    _sent(text, None)
+    return b, k
+
+def _sent(checkers, item):
+    '''Send item to each checker and return those that are still
+    running.
+
+    '''
+
+    running = []
+    for checker in checkers:
+        try:
+            checker.send(item)
+        except StopIteration:
+            continue
+        running.append(checker)
+    return running
+
+def decoded(line):
+    '''Return the parts of binary line, decoded, as they would be read in
+    text mode, or (None,) when line fails to decode.
+
+    '''
+
+    try:
+        text = line.decode('UTF-8')
+    except UnicodeDecodeError:
+        return (None,)
+
+    if '\r' not in text:
+        return (text,)
+
+    return tuple(part.rstrip('\r\n') + '\n' * part.endswith(('\r', '\n'))
+                 for part in re.findall('[^\r\n]*(?:\r\n|\r|\n)|[^\r\n]+$',
+                                        text))
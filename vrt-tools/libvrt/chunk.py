@@ -0,0 +1,66 @@
+# -*- mode: Python; -*-
+
+'''Support for processing a regular file in parts, as byte ranges that
+start and end at line boundaries, so that line-local work can be done
+in parallel and the results combined in order.
+
+'''
+
+import os
+
+from libvrt.compressed import compression, decompressed
+
+def ranges(infile, parts, *, after = None):
+    '''Return a list of at most parts (start, end) byte ranges that cover
+    infile, each starting at the start of a line. If after is given, a
+    range can only start after a line for which after(line) is true.
+    Ranges are not empty.
+
+    '''
+
+    size = os.path.getsize(infile)
+    starts = [0]
+    with open(infile, mode = 'br') as ins:
+        if compression(ins):
+            # a compressed file is one part
+            return [(0, size)]
+        for k in range(1, max(1, parts)):
+            point = size * k // parts
+            if point <= starts[-1]:
+                continue
+
+            ins.seek(point - 1)
+            ins.readline()
+            point = ins.tell()
+            if after is not None:
+                for line in iter(ins.readline, b''):
+                    point += len(line)
+                    if after(line):
+                        break
+                else:
+                    point = size
+
+            if starts[-1] < point < size:
+                starts.append(point)
+
+    return list(zip(starts, starts[1:] + [size]))
+
+def lines(infile, start, end):
+    '''Yield the binary lines of infile in the byte range from start to
+    end.
+
+    '''
+
+    with open(infile, mode = 'br') as ins:
+        if compression(ins):
+            # a compressed file is one part (see ranges)
+            with decompressed(ins) as whole:
+                yield from whole
+            return
+        ins.seek(start)
+        remaining = end - start
+        for line in ins:
+            if remaining <= 0:
+                return
+            remaining -= len(line)
+            yield line
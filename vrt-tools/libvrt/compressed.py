@@ -0,0 +1,146 @@
+# -*- mode: Python; -*-
+
+'''Support for reading and writing compressed vrt, such as the packed
+fragments that vrt-pack writes with --compress. A compressed regular
+file is recognized by its magic bytes (gzip or zstd) and read through
+a decompressing stream, so that tools read it as if it were not
+compressed. Input from a pipe is read as it is.
+
+Zstandard requires the zstandard module, which is optional: without
+it, only gzip is available.
+
+'''
+
+import gzip, io, os, stat
+
+from libvrt.bad import BadData
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+GZIP = b'\x1f\x8b'
+ZSTD = b'\x28\xb5\x2f\xfd'
+
+METHODS = ('gzip', 'zstd')
+
+def compression(ins):
+    '''Return the compression method (gzip, zstd) of the regular file
+    that binary stream ins reads, or None if it is not a compressed
+    regular file. The position of ins is not changed.
+
+    '''
+
+    try:
+        fd = ins.fileno()
+        if not stat.S_ISREG(os.fstat(fd).st_mode):
+            return None
+        magic = os.pread(fd, 4, 0)
+    except (AttributeError, OSError, ValueError, io.UnsupportedOperation):
+        return None
+
+    return ('gzip' if magic.startswith(GZIP) else
+            'zstd' if magic.startswith(ZSTD) else
+            None)
+
+def decompressed(ins):
+    '''Return binary stream ins as it is, or a buffered binary stream of
+    its decompressed content if it is a compressed regular file.
+    Closing the returned stream closes ins.
+
+    '''
+
+    method = compression(ins)
+    if method is None:
+        return ins
+
+    if method == 'gzip':
+        stream = gzip.GzipFile(fileobj = ins)
+        return io.BufferedReader(_Decompressing(stream, ins))
+
+    require('zstd')
+    decompressor = zstandard.ZstdDecompressor()
+    reader = decompressor.stream_reader(ins, read_across_frames = True)
+    return io.BufferedReader(_Decompressing(reader, ins))
+
+def compressing(ous, method):
+    '''Return a buffered binary stream that writes compressed data to
+    binary stream ous with method (gzip, zstd, or None to not
+    compress, when ous is returned as it is). Closing the returned
+    stream closes ous.
+
+    '''
+
+    if method is None:
+        return ous
+
+    if method == 'gzip':
+        # fast rather than small, for scratch data
+        stream = gzip.GzipFile(filename = '', fileobj = ous, mode = 'wb',
+                               compresslevel = 1, mtime = 0)
+        return io.BufferedWriter(_Compressing(stream, ous))
+
+    if method == 'zstd':
+        require('zstd')
+        stream = zstandard.ZstdCompressor().stream_writer(ous)
+        return io.BufferedWriter(_Compressing(stream, ous))
+
+    require(method)
+
+def require(method):
+    '''Raise BadData if compression method (or None) is not available.'''
+
+    if method not in (None, *METHODS):
+        raise BadData('unknown compression: {}'.format(method))
+    if method == 'zstd' and zstandard is None:
+        raise BadData('zstd compression requires the zstandard module')
+
+class _Decompressing(io.RawIOBase):
+
+    '''Raw stream of the decompressed content of a stream, closing also
+    the underlying file. Not a file, so not mapped (see mapped).
+
+    '''
+
+    def __init__(self, stream, file):
+        self._stream = stream
+        self._file = file
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self._stream.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def close(self):
+        if self.closed: return
+        super().close()
+        self._stream.close()
+        self._file.close()
+
+class _Compressing(io.RawIOBase):
+
+    '''Raw stream that writes compressed data through a compressing
+    stream, closing also the underlying file.
+
+    '''
+
+    def __init__(self, stream, file):
+        self._stream = stream
+        self._file = file
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._stream.write(data)
+        return len(data)
+
+    def close(self):
+        if self.closed: return
+        super().close()
+        self._stream.close()
+        self._file.close()
@@ -18,6 +18,9 @@ def parsearguments(argv):
 
     By default, modules "kieli" and "biojava" are loaded quietly.
 
+    With --local, the tasks are run in the current host instead, at
+    most the given number at a time, and logged in the same files.
+
     '''
 
     parser = version_args(description = description)
@@ -49,7 +52,9 @@ def parsearguments(argv):
                         standard output of the batch job are written
                         in files named %%A-%%a-<job>.{out,err} where
                         %%A is the job number and %%a the task number
-                        in an array job (log directory is created as
+                        in an array job, with a record of the resource
+                        usage of each task in %%A-%%a-<job>.tsv for
+                        sumgame --records (log directory is created as
                         needed) (default: ./gamelog)
 
                         ''')
@@ -112,6 +117,19 @@ def parsearguments(argv):
 
                         ''')
 
+    parser.add_argument('--local', '-L', metavar = 'num',
+                        type = localtype,
+                        help = '''
+
+                        run the tasks in this host instead of the
+                        batch system, at most num at a time, and
+                        wait for them; record the exit status, wall
+                        time and maximum memory of each task (time,
+                        memory, cores, scratch, partition and billing
+                        group are not enforced)
+
+                        ''')
+
     parser.add_argument('--cat', action = 'store_true',
                         help = '''
                         write the job description to standard output
@@ -220,6 +238,14 @@ def billinggrouptype(name):
     raise ArgumentTypeException('user not in billing group: {}: {}'
                                 .format(name, *' '.join(groupnames)))
 
+def localtype(arg):
+    try:
+        tasks = int(arg)
+        if tasks < 1: raise ValueError('invalid number of tasks')
+        return tasks
+    except ValueError:
+        raise ArgumentTypeError('invalid number of tasks: {}'.format(arg))
+
 def minutestype(arg):
     try:
         minutes = int(arg)
@@ -0,0 +1,101 @@
+# -*- mode: Python; -*-
+
+'''Run an array job script locally instead of sending it to the batch
+system: each task runs the same script in the current working
+directory, with the task number in SLURM_ARRAY_TASK_ID, standard
+output and standard error in the same %A-%a-<job>.{out,err} files in
+the log directory, and at most a given number of tasks at a time.
+
+The job number is that of the game process, marked as local, as in
+local1234, so that sumgame does not take it for a batch job when it
+asks SLURM accounting (but reads its task records). The exit status,
+wall time and maximum resident set size of each task are appended to
+its .out log and reported in stdout when all tasks are done.
+
+'''
+
+from concurrent.futures import ThreadPoolExecutor
+from subprocess import Popen, DEVNULL
+import os, time
+
+from libvrt.slurmjob import jobscript, separate
+from libvrt.slurmout import setup
+
+def runlocal(args):
+    '''Run the tasks of the job that args describe in a pool of
+    args.local processes. Return 0 if every task exited with status 0,
+    else 1.
+
+    '''
+
+    logdir, _ = setup(args)
+    headargs, tailargs = separate(args)
+    script = jobscript(args)
+
+    job = 'local{}'.format(os.getpid())
+    scriptpath = os.path.join(logdir, '{}-{}.sh'.format(job, args.job))
+    with open(scriptpath, 'w', encoding = 'UTF-8') as ous:
+        print(script, file = ous)
+        # the status of the task is that of the command
+        print('exit $status', file = ous)
+
+    print('Running local job', job, flush = True)
+
+    def run1(task):
+        return runtask(scriptpath, job, task,
+                       logdir = logdir, name = args.job)
+
+    tasks = range(1, 1 + (len(tailargs) or 1))
+    with ThreadPoolExecutor(max_workers = args.local) as pool:
+        results = list(pool.map(run1, tasks))
+
+    print('task', 'status', 'wall', 'maxrss', 'arg', sep = '\t')
+    for (task, status, wall, maxrss), arg in zip(results,
+                                                 tailargs or ['(none)']):
+        print(task, status, clock(wall), '{}K'.format(maxrss), arg,
+              sep = '\t')
+
+    return int(any(status for task, status, wall, maxrss in results))
+
+def runtask(scriptpath, job, task, *, logdir, name):
+    '''Run task of job in scriptpath with stdout and stderr in the log
+    files of the task, and wait for it. Return the task number, exit
+    status (negative signal number if killed), wall time in seconds,
+    and maximum resident set size in kibibytes (of the task process
+    and any of its descendants).
+
+    '''
+
+    base = os.path.join(logdir, '{}-{}-{}'.format(job, task, name))
+    env = dict(os.environ,
+               SLURM_JOB_ID = job,
+               SLURM_ARRAY_JOB_ID = job,
+               SLURM_ARRAY_TASK_ID = str(task),
+               SLURM_JOB_NAME = name)
+
+    start = time.monotonic()
+    with open(base + '.out', 'wb') as out, open(base + '.err', 'wb') as err:
+        proc = Popen([ 'bash', scriptpath ],
+                     stdin = DEVNULL,
+                     stdout = out,
+                     stderr = err,
+                     env = env)
+        # wait4 rather than wait, for the resource usage of the task
+        _, code, usage = os.wait4(proc.pid, 0)
+        proc.returncode = status = os.waitstatus_to_exitcode(code)
+    wall = time.monotonic() - start
+
+    with open(base + '.out', 'a', encoding = 'UTF-8') as out:
+        print('local task:', task, file = out)
+        print('exit status:', status, file = out)
+        print('wall time:', clock(wall), file = out)
+        print('max rss: {}K'.format(usage.ru_maxrss), file = out)
+
+    return task, status, wall, usage.ru_maxrss
+
+def clock(seconds):
+    '''Format seconds as h:mm:ss.ss for a human reader.'''
+
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(int(minutes), 60)
+    return '{:d}:{:02d}:{:05.2f}'.format(hours, minutes, seconds)
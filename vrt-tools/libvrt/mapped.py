@@ -0,0 +1,137 @@
+# -*- mode: Python; -*-
+
+'''Support for reading a regular input file through a memory map, so
+that a tool can find lines and runs of lines in place, copying only
+what it needs, instead of having a buffered stream allocate a new
+bytes object for every line. Input that cannot be mapped (a pipe,
+stdin from a terminal, an empty file) is read as a stream as before.
+
+'''
+
+import io, mmap, os, re, stat
+
+from libvrt.nameline import isnameline
+
+def mmap_args(parser):
+    '''Add --mmap to parser, for a tool that can read its input file
+    through a memory map.
+
+    '''
+
+    parser.add_argument('--mmap', action = 'store_true',
+                        help = '''
+
+                        read a regular input file through a memory
+                        map (input from a pipe is read as usual)
+
+                        ''')
+
+def mapped(ins):
+    '''Return a read-only memory map of the rest of binary stream ins,
+    positioned at the current position of ins, or None if ins is not
+    a non-empty regular file.
+
+    '''
+
+    try:
+        fd = ins.fileno()
+        if not stat.S_ISREG(os.fstat(fd).st_mode):
+            return None
+        start = ins.tell()
+    except (AttributeError, OSError, ValueError, io.UnsupportedOperation):
+        return None
+
+    if start or os.fstat(fd).st_size == 0:
+        # a stream that has been read from is not mapped, and an
+        # empty file cannot be mapped
+        return None
+
+    return mmap.mmap(fd, 0, access = mmap.ACCESS_READ)
+
+def lines(mm, start = 0, end = None):
+    '''Yield the binary lines of memory map mm in the byte range from
+    start to end (default to the end of mm), starting at the start of
+    a line. The position of mm is left after the last line yielded,
+    so that the remaining lines can be taken in blocks.
+
+    '''
+
+    end = len(mm) if end is None else end
+    mm.seek(start)
+    for line in iter(mm.readline, b''):
+        yield line
+        if mm.tell() >= end:
+            return
+
+def blocks(mm, start = 0, *, size = 1 << 20):
+    '''Yield consecutive byte strings of roughly size bytes from memory
+    map mm, starting at start, each ending at the end of a line (or of
+    mm), so that the lines in a block can be split out at once.
+
+    '''
+
+    end = len(mm)
+    while start < end:
+        stop = mm.find(b'\n', min(start + size, end) - 1)
+        stop = end if stop < 0 else stop + 1
+        yield mm[start:stop]
+        start = stop
+
+def spans(mm, start, skip):
+    '''Yield memoryview slices of memory map mm from start, which must
+    be just after a newline, to the end, leaving out each line that is
+    matched by compiled binary pattern skip. The pattern matches the
+    preceding newline and the content of a line to be left out (which
+    is then followed by a newline or the end of mm), so the search
+    can skip from newline to newline in C.
+
+    '''
+
+    view = memoryview(mm)
+    here, end = start, len(mm)
+    for match in skip.finditer(mm, start - 1):
+        if here <= match.start():
+            yield view[here:match.start() + 1]
+        here = match.end() + 1
+
+    if here < end:
+        yield view[here:end]
+
+def kept(mm, start, keep):
+    '''Yield the lines of memory map mm from start, which must be at the
+    start of a line, in blocks, with blank lines and positional-attribute
+    name lines left out, other markup lines as they are, and the fields
+    of each token line reduced to those that keep returns from the
+    list of fields, the way vrt-keep and vrt-drop do.
+
+    '''
+
+    for block in blocks(mm, start):
+        pieces = block.split(b'\n')
+        tail = pieces.pop()
+        shipped = []
+        for line in pieces:
+            if not line or line.isspace():
+                continue
+            if line.startswith(b'<'):
+                if not isnameline(line):
+                    shipped.append(line)
+                continue
+            shipped.append(b'\t'.join(keep(line.rstrip(b'\r').split(b'\t'))))
+
+        shipped.append(b'')
+        yield b'\n'.join(shipped)
+
+        # only the very last line can be without a newline
+        if not tail or tail.isspace() or isnameline(tail):
+            pass
+        elif tail.startswith(b'<'):
+            yield tail
+        else:
+            yield b'\t'.join(keep(tail.rstrip(b'\r').split(b'\t')))
+            yield b'\n'
+
+# a blank line or a positional-attributes comment, after a newline,
+# for spans to skip
+NAMES_OR_BLANK = re.compile(br'\n(?:<!-- #vrt positional-attributes: [^\n]*'
+                            br'|[ \t\r\x0b\x0c]*)(?=\n|\Z)')
@@ -28,6 +28,12 @@ alternative protocol.
    process must write its stderr to a PIPE and pr1_read_stderr must
    deal with it.
 
+6. Optionally (see worker_args), the external tool is run as several
+   processes that receive consecutive batches of sentences in turn.
+   The process given by the implementation is the first worker, and
+   the others are started with the same command. Output is combined
+   in the original order of the sentences.
+
 A particular tool is implemented as a module that provides the
 tool-specific functionality.
 
@@ -36,13 +42,40 @@ tool-specific functionality.
 import sys
 from itertools import filterfalse, groupby
 from queue import Queue
+from subprocess import Popen, PIPE
 from threading import Thread
 
+from libvrt.args import nat
 from libvrt.bad import BadData, BadCode
 
 NAMES, OUTER, INNER, TAGS, BEGIN, META, DATA, JOIN, KEEP = range(2, 11)
 
-def transput(args, imp, proc, ins, ous):
+def worker_args(parser):
+    '''Add to the argument parser of a pr1 tool the options that
+    control the number of external processes.
+
+    '''
+
+    parser.add_argument('--workers', metavar = 'N',
+                        type = nat, default = 1,
+                        help = '''
+
+                        number of external processes to run in
+                        parallel, each receiving batches of sentences
+                        in turn (default 1)
+
+                        ''')
+    parser.add_argument('--batch', metavar = 'N',
+                        type = nat, default = 100,
+                        help = '''
+
+                        number of consecutive sentences to send to
+                        each external process in turn when there are
+                        many (default 100)
+
+                        ''')
+
+def transput(args, imp, proc, ins, ous, *, env = None, cwd = None):
 
     '''Set up a thread that pushes a (segmented) copy of ins to a queue
     and uses imp to feed proc with input sentences from ins. Combine
@@ -52,8 +85,16 @@ def transput(args, imp, proc, ins, ous):
     If there is imp.pr1_read_stderr, set it to read all of proc.stderr
     in yet another thread.
 
+    If args.workers is more than 1, start further copies of proc and
+    distribute the sentences to them in batches of args.batch, so
+    that each copy has its own stdout and stderr reader threads. The
+    copies are started with env and cwd, which should be those that
+    proc was started with (Popen does not remember them).
+
     '''
 
+    procs = _multiply(args, proc, env = env, cwd = cwd)
+
     matter = _segment(ins, imp)
     kind, head = next(matter)
 
@@ -66,25 +107,39 @@ def transput(args, imp, proc, ins, ous):
     copy.put((NAMES, names))
     copy.put((OUTER, head))
 
+    # order is only used when there are many workers: it receives the
+    # index of the worker that produces each next new component
+    order = Queue()
+
     imp.pr1_test(meta = head)
     feed = Thread(target = _separate,
-                  args = (args, imp, matter, copy, proc),
+                  args = (args, imp, matter, copy, procs, order),
                   name = 'Separation Thread',
                   daemon = True)
     feed.start()
 
+    deals = []
     if hasattr(imp, 'pr1_read_stderr'):
-        deal = Thread(target = _readerr,
-                      args = (args, imp, proc),
-                      name = 'Diagnostic Thread',
-                      daemon = True)
-        deal.start()
+        for proc in procs:
+            deal = Thread(target = _readerr,
+                          args = (args, imp, proc),
+                          name = 'Diagnostic Thread',
+                          daemon = True)
+            deal.start()
+            deals.append(deal)
+
+    if len(procs) == 1:
+        news = imp.pr1_read(procs[0].stdout)
+        reads = []
+    else:
+        news, reads = _relay(imp, procs, order)
 
-    _combinate(args, imp, copy, proc, ous)
+    _combinate(args, imp, copy, news, ous)
 
-    # proc should have run its course by now; the 30 second timeout
+    # procs should have run their course by now; the 30 second timeout
     # may or may not be either wildly excessive or sufficient
-    code = proc.wait(timeout = 30)
+    codes = [ proc.wait(timeout = 30) for proc in procs ]
+    code = next((code for code in codes if code), 0)
 
     if not copy.empty():
         raise BadCode('copy queue is not empty')
@@ -97,16 +152,45 @@ def transput(args, imp, proc, ins, ous):
     if feed.is_alive():
         raise BadCode('separation thread is still alive')
 
+    # worker output readers have seen the end of their streams once
+    # the procs have been waited for
+    for read in reads:
+        read.join(5)
+        if read.is_alive():
+            raise BadCode('worker reading thread is still alive')
+
     # proc is surely not writing anything to its stderr any more,
     # having been waited for, but let the stderr-reading thread have
     # five more seconds to finish, should it still be there
-    if hasattr(imp, 'pr1_read_stderr'):
+    for deal in deals:
         deal.join(5)
         if deal.is_alive():
             raise BadCode('diagnostic thread is still alive')
 
     return code
 
+def _multiply(args, proc, *, env, cwd):
+    '''Return a list of args.workers processes (at least one), where the
+    first is proc and the rest run the same command with the same
+    kind of standard streams, in the environment env and the working
+    directory cwd.
+
+    '''
+
+    try: workers = args.workers
+    except AttributeError: workers = 1
+
+    procs = [ proc ]
+    for k in range(1, max(1, workers)):
+        procs.append(Popen(proc.args,
+                           stdin = PIPE,
+                           stdout = PIPE,
+                           stderr = (None if proc.stderr is None else PIPE),
+                           env = env,
+                           cwd = cwd))
+
+    return procs
+
 def _segment(ins, imp):
     '''Yield non-empty input lines in classified groups.
 
@@ -169,10 +253,10 @@ def _extract(head):
     names = line.split()[3:-1]
     return names
 
-def _separate(args, imp, matter, copy, proc):
+def _separate(args, imp, matter, copy, procs, order):
     '''Running in another thread, put all incoming matter (segmented ins)
     to copy (a queue of classified groups of lines) and send some of
-    the sentences to proc according to imp. Finally put a sentinel in
+    the sentences to procs according to imp. Finally put a sentinel in
     copy.
 
     Matter comes in as TAGS/BEGIN, OUTER, INNER (INNER containing DATA
@@ -190,21 +274,32 @@ def _separate(args, imp, matter, copy, proc):
     Only use JOIN if there is imp.pr1_join, and then imp.pr1_read
     produces a data component for the sentence.
 
+    With many procs, send sentences to each proc in turn, in batches
+    of args.batch sentences, and put to order the index of the proc
+    for each component that the proc is to produce.
+
     '''
 
     # whether imp.pr1_read produces data components or not
     SENT = (JOIN if hasattr(imp, 'pr1_join') else KEEP)
 
+    try: batch = max(1, args.batch)
+    except AttributeError: batch = 1
+
+    # index of current proc and count of sentences sent to it
+    turn, sent = 0, 0
+
     for kind, lines in matter:
         if kind == BEGIN:
             # imp.pr1_read produces meta components
             # for sent sentences (put to copy as BEGIN)
             # not for skipped (put to copy as TAGS)
             imp.pr1_test(tags = lines)
-            copy.put((( BEGIN
-                        if imp.pr1_test()
-                        else TAGS ),
-                      lines))
+            if imp.pr1_test():
+                copy.put((BEGIN, lines))
+                order.put(turn)
+            else:
+                copy.put((TAGS, lines))
         elif kind == TAGS:
             copy.put((kind, lines))
             imp.pr1_test(tags = lines)
@@ -214,20 +309,90 @@ def _separate(args, imp, matter, copy, proc):
         elif imp.pr1_test():
             # kind == INNER
             copy.put((SENT, lines))
+            SENT == JOIN and order.put(turn)
             imp.pr1_send((line for kind, line in lines
                           if kind == DATA),
-                         proc)
+                         procs[turn])
+            sent += 1
+            if sent == batch:
+                turn, sent = (turn + 1) % len(procs), 0
         else:
             # kind == INNER
             copy.put((KEEP, lines))
     else:
         copy.put((None, ()))
-        proc.stdin.close()
+        order.put(None)
+        for proc in procs:
+            proc.stdin.close()
 
-def _combinate(args, imp, copy, proc, ous):
-    '''In the main thread.'''
+def _relay(imp, procs, order):
+    '''Start a thread for each proc to read its output components into
+    a queue of its own. Return an iterator of the components in their
+    original order, taken from the queue of each proc as indicated by
+    order, and the list of the reading threads.
+
+    Data components are read into tuples in the reading thread, so
+    that the process does not block on a full stdout while the main
+    thread waits for another process.
+
+    '''
+
+    queues = [ Queue() for proc in procs ]
+    reads = []
+    for proc, queue in zip(procs, queues):
+        read = Thread(target = _readout,
+                      args = (imp, proc, queue),
+                      name = 'Worker Reading Thread',
+                      daemon = True)
+        read.start()
+        reads.append(read)
+
+    def news():
+        for turn in iter(order.get, None):
+            new = queues[turn].get()
+            if isinstance(new, _Ended):
+                # order still expects a component from this worker
+                if new.exn is not None: raise new.exn
+                raise BadData('output of worker {} ended early'
+                              .format(turn + 1))
+            yield new
+
+    return news(), reads
 
-    news = imp.pr1_read(proc.stdout)
+class _Ended:
+    '''The end of the components from a worker, with the exception that
+    ended them, if any.
+
+    '''
+
+    def __init__(self, exn = None):
+        self.exn = exn
+
+def _readout(imp, proc, queue):
+    '''Running in another thread, put each component from proc to queue,
+    data components as tuples. When there are both meta and data
+    components, they alternate, meta first. (A data component must
+    remain an iterator.) Finally put an _Ended, with the exception
+    from imp.pr1_read if there was one.
+
+    '''
+
+    meta = hasattr(imp, 'pr1_join_meta')
+    data = hasattr(imp, 'pr1_join')
+    ended = _Ended()
+    try:
+        for k, new in enumerate(imp.pr1_read(proc.stdout)):
+            if data and not (meta and k % 2 == 0):
+                new = iter(tuple(new))
+            queue.put(new)
+    except Exception as exn:
+        ended.exn = exn
+    finally:
+        # so that the main thread does not wait for more in vain
+        queue.put(ended)
+
+def _combinate(args, imp, copy, news, ous):
+    '''In the main thread.'''
 
     kind, old = copy.get(block = False)
     while kind is not None:
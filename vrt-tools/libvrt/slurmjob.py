@@ -31,12 +31,18 @@ def moduleloader(args):
     return kieli
 
 # Depending on the output options, command is one of:
-# cmd arg ... args[TASK_ID]
-# cmd arg ... args[TASK_ID] > outfile
-# cmd arg ... args[TASK_ID] > tempfile
+# game-task ... cmd arg ... args[TASK_ID]
+# game-task ... cmd arg ... args[TASK_ID] > outfile
+# game-task ... cmd arg ... args[TASK_ID] > tempfile
 # with appropriate quotation for the shell,
 # where arg ... are the arguments before //
-# and args[TASK_ID] omitted if there no //.
+# and args[TASK_ID] omitted if there no //,
+# and game-task records the resource usage of the
+# task in the log directory for sumgame --records.
+
+# game-task is next to game
+GAMETASK = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'game-task')
 
 def separate(args):
     haumeniseparators = args.argument.count('//')
@@ -126,6 +132,7 @@ outfile={outfile}
 outstem="${{infile##*/}}"
 outstem="${{outstem%%.*}}"
 outfile="${{outfile//<>/$outstem}}"
+record={logdir}/"$SLURM_ARRAY_JOB_ID-$SLURM_ARRAY_TASK_ID-"{record}
 
 echo command: {logcommand}
 echo nth arg: "$infile"
@@ -174,7 +181,16 @@ date "+%F %T FINISH IN $time WITH STATUS $status"
 
     # TODO rewrite those chains without chain now at Python 3.5
 
-    command = ' '.join(chain([quote(args.command)],
+    gametask = ' '.join((quote(GAMETASK),
+                         '--record "$record"',
+                         '--job "$SLURM_ARRAY_JOB_ID"',
+                         '--task "$SLURM_ARRAY_TASK_ID"',
+                         '--time', quote(args.time),
+                         '--memory', quote(args.memory),
+                         '--cores', quote(str(args.cores)),
+                         '--'))
+
+    command = ' '.join(chain([gametask, quote(args.command)],
                              map(quote, headargs),
                              ( [ '"$infile"' ]
                                if tailargs else
@@ -205,6 +221,8 @@ date "+%F %T FINISH IN $time WITH STATUS $status"
                       err = quote(os.path.join(args.log, '%A-%a-{}.err'
                                                .format(args.job))),
                       last = len(tailargs) or 1,
+                      logdir = quote(logdir),
+                      record = quote('{}.tsv'.format(args.job)),
                       workdir = quote(os.getcwd()),
                       logcommand = quote(logcommand),
                       kieli = moduleloader(args),
@@ -1,6 +1,7 @@
 from bisect import bisect_left
 from itertools import accumulate
 from re import findall
+import json
 
 def quant(counter, m):
     '''Return m + 1 values that are keys of counter, in their natural
@@ -8,8 +9,13 @@ def quant(counter, m):
     they, exactly) of the counts, ceiling(k T / m) for 0 <= k <= m,
     with T the sum of the counts.
 
+    The counter can also be a Sketch, which then provides the values.
+
     '''
 
+    if isinstance(counter, Sketch):
+        return counter.quant(m)
+
     vals = sorted(counter.keys())
     seen = tuple(accumulate(counter[val] for val in vals))
     T = seen[-1]
@@ -32,3 +38,134 @@ def max_length(regex):
         return max((len(hit) for hit in findall(regex, text)),
                    default = 0)
     return stat
+
+class Sketch:
+    '''A bounded-memory summary of observed values, for quant, that can be
+    merged with other sketches and written and read as a line of text.
+    This is a KLL sketch (Karnin, Lang, Liberty 2016) where a compactor
+    at level h holds values of weight 2 ** h, with a deterministic
+    choice of which half of a compacted level is promoted, so that
+    results are repeatable. Minimum and maximum are kept exactly.
+
+    As long as fewer values have been observed than fit in the first
+    compactor, quant gives the same results as for a Counter of the
+    values. The number of values kept is in the order of 3 k.
+
+    '''
+
+    def __init__(self, k = 200):
+        self.k = k
+        self.n = 0
+        self.lo = None
+        self.hi = None
+        self.flips = 0
+        self.levels = [[]]
+        self.size = 0
+        self.maxsize = self._capacity(0)
+
+    def _capacity(self, h):
+        depth = len(self.levels) - h - 1
+        return max(2, -(-self.k * 2 ** depth // 3 ** depth))
+
+    def _grow(self):
+        self.levels.append([])
+        self.maxsize = sum(map(self._capacity, range(len(self.levels))))
+
+    def add(self, value):
+        '''Observe value.'''
+        if self.n == 0:
+            self.lo = self.hi = value
+        elif value < self.lo:
+            self.lo = value
+        elif value > self.hi:
+            self.hi = value
+
+        self.n += 1
+        self.levels[0].append(value)
+        self.size += 1
+        if self.size >= self.maxsize:
+            self._compress()
+
+    def merge(self, other):
+        '''Observe all that other has observed.'''
+        if other.n == 0:
+            return
+
+        if self.n == 0:
+            self.lo, self.hi = other.lo, other.hi
+        else:
+            self.lo = min(self.lo, other.lo)
+            self.hi = max(self.hi, other.hi)
+
+        self.n += other.n
+        while len(self.levels) < len(other.levels):
+            self._grow()
+        for level, items in zip(self.levels, other.levels):
+            level.extend(items)
+
+        self.size = sum(map(len, self.levels))
+        while self.size >= self.maxsize:
+            self._compress()
+
+    def _compress(self):
+        for h, items in enumerate(self.levels):
+            if len(items) < self._capacity(h):
+                continue
+
+            if h + 1 == len(self.levels):
+                self._grow()
+
+            # promote every other value of sorted pairs; an odd value
+            # out (the least) remains
+            items.sort()
+            self.flips += 1
+            rest = len(items) % 2
+            self.levels[h + 1].extend(items[rest + self.flips % 2::2])
+            del items[rest:]
+
+            self.size = sum(map(len, self.levels))
+            if self.size < self.maxsize:
+                break
+
+    def quant(self, m):
+        '''Return m + 1 values as quant does for a Counter of the observed
+        values (approximately, after compaction).
+
+        '''
+
+        pairs = sorted((value, 1 << h)
+                       for h, items in enumerate(self.levels)
+                       for value in items)
+        vals = tuple(value for value, weight in pairs)
+        seen = tuple(accumulate(weight for value, weight in pairs))
+        T = seen[-1]
+
+        return (self.lo,
+                *(vals[bisect_left(seen, -(-k * T // m))]
+                  for k in range(1, m)),
+                self.hi)
+
+    def dumps(self):
+        '''Return a single-line text representation for loads.'''
+        return json.dumps(dict(k = self.k,
+                               n = self.n,
+                               lo = self.lo,
+                               hi = self.hi,
+                               flips = self.flips,
+                               levels = self.levels),
+                          separators = (',', ':'))
+
+    @classmethod
+    def loads(cls, text):
+        '''Return a sketch from its representation by dumps.'''
+        data = json.loads(text)
+        sketch = cls(data['k'])
+        sketch.n = data['n']
+        sketch.lo = data['lo']
+        sketch.hi = data['hi']
+        sketch.flips = data['flips']
+        sketch.levels = data['levels']
+        sketch.size = sum(map(len, sketch.levels))
+        sketch.maxsize = sum(map(sketch._capacity,
+                                 range(len(sketch.levels))))
+        return sketch
@@ -17,9 +17,12 @@ import os, grp, sys
 from libvrt.bad import BadData
 from libvrt.gameargs import parsearguments, checkbill
 from libvrt.slurmjob import jobscript
+from libvrt.localjob import runlocal
 
 def submit(args):
     try:
+        if args.local and not args.cat:
+            exit(runlocal(args))
         checkbill(args)
         script = jobscript(args)
         proc = run([ 'cat' if args.cat else 'sbatch' ],
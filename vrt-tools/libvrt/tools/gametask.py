@@ -0,0 +1,97 @@
+from subprocess import Popen
+from argparse import REMAINDER
+import resource, sys, time
+
+from libvrt.args import version_args
+
+# names of the fields of a task record (sidecar file), the same for
+# local and batch runs: times in seconds, memory in kibibytes, i/o in
+# bytes, and the requested time, memory and cores as in the job
+HEAD = ('job', 'task', 'status',
+        'elapsed', 'user', 'system', 'maxrss',
+        'rchar', 'wchar', 'read_bytes', 'write_bytes',
+        'timelimit', 'reqmem', 'ncpus')
+
+def parsearguments(argv, *, prog = None):
+
+    description = '''
+
+    Run a command as a task of a game job and record its exit status,
+    wall time, processor time, maximum resident set size and i/o bytes
+    in a record file (a one-record TSV file with a head) that sumgame
+    can summarize. Exit with the status of the command.
+
+    '''
+
+    parser = version_args(description = description)
+
+    parser.add_argument('command',
+                        help = '''the name of an executable command''')
+    parser.add_argument('argument', metavar = '...', nargs = REMAINDER,
+                        help = '''the arguments to the command''')
+
+    parser.add_argument('--record', metavar = 'file', required = True,
+                        help = '''the record file to write''')
+    parser.add_argument('--job', metavar = 'num', default = '',
+                        help = '''the job number to record''')
+    parser.add_argument('--task', metavar = 'num', default = '',
+                        help = '''the task number to record''')
+    parser.add_argument('--time', metavar = 'h:mm:ss', default = '',
+                        help = '''the requested time to record''')
+    parser.add_argument('--memory', metavar = 'size', default = '',
+                        help = '''the requested memory to record''')
+    parser.add_argument('--cores', metavar = 'num', default = '',
+                        help = '''the requested cores to record''')
+
+    args = parser.parse_args(argv)
+    args.prog = prog or parser.prog
+
+    return args
+
+def main(args):
+    io0 = readio()
+    start = time.monotonic()
+    try:
+        proc = Popen([ args.command, *args.argument ])
+    except OSError as exn:
+        print('{}: error:'.format(args.prog), exn, file = sys.stderr)
+        status = 127
+    else:
+        status = proc.wait()
+    elapsed = time.monotonic() - start
+    io1 = readio()
+
+    # only the one command has been waited for
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+
+    record = (
+        args.job, args.task, status,
+        '{:.2f}'.format(elapsed),
+        '{:.2f}'.format(usage.ru_utime),
+        '{:.2f}'.format(usage.ru_stime),
+        usage.ru_maxrss,
+        *(io1[name] - io0[name] if name in io0 and name in io1 else ''
+          for name in HEAD[7:11]),
+        args.time, args.memory, args.cores
+    )
+
+    with open(args.record, 'w', encoding = 'UTF-8') as ous:
+        print(*HEAD, sep = '\t', file = ous)
+        print(*record, sep = '\t', file = ous)
+
+    exit(status if status >= 0 else 128 - status)
+
+def readio():
+    '''Return the i/o counters in /proc/self/io as a dict, or an empty
+    dict where there are none. They include the counts of the children
+    that have been waited for.
+
+    '''
+
+    try:
+        with open('/proc/self/io', encoding = 'UTF-8') as ins:
+            return { name : int(value)
+                     for name, value
+                     in (line.split(':') for line in ins) }
+    except (OSError, ValueError):
+        return {}
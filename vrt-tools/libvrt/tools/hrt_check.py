@@ -4,7 +4,10 @@
 
 from libvrt.args import BadData, nat
 from libvrt.args import multiput_args
-from libvrt.args import transput
+from libvrt.args import inputstream, outputstream
+from libvrt.check import Report, checking, feed
+from libvrt.chunk import ranges, lines
+from libvrt.mapped import mmap_args, mapped, lines as maplines
 
 from libvrt.tools import hrt_check_utf8
 from libvrt.tools import hrt_check_meta
@@ -15,6 +18,13 @@ from libvrt.tools import hrt_check_tags
 from libvrt.tools import hrt_check_bidi
 from libvrt.tools import hrt_check_shy
 
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from copy import copy
+from itertools import repeat
+from tempfile import mkstemp
+import os, sys
+
 from datetime import datetime as datetime
 def _secs(): return datetime.now().isoformat(' ', timespec = 'seconds')
 
@@ -66,152 +76,232 @@ def parsearguments(argv, *, prog = None):
 
                         ''')
 
+    parser.add_argument('--jobs', '-j', metavar = 'N',
+                        default = 1,
+                        type = nat,
+                        help = '''
+
+                        Check N (1) parts of the input file in
+                        parallel processes, combining the reports
+                        as if checked in one process.
+
+                        ''')
+
+    mmap_args(parser)
+
     args = parser.parse_args(argv)
     args.prog = prog or parser.prog
 
     return args
 
+# Each check: module, name, description, output suffix, options,
+# whether the check reads binary (not decoded) lines, whether it
+# writes binary.
+CHECKS = (
+    (hrt_check_utf8, 'utf8',
+     'whether a line is UTF-8 at all',
+     'utf8', [ '--limit=10' ], True, False),
+    (hrt_check_meta, 'meta',
+     'whether structure lines are well-formed',
+     # hrt-check-meta does not have --limit (yet?)
+     'meta', [], True, True),
+    (hrt_check_control, 'control',
+     'whether there are control codes',
+     'ctl', [ '--limit=100' ], False, False),
+    (hrt_check_nonchar, 'nonchar',
+     'whether there are noncharacter codes',
+     'non', [ '--limit=100' ], False, False),
+    (hrt_check_private, 'private',
+     'whether there are private codes',
+     'priv', [ '--limit=100' ], False, False),
+    (hrt_check_tags, 'tags',
+     'whether there are tag (flag) codes',
+     'tag', [ '--limit=100' ], False, False),
+    (hrt_check_bidi, 'bidi',
+     'whether there are bidi codes',
+     'bidi', [ '--limit=100' ], False, False),
+    (hrt_check_shy, 'shy',
+     'whether there are soft hyphens',
+     'shy', [ '--limit=100' ], False, False),
+)
+
 def main(args, infile, outfile):
     '''Check HRT input file, direct reports to output files, as specified
     in args. Receives infile and outfile as strings, extends outfile
     with appropriate suffix for each output file.
 
+    Read and decode the input file only once, sending each line to
+    every check that is still running, or, with args.jobs, have
+    parallel processes read a part each. Write each report to a
+    temporary file first and rename them all at the end.
+
     '''
 
     # print('infile:', infile)
     # print('outfile:', outfile)
 
-    now = _secs()
-    args.quiet or print('{} -- {} (utf8)'.format(now, args.prog))
-    args.quiet or print('{} -- whether a line is UTF-8 at all'
-                        .format(now))
-    args.quiet or print('{} {}.utf8'.format(now, outfile))
-    transput(hrt_check_utf8.parsearguments
-             (
-                 [
-                     '--out', outfile + '.utf8',
-                     '--limit=10',
-                     infile
-                 ],
-                 prog = '{} (utf8)'.format(args.prog)
-             ),
-             hrt_check_utf8.main,
-             in_as_text = False)
+    for module, name, note, suffix, options, bin_in, bin_out in CHECKS:
+        if os.path.exists(outfile + '.' + suffix):
+            print('{}: --out file must not exist: {}'
+                  .format(args.prog, outfile + '.' + suffix),
+                  file = sys.stderr)
+            exit(1)
 
     now = _secs()
-    args.quiet or print('{} -- {} (meta)'.format(now, args.prog))
-    args.quiet or print('{} -- whether structure lines are well-formed'
-                        .format(now))
-    args.quiet or print('{} {}.meta'.format(now, outfile))
-    transput(hrt_check_meta.parsearguments
-             (
-                 [
-                     '--out', outfile + '.meta',
-                     # hrt-check-meta does not have --limit (yet?)
-                     # '--limit=100',
-                     infile
-                 ],
-                 prog = '{} (meta)'.format(args.prog)
-             ),
-             hrt_check_meta.main,
-             in_as_text = False,
-             out_as_text = False)
+    temps = []
+    subs = []
+    with ExitStack() as stack:
+        for module, name, note, suffix, options, bin_in, bin_out in CHECKS:
+            args.quiet or print('{} -- {} ({})'.format(now, args.prog, name))
+            args.quiet or print('{} -- {}'.format(now, note))
+            args.quiet or print('{} {}.{}'.format(now, outfile, suffix))
+
+            sub = module.parsearguments([ '--out', outfile + '.' + suffix,
+                                          *options,
+                                          infile ],
+                                        prog = '{} ({})'.format(args.prog,
+                                                                name))
+
+            head, tail = os.path.split(sub.outfile)
+            fd, temp = mkstemp(dir = head, prefix = tail + '.',
+                               suffix = '.tmp')
+            os.close(fd)
+            temps.append((temp, sub.outfile))
+
+            ous = stack.enter_context(outputstream(temp, not bin_out))
+            subs.append((sub, Report(ous, binary = bin_out)))
+
+        try:
+            if args.jobs > 1:
+                _parallel(args, infile, subs)
+            else:
+                _sequential(args, infile, subs)
+        except BadData as exn:
+            print(args.prog + ':', exn, file = sys.stderr)
+            print(args.prog + ': leaving output in',
+                  *(temp for temp, out in temps),
+                  file = sys.stderr)
+            exit(1)
+
+    for temp, out in temps:
+        os.rename(temp, out)
 
     now = _secs()
-    args.quiet or print('{} -- {} (control)'.format(now, args.prog))
-    args.quiet or print('{} -- whether there are control codes'
-                        .format(now))
-    args.quiet or print('{} {}.ctl'.format(now, outfile))
-    transput(hrt_check_control.parsearguments
-             (
-                 [
-                     '--out', outfile + '.ctl',
-                     '--limit=100',
-                     infile
-                 ],
-                 prog = '{} (control)'.format(args.prog)
-             ),
-             hrt_check_control.main)
+    args.quiet or print('{} -- {} (done)'.format(now, args.prog))
 
-    now = _secs()
-    args.quiet or print('{} -- {} (nonchar)'.format(now, args.prog))
-    args.quiet or print('{} -- whether there are noncharacter codes'
-                        .format(now))
-    args.quiet or print('{} {}.non'.format(now, outfile))
-    transput(hrt_check_nonchar.parsearguments
-             (
-                 [
-                     '--out', outfile + '.non',
-                     '--limit=100',
-                     infile
-                 ],
-                 prog = '{} (nonchar)'.format(args.prog)
-             ),
-             hrt_check_nonchar.main)
+def _sequential(args, infile, subs):
+    '''Run each check in CHECKS, with its arguments and report in subs,
+    over infile.
 
-    now = _secs()
-    args.quiet or print('{} -- {} (private)'.format(now, args.prog))
-    args.quiet or print('{} -- whether there are private codes'
-                        .format(now))
-    args.quiet or print('{} {}.priv'.format(now, outfile))
-    transput(hrt_check_private.parsearguments
-             (
-                 [
-                     '--out', outfile + '.priv',
-                     '--limit=100',
-                     infile
-                 ],
-                 prog = '{} (private)'.format(args.prog)
-             ),
-             hrt_check_private.main)
+    '''
 
-    now = _secs()
-    args.quiet or print('{} -- {} (tags)'.format(now, args.prog))
-    args.quiet or print('{} -- whether there are tag (flag) codes'
-                        .format(now))
-    args.quiet or print('{} {}.tag'.format(now, outfile))
-    transput(hrt_check_tags.parsearguments
-             (
-                 [
-                     '--out', outfile + '.tag',
-                     '--limit=100',
-                     infile
-                 ],
-                 prog = '{} (tags)'.format(args.prog)
-             ),
-             hrt_check_tags.main)
+    binary, text = [], []
+    for check, (sub, report) in zip(CHECKS, subs):
+        module, name, note, suffix, options, bin_in, bin_out = check
+        checker = module.checker(sub, report)
+        (binary if bin_in else text).append(checker)
+
+    with inputstream(infile, False) as ins:
+        mm = mapped(ins) if args.mmap else None
+        checking(ins if mm is None else maplines(mm),
+                 binary = binary, text = text)
+
+def _parallel(args, infile, subs):
+    '''Run each check in CHECKS over parts of infile in args.jobs
+    processes, then have the check, with its arguments and report in
+    subs, see those lines that it reported on in any part, numbered
+    as in the whole file. Checks are line-local, so the reports are
+    the same as if the whole file was checked at once, including any
+    limit on the number of lines reported.
 
-    now = _secs()
-    args.quiet or print('{} -- {} (bidi)'.format(now, args.prog))
-    args.quiet or print('{} -- whether there are bidi codes'
-                        .format(now))
-    args.quiet or print('{} {}.bidi'.format(now, outfile))
-    transput(hrt_check_bidi.parsearguments
-             (
-                 [
-                     '--out', outfile + '.bidi',
-                     '--limit=100',
-                     infile
-                 ],
-                 prog = '{} (bidi)'.format(args.prog)
-             ),
-             hrt_check_bidi.main)
+    '''
 
-    now = _secs()
-    args.quiet or print('{} -- {} (shy)'.format(now, args.prog))
-    args.quiet or print('{} -- whether there are soft hyphens'
-                        .format(now))
-    args.quiet or print('{} {}.shy'.format(now, outfile))
-    transput(hrt_check_shy.parsearguments
-             (
-                 [
-                     '--out', outfile + '.shy',
-                     '--limit=100',
-                     infile
-                 ],
-                 prog = '{} (shy)'.format(args.prog)
-             ),
-             hrt_check_shy.main)
+    parts = ranges(infile, 4 * args.jobs)
+    with ProcessPoolExecutor(max_workers = args.jobs) as pool:
+        results = list(pool.map(_part,
+                                repeat(infile),
+                                *zip(*parts),
+                                repeat([ sub for sub, report in subs ]),
+                                repeat(args.mmap)))
+
+    # line numbers before each part, binary and text
+    offsets, b0, t0 = [], 0, 0
+    for b, t, found in results:
+        offsets.append((b0, t0))
+        b0, t0 = b0 + b, t0 + t
+
+    for index, (check, (sub, report)) in enumerate(zip(CHECKS, subs)):
+        module, name, note, suffix, options, bin_in, bin_out = check
+        feed(module.checker(sub, report),
+             ((k + (b0 if bin_in else t0), line)
+              for (b0, t0), (b, t, found) in zip(offsets, results)
+              for k, line in found[index]))
+
+def _part(infile, start, end, subs, mapping):
+    '''Run each check in CHECKS, with its arguments in subs but without
+    a limit, over the lines in the byte range from start to end in
+    infile. Return the number of binary lines and text lines in the
+    range and, for each check, the numbered lines that it reported on,
+    up to the limit of the check. If mapping, read infile through a
+    memory map.
 
-    now = _secs()
-    args.quiet or print('{} -- {} (done)'.format(now, args.prog))
+    '''
+
+    binary, text, found = [], [], []
+    for check, sub in zip(CHECKS, subs):
+        module, name, note, suffix, options, bin_in, bin_out = check
+
+        limit = getattr(sub, 'limit', None)
+        if getattr(sub, 'no_limit', True):
+            limit = None
+
+        loose = copy(sub)
+        loose.no_limit = True
+
+        report = _Found()
+        found.append(report.lines)
+        checker = _finding(module.checker(loose, report), report, limit)
+        (binary if bin_in else text).append(checker)
+
+    with inputstream(infile, False) as ins:
+        mm = mapped(ins) if mapping else None
+        b, t = checking((lines(infile, start, end)
+                         if mm is None else
+                         maplines(mm, start, end)),
+                        binary = binary, text = text,
+                        count = True)
+
+    return b, t, found
+
+class _Found:
+    '''Stands for a Report, only noting whether there was a message.'''
+
+    def __init__(self):
+        self.seen = False
+        self.lines = []
+
+    def error(self, k, kind, what): self.seen = True
+    def warn(self, k, kind, what): self.seen = True
+    def info(self, k, kind, what): self.seen = True
+
+def _finding(checker, report, limit):
+    '''Run checker, noting in report each line that it reported on, until
+    there are limit such lines (if limit).
+
+    '''
+
+    next(checker)
+    while True:
+        item = yield
+        if item is None: break
+
+        report.seen = False
+        try:
+            checker.send(item)
+        except StopIteration:
+            return
+
+        if report.seen:
+            report.lines.append(item)
+            if limit and len(report.lines) >= limit:
+                return
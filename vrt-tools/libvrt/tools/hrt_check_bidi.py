@@ -8,8 +8,7 @@ https://en.wikipedia.org/wiki/Bidirectional_text
 
 from libvrt.args import BadData, nat
 from libvrt.args import transput_args
-from libvrt.check import setup_text
-from libvrt.check import error, warn, info
+from libvrt.check import Report, check
 
 import re
 
@@ -64,28 +63,35 @@ def main(args, ins, ous):
 
     '''
 
-    setup_text(ous)
+    check(checker(args, Report(ous, binary = False)), ins)
+
+def checker(args, report):
+    '''Receive numbered text lines to report on (see libvrt.check).'''
 
     # The characters themselves are valid in a regex range.
     BIDI = ''.join(('[', *sorted(bidicode.keys()), ']'))
     
     occurrences = 0
-    for k, line in enumerate(ins, start = 1):
+    while True:
+        item = yield
+        if item is None: break
+        k, line = item
+
         hits = re.findall(BIDI, line)
         if not hits: continue
 
         for hit in hits:
             occurrences += 1
-            warn(k, 'code', 'U+{:X} {}'
-                 .format(ord(hit), bidicode[hit]))
+            report.warn(k, 'code', 'U+{:X} {}'
+                        .format(ord(hit), bidicode[hit]))
 
         if occurrences >= args.limit and not args.no_limit:
-            warn(0, 'code',
-                 'stopped checking at {}'.format(args.limit))
+            report.warn(0, 'code',
+                        'stopped checking at {}'.format(args.limit))
             return
 
     if args.info and not occurrences:
-        info(0, 'code', 'no explicit BiDi codes')
+        report.info(0, 'code', 'no explicit BiDi codes')
 
 bidicode = {
     '\u016C' : 'ARABIC LETTER MARK (ALM)',
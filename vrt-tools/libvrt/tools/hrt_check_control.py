@@ -4,8 +4,7 @@
 
 from libvrt.args import BadData, nat
 from libvrt.args import transput_args
-from libvrt.check import setup_text
-from libvrt.check import error, warn, info
+from libvrt.check import Report, check
 
 import re
 
@@ -59,25 +58,32 @@ def main(args, ins, ous):
 
     '''
 
-    setup_text(ous)
+    check(checker(args, Report(ous, binary = False)), ins)
+
+def checker(args, report):
+    '''Receive numbered text lines to report on (see libvrt.check).'''
 
     # the characters themselves are valid in a regex
     CONTROLS = ''.join(('[', *sorted(tables), ']'))
 
     failures = 0
-    for k, line in enumerate(ins, start = 1):
+    while True:
+        item = yield
+        if item is None: break
+        k, line = item
+
         hits = re.findall(CONTROLS, line)
         if not hits: continue
 
         for hit in hits:
-            error(k, 'code', tables[hit])
+            report.error(k, 'code', tables[hit])
 
         failures += 1
         if failures >= args.limit and not args.no_limit:
             return
 
     if args.info and not failures:
-        info(0, 'code', 'no spurious control (C0, DEL, C1) codes')
+        report.info(0, 'code', 'no spurious control (C0, DEL, C1) codes')
 
 tables = {
     # C0 and DEL adapted from Linux programmer's manual, ASCII(7)
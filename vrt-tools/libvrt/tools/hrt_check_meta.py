@@ -4,8 +4,7 @@
 
 from libvrt.args import BadData
 from libvrt.args import transput_args
-from libvrt.check import setup_binary
-from libvrt.check import error, warn, info
+from libvrt.check import Report, check
 
 import re
 
@@ -35,33 +34,40 @@ def main(args, ins, ous):
 
     '''
 
-    setup_binary(ous)
+    check(checker(args, Report(ous, binary = True)), ins)
+
+def checker(args, report):
+    '''Receive numbered binary lines to report on (see libvrt.check).'''
 
     META = br'<[a-z._]+(\s+[a-z._]+/?="[^"]*")*>\r?\n?'
-    for k, line in enumerate(ins, start = 1):
+    while True:
+        item = yield
+        if item is None: break
+        k, line = item
+
         if (line.startswith(b'<') and
             not line.startswith(b'</')):
 
             if not re.fullmatch(META, line):
-                error(k, b'meta', b'malformed start tag')
+                report.error(k, b'meta', b'malformed start tag')
                 continue
 
             name = re.match(b'<([a-z_]+)', line).group(1)
-            check_name(args, ous, line, name)
+            check_name(args, report, line, name)
 
             attr = re.findall(b'(\S+)="(.*?)"', line)
-            check_attr(args, ous, line, name, attr)
+            check_attr(args, report, line, name, attr)
             
             # print('name:', name)
             # print('attr:', attr)
 
-def check_name(args, ous, line, name):
+def check_name(args, report, line, name):
     if name not in (b'text', b'paragraph'):
-        warn(line, b'meta',
-             b' '.join((b'unexpected element name:',
-                        name)))
+        report.warn(line, b'meta',
+                    b' '.join((b'unexpected element name:',
+                               name)))
 
-def check_attr(args, ous, line, name, attr):
+def check_attr(args, report, line, name, attr):
     # to check no duplicate names
     # to check no < > in values
     # to check order of names
@@ -11,8 +11,7 @@ characters, and yes, it spells "noncharacter" without a hyphen.)
 
 from libvrt.args import BadData, nat
 from libvrt.args import transput_args
-from libvrt.check import setup_text
-from libvrt.check import error, warn, info
+from libvrt.check import Report, check
 
 import re
 
@@ -63,7 +62,10 @@ def main(args, ins, ous):
 
     '''
 
-    setup_text(ous)
+    check(checker(args, Report(ous, binary = False)), ins)
+
+def checker(args, report):
+    '''Receive numbered text lines to report on (see libvrt.check).'''
 
     # The characters themselves are valid in a regex range; the last
     # two code points in any plane are "noncharacters", and there is
@@ -78,18 +80,22 @@ def main(args, ins, ous):
                     ']'))
 
     failures = 0
-    for k, line in enumerate(ins, start = 1):
+    while True:
+        item = yield
+        if item is None: break
+        k, line = item
+
         hits = re.findall(NONS, line)
         if not hits: continue
 
         for hit in hits:
-            error(k, 'code', 'noncharacter U+{:04X}'.format(ord(hit)))
+            report.error(k, 'code', 'noncharacter U+{:04X}'.format(ord(hit)))
 
         failures += 1
         if failures >= args.limit and not args.no_limit:
-            error(0, 'code',
-                  'stopped checking at {}'.format(args.limit))
+            report.error(0, 'code',
+                         'stopped checking at {}'.format(args.limit))
             return
 
     if args.info and not failures:
-        info(0, 'code', 'no noncharacters')
+        report.info(0, 'code', 'no noncharacters')
@@ -8,8 +8,7 @@ https://en.wikipedia.org/wiki/Private_Use_Areas
 
 from libvrt.args import BadData, nat
 from libvrt.args import transput_args
-from libvrt.check import setup_text
-from libvrt.check import error, warn, info
+from libvrt.check import Report, check
 
 import re
 
@@ -62,7 +61,10 @@ def main(args, ins, ous):
 
     '''
 
-    setup_text(ous)
+    check(checker(args, Report(ous, binary = False)), ins)
+
+def checker(args, report):
+    '''Receive numbered text lines to report on (see libvrt.check).'''
 
     # the characters themselves are valid in a regex range; the last
     # two code points in a plane are "non-characters" and excluded
@@ -75,18 +77,22 @@ def main(args, ins, ous):
                         ']'))
 
     failures = 0
-    for k, line in enumerate(ins, start = 1):
+    while True:
+        item = yield
+        if item is None: break
+        k, line = item
+
         hits = re.findall(PRIVATES, line)
         if not hits: continue
 
         for hit in hits:
-            error(k, 'code', 'private U+{:X}'.format(ord(hit)))
+            report.error(k, 'code', 'private U+{:X}'.format(ord(hit)))
 
         failures += 1
         if failures >= args.limit and not args.no_limit:
-            error(0, 'code',
-                  'stopped checking at {}'.format(args.limit))
+            report.error(0, 'code',
+                         'stopped checking at {}'.format(args.limit))
             return
 
     if args.info and not failures:
-        info(0, 'code', 'no private (BMP PUA; PUA-A, PUA-B) codes')
+        report.info(0, 'code', 'no private (BMP PUA; PUA-A, PUA-B) codes')
@@ -8,8 +8,7 @@ https://en.wikipedia.org/wiki/Soft_hyphen
 
 from libvrt.args import BadData, nat
 from libvrt.args import transput_args
-from libvrt.check import setup_text
-from libvrt.check import error, warn, info
+from libvrt.check import Report, check
 
 import re
 
@@ -60,21 +59,28 @@ def main(args, ins, ous):
 
     '''
 
-    setup_text(ous)
+    check(checker(args, Report(ous, binary = False)), ins)
+
+def checker(args, report):
+    '''Receive numbered text lines to report on (see libvrt.check).'''
 
     occurrences = 0
-    for k, line in enumerate(ins, start = 1):
+    while True:
+        item = yield
+        if item is None: break
+        k, line = item
+
         hits = re.findall('\xAD', line)
         if not hits: continue
 
         for hit in hits:
             occurrences += 1
-            warn(k, 'code', 'U+{:04X} SOFT HYPHEN'.format(ord(hit)))
+            report.warn(k, 'code', 'U+{:04X} SOFT HYPHEN'.format(ord(hit)))
 
         if occurrences >= args.limit and not args.no_limit:
-            warn(0, 'code',
-                 'stopped checking at {}'.format(args.limit))
+            report.warn(0, 'code',
+                        'stopped checking at {}'.format(args.limit))
             return
 
     if args.info and not occurrences:
-        info(0, 'code', 'no occurrences of SOFT HYPHEN')
+        report.info(0, 'code', 'no occurrences of SOFT HYPHEN')
@@ -8,8 +8,7 @@ https://en.wikipedia.org/wiki/Tags_(Unicode_block)
 
 from libvrt.args import BadData, nat
 from libvrt.args import transput_args
-from libvrt.check import setup_text
-from libvrt.check import error, warn, info
+from libvrt.check import Report, check
 
 import re
 
@@ -66,7 +65,10 @@ def main(args, ins, ous):
 
     '''
 
-    setup_text(ous)
+    check(checker(args, Report(ous, binary = False)), ins)
+
+def checker(args, report):
+    '''Receive numbered text lines to report on (see libvrt.check).'''
 
     # The characters themselves are valid in a regex range. The block
     # mirrors ASCII, with codes U+0000-U+001F reserved but unused with
@@ -83,7 +85,11 @@ def main(args, ins, ous):
     )
 
     failures = 0
-    for k, line in enumerate(ins, start = 1):
+    while True:
+        item = yield
+        if item is None: break
+        k, line = item
+
         hits = re.findall(TAGS, line)
         if not hits: continue
 
@@ -92,20 +98,20 @@ def main(args, ins, ous):
                 # FLAG can be a hit only when args.info;
                 # flags *should* follow FLAG,
                 # ending with U+E007F.
-                info(k, 'code', 'U+{:X} WAVING BLACK FLAG'
-                     .format(ord(hit)))
+                report.info(k, 'code', 'U+{:X} WAVING BLACK FLAG'
+                            .format(ord(hit)))
                 continue
-            warn(k, 'code', 'tag U+{:X} ({})'
-                 .format(ord(hit), ascii[hit]))
+            report.warn(k, 'code', 'tag U+{:X} ({})'
+                        .format(ord(hit), ascii[hit]))
 
         failures += 1
         if failures >= args.limit and not args.no_limit:
-            error(0, 'code',
-                  'stopped checking at {}'.format(args.limit))
+            report.error(0, 'code',
+                         'stopped checking at {}'.format(args.limit))
             return
 
     if args.info and not failures:
-        info(0, 'code', 'no Unicode "tag" codes')
+        report.info(0, 'code', 'no Unicode "tag" codes')
 
 ascii = {
     '\U000E0000' : '^@',
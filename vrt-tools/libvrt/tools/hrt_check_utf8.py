@@ -4,8 +4,7 @@
 
 from libvrt.args import BadData, nat
 from libvrt.args import transput_args
-from libvrt.check import setup_text
-from libvrt.check import error, warn, info
+from libvrt.check import Report, check
 
 import re
 
@@ -57,20 +56,27 @@ def main(args, ins, ous):
 
     '''
 
-    setup_text(ous)
+    check(checker(args, Report(ous, binary = False)), ins)
+
+def checker(args, report):
+    '''Receive numbered binary lines to report on (see libvrt.check).'''
 
     failures = 0
-    for k, line in enumerate(ins, start = 1):
+    while True:
+        item = yield
+        if item is None: break
+        k, line = item
+
         try:
             text = line.decode('UTF-8')
         except UnicodeDecodeError as exn:
-            error(k, 'code', 'failed to decode line as UTF-8')
+            report.error(k, 'code', 'failed to decode line as UTF-8')
             failures += 1
 
         if failures >= args.limit and not args.no_limit:
-            error(k, 'code', 'stop at {}'.format(failures))
+            report.error(k, 'code', 'stop at {}'.format(failures))
             return
 
     if args.info and not failures:
-        info(0, 'code', 'every line decoded as UTF-8')
+        report.info(0, 'code', 'every line decoded as UTF-8')
     
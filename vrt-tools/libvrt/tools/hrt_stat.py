@@ -2,13 +2,21 @@
 
 '''Implementation of hrt-stat.'''
 
-from libvrt.args import BadData, nat
+from libvrt.args import BadCode, BadData, nat
 from libvrt.args import multiput_args
-from libvrt.args import transput
+from libvrt.args import inputstream, outputstream
+from libvrt.check import decoded
+from libvrt.chunk import ranges, lines
 
 from libvrt.tools import hrt_stat_meta
 from libvrt.tools import hrt_stat_data
 
+from collections import defaultdict, Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from tempfile import mkstemp
+import os, sys
+
 from datetime import datetime as datetime
 def _secs(): return datetime.now().isoformat(' ', timespec = 'seconds')
 
@@ -30,101 +38,238 @@ def parsearguments(argv, *, prog = None):
 
                         ''')
 
+    parser.add_argument('--jobs', '-j', metavar = 'N',
+                        default = 1,
+                        type = nat,
+                        help = '''
+
+                        read N (1) parts of the input file in parallel
+                        processes, combining the observations
+
+                        ''')
+
     args = parser.parse_args(argv)
     args.prog = prog or parser.prog
 
     return args
 
+# Each report: module, name, description, output suffix, options.
+REPORTS = (
+    (hrt_stat_meta, 'meta len',
+     'length of each attribute value in code points',
+     'meta.len', [ '--len', '--sum=h5' ]),
+    (hrt_stat_meta, 'meta maxw',
+     'longest word-code-run in each attribute',
+     'meta.maxw', [ '--max=w', '--sum=h5' ]),
+    (hrt_stat_data, 'data len',
+     'length of each paragraph in code points',
+     'data.len', [ '--len', '--sum=h5' ]),
+    (hrt_stat_data, 'data maxw',
+     'longest word-code-run in each paragraph',
+     'data.maxw', [ '--max=w', '--sum=h5' ]),
+    (hrt_stat_data, 'data maxnw',
+     'longest non-word-code-run in each paragraph',
+     'data.maxnw', [ '--max=W', '--sum=h5' ]),
+)
+
 def main(args, infile, outfile):
     '''Direct statistic reports on the HRT in infile to output files with
     names obtained by extending the outfile with appropriate suffixes.
 
+    Read the input file only once, parsing each meta line and
+    collecting each paragraph once, and feed every observation to each
+    statistic, or, with args.jobs, have parallel processes read a part
+    each and combine their observations. Write each report to a
+    temporary file first and rename them all at the end.
+
     '''
 
-    now = _secs()
-    args.quiet or print('{} -- {} (meta len)'.format(now, args.prog))
-    args.quiet or print('{} -- length of each attribute value in code points'
-                        .format(now))
-    args.quiet or print('{} {}.meta.len'.format(now, outfile))
-    transput(hrt_stat_meta.parsearguments
-             (
-                 [
-                     '--out', outfile + '.meta.len',
-                     '--len',
-                     '--sum=h5',
-                     infile
-                 ],
-                 prog = '{} (meta len)'.format(args.prog)
-             ),
-             hrt_stat_meta.main)
+    for module, name, note, suffix, options in REPORTS:
+        if os.path.exists(outfile + '.' + suffix):
+            print('{}: --out file must not exist: {}'
+                  .format(args.prog, outfile + '.' + suffix),
+                  file = sys.stderr)
+            exit(1)
 
     now = _secs()
-    args.quiet or print('{} -- {} (meta maxw)'.format(now, args.prog))
-    args.quiet or print('{} -- longest word-code-run in each attribute'
-                        .format(now))
-    args.quiet or print('{} {}.meta.maxw'.format(now, outfile))
-    transput(hrt_stat_meta.parsearguments
-             (
-                 [
-                     '--out', outfile + '.meta.maxw',
-                     '--max=w',
-                     '--sum=h5',
-                     infile
-                 ],
-                 prog = '{} (meta maxw)'.format(args.prog)
-             ),
-             hrt_stat_meta.main)
+    metas, datas = [], []
+    for module, name, note, suffix, options in REPORTS:
+        args.quiet or print('{} -- {} ({})'.format(now, args.prog, name))
+        args.quiet or print('{} -- {}'.format(now, note))
+        args.quiet or print('{} {}.{}'.format(now, outfile, suffix))
 
-    now = _secs()
-    args.quiet or print('{} -- {} (data len)'.format(now, args.prog))
-    args.quiet or print('{} -- length of each paragraph in code points'
-                        .format(now))
-    args.quiet or print('{} {}.data.len'.format(now, outfile))
-    transput(hrt_stat_data.parsearguments
-             (
-                 [
-                     '--out', outfile + '.data.len',
-                     '--len',
-                     '--sum=h5',
-                     infile
-                 ],
-                 prog = '{} (data len)'.format(args.prog)
-             ),
-             hrt_stat_data.main)
+        sub = module.parsearguments([ '--out', outfile + '.' + suffix,
+                                      *options,
+                                      infile ],
+                                    prog = '{} ({})'.format(args.prog, name))
 
-    now = _secs()
-    args.quiet or print('{} -- {} (data maxw)'.format(now, args.prog))
-    args.quiet or print('{} -- longest word-code-run in each paragraph'
-                        .format(now))
-    args.quiet or print('{} {}.data.maxw'.format(now, outfile))
-    transput(hrt_stat_data.parsearguments
-             (
-                 [
-                     '--out', outfile + '.data.maxw',
-                     '--max=w',
-                     '--sum=h5',
-                     infile
-                 ],
-                 prog = '{} (data maxw)'.format(args.prog)
-             ),
-             hrt_stat_data.main)
+        tally = _Tally(module, sub)
+        (metas if module is hrt_stat_meta else datas).append(tally)
 
-    now = _secs()
-    args.quiet or print('{} -- {} (data maxnw)'.format(now, args.prog))
-    args.quiet or print('{} -- longest non-word-code-run in each paragraph'
-                        .format(now))
-    args.quiet or print('{} {}.data.maxnw'.format(now, outfile))
-    transput(hrt_stat_data.parsearguments
-             (
-                 [
-                     '--out', outfile + '.data.maxnw',
-                     '--max=W',
-                     '--sum=h5',
-                     infile
-                 ],
-                 prog = '{} (data maxnw)'.format(args.prog)
-             ),
-             hrt_stat_data.main)
+    for tally in metas + datas:
+        tally.open()
+
+    if args.jobs > 1:
+        # parts start after paragraph end lines, where a paragraph
+        # is never open, so that each paragraph is in one part
+        parts = ranges(infile, 4 * args.jobs,
+                       after = lambda line: line.startswith(b'</paragraph>'))
+        subs = [ tally.args for tally in metas + datas ]
+        with ProcessPoolExecutor(max_workers = args.jobs) as pool:
+            for mems in pool.map(_part,
+                                 repeat(infile),
+                                 *zip(*parts),
+                                 repeat(subs)):
+                for tally, mem in zip(metas + datas, mems):
+                    tally.merge(mem)
+    else:
+        with inputstream(infile, True) as ins:
+            _tally(ins, metas, datas)
+
+    for tally in metas + datas:
+        tally.report()
 
     now = _secs()
     args.quiet or print('{} -- {} (done)'.format(now, args.prog))
+
+def _tally(ins, metas, datas):
+    '''Feed observations of text lines in ins to metas and datas.'''
+    for kind, observation in _observe(ins, bool(datas)):
+        for tally in (metas if kind == 'meta' else datas):
+            tally.observe(*observation)
+
+def _part(infile, start, end, subs):
+    '''Tally the statistics in REPORTS, with arguments in subs, in the
+    byte range from start to end in infile. Return the collected
+    observations.
+
+    '''
+
+    metas, datas = [], []
+    for (module, *_), sub in zip(REPORTS, subs):
+        if not sub.summ:
+            raise BadCode('only summaries can be combined')
+        tally = _Tally(module, sub)
+        (metas if module is hrt_stat_meta else datas).append(tally)
+
+    _tally(_text(infile, start, end), metas, datas)
+
+    return [ tally.mem for tally in metas + datas ]
+
+def _text(infile, start, end):
+    '''Yield the lines in the byte range from start to end in infile as
+    they would be read in text mode.
+
+    '''
+
+    for line in lines(infile, start, end):
+        for part in decoded(line):
+            if part is None:
+                raise BadData('not UTF-8 in {}'.format(infile))
+            yield part
+
+def _observe(ins, paragraphs):
+    '''Yield each meta line as ('meta', (k, elem, pairs)) and, if
+    paragraphs is true, the content of each paragraph as ('data', (k,
+    para)), as hrt-stat-meta and hrt-stat-data would see them, in one
+    pass over ins.
+
+    '''
+
+    start, content = None, []
+    for k, line in enumerate(ins, start = 1):
+        if start is not None:
+            if line.startswith('</paragraph>'):
+                yield 'data', (start, ''.join(content))
+                start, content = None, []
+            else:
+                content.append(line)
+        elif paragraphs and line.startswith(('<paragraph>', '<paragraph ')):
+            start = k
+
+        meta = hrt_stat_meta.parse_line(line)
+        if meta is not None:
+            yield 'meta', (k, *meta)
+
+    if start is not None:
+        # as in hrt-stat-data, a paragraph that is not closed ends
+        # with the file
+        yield 'data', (start, ''.join(content))
+
+class _Tally:
+    '''Collect the observations of one statistic, as specified in sub,
+    and write the report as module would, to a temporary file that is
+    renamed to sub.outfile.
+
+    '''
+
+    def __init__(self, module, sub):
+        self.module = module
+        self.args = sub
+        self.stat, self.what = module.statistic(sub)
+        if self.stat is None:
+            raise BadCode('no statistic in: {}'.format(sub.prog))
+
+        self.meta = module is hrt_stat_meta
+        if self.meta:
+            self.elemi, self.attri = module.selected(sub)
+            self.mem = defaultdict(Counter)
+        else:
+            self.mem = Counter()
+
+        self.count = 0
+
+    def open(self):
+        '''Open the temporary output file, and write a head for each
+        observation to be reported.
+
+        '''
+
+        head, tail = os.path.split(self.args.outfile)
+        fd, self.temp = mkstemp(dir = head, prefix = tail + '.',
+                                suffix = '.tmp')
+        os.close(fd)
+
+        self.ous = outputstream(self.temp, True)
+        if not self.args.summ:
+            print('line', *(('elem', 'attr') if self.meta else ()),
+                  self.what, sep = '\t', file = self.ous)
+
+    def observe(self, k, *rest):
+        limit = self.args.limit
+        if limit and self.count == limit:
+            return
+        self.count += 1
+
+        if self.meta:
+            elem, pairs = rest
+            if self.elemi and elem not in self.elemi: return
+            for key, val in dict(pairs).items():
+                if self.attri and key not in self.attri: continue
+                if self.args.summ:
+                    self.mem[elem, key][self.stat(val)] += 1
+                else:
+                    print(k, elem, key, self.stat(val),
+                          sep = '\t', file = self.ous)
+        else:
+            para, = rest
+            if self.args.summ:
+                self.mem[self.stat(para)] += 1
+            else:
+                print(k, self.stat(para), sep = '\t', file = self.ous)
+
+    def merge(self, mem):
+        '''Add observations collected elsewhere into self.'''
+        if self.meta:
+            for key, counter in mem.items():
+                self.mem[key].update(counter)
+        else:
+            self.mem.update(mem)
+
+    def report(self):
+        with self.ous as ous:
+            if self.args.summ:
+                self.module.summarize(self.mem, self.args.summ,
+                                      self.what, ous)
+
+        os.rename(self.temp, self.args.outfile)
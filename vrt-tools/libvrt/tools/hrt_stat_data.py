@@ -6,6 +6,7 @@ from libvrt.args import BadCode, BadData
 from libvrt.args import nat
 from libvrt.args import transput_args
 from libvrt.stat import quant, sum_of_lengths, number_of_runs, max_length
+from libvrt.stat import Sketch
 
 from collections import defaultdict, Counter
 
@@ -60,10 +61,21 @@ def parsearguments(argv, *, prog = None):
 
     parser.add_argument('--sum', dest = 'summ',
                         default = None,
-                        choices = [ 'h5', 'v5', 'h11', 'v11', 'v101' ],
+                        choices = [ 'h5', 'v5', 'h11', 'v11', 'v101',
+                                    'sketch' ],
                         help = '''
 
-                        summarize instead of reporting each
+                        summarize instead of reporting each (sketch
+                        writes mergeable sketches for hrt-stat-merge)
+
+                        ''')
+
+    parser.add_argument('--sketch', action = 'store_true',
+                        help = '''
+
+                        summarize from bounded-memory sketches that
+                        are approximate for many observations
+                        (implied by --sum=sketch)
 
                         ''')
 
@@ -98,27 +110,33 @@ def main(args, ins, ous):
     '''
 
     data = (pair for pair in find_data(args, ins))
+    stat, what = statistic(args)
+    if stat is None:
+        print('sorry, forgot to have a default stat', file = ous)
+        return
+
+    report_stats(data, stat, what, args.summ, ous,
+                 sketch = args.sketch)
+
+def statistic(args):
+    '''Return the statistic function specified in args, and its name, or
+    (None, None) if none is specified.
+
+    '''
+
     if args.length:
-        report_stats(data,
-                     len, 'len',
-                     args.summ, ous)
+        return len, 'len'
     elif args.num_such:
         regex = REX[args.num_such]
-        report_stats(data,
-                     sum_of_lengths(regex), 'num_' + args.num_such,
-                     args.summ, ous)
+        return sum_of_lengths(regex), 'num_' + args.num_such
     elif args.num_runs:
         regex = REX[args.num_runs]
-        report_stats(data,
-                     number_of_runs(regex), 'runs_' + args.num_runs,
-                     args.summ, ous)
+        return number_of_runs(regex), 'runs_' + args.num_runs
     elif args.max_length:
         regex = REX[args.max_length]
-        report_stats(data,
-                     max_length(regex), 'maxlen_' + args.max_length,
-                     args.summ, ous)
+        return max_length(regex), 'maxlen_' + args.max_length
     else:
-        print('sorry, forgot to have a default stat', file = ous)
+        return None, None
 
 def find_data(args, ins):
     '''Yield each paragraph content block as a pair of the start tag line
@@ -155,10 +173,20 @@ def read_paragraph_lines(klines):
         # as if the paragraph just ended
         return
 
-def report_stats(data, stat, what, summ, ous):
+def report_stats(data, stat, what, summ, ous, *, sketch = False):
     '''Report on stat(para) for each para in data.
 
     '''
+    if summ and (sketch or summ == 'sketch'):
+        mem = Sketch()
+        for _, para in data:
+            mem.add(stat(para))
+        if summ == 'sketch':
+            dump(mem, what, ous)
+        else:
+            summarize(mem, summ, what, ous)
+        return
+
     if summ:
         mem = Counter()
         for _, para in data:
@@ -172,6 +200,11 @@ def report_stats(data, stat, what, summ, ous):
     for line, para in data:
         print(line, stat(para), sep = '\t', file = ous)
 
+def dump(mem, what, ous):
+    '''Write the sketch in mem.'''
+    print('stat', 'sketch', sep = '\t', file = ous)
+    print(what, mem.dumps(), sep = '\t', file = ous)
+
 def summarize(mem, summ, what, ous):
     head5 = ('min', 'lo', 'med', 'hi', 'max')
     head11 = ('min', 'd1', 'd2', 'd3', 'd4',
@@ -0,0 +1,101 @@
+# -*- mode: Python; -*-
+
+'''Implementation of hrt-stat-merge.'''
+
+from libvrt.args import BadData
+from libvrt.args import version_args
+from libvrt.stat import Sketch
+
+from libvrt.tools import hrt_stat_meta
+from libvrt.tools import hrt_stat_data
+
+from collections import defaultdict
+import sys
+
+def parsearguments(argv, *, prog = None):
+
+    description = '''
+
+    Merge the sketches that hrt-stat-meta or hrt-stat-data wrote with
+    --sum=sketch for fragments of a document (or of a corpus) and
+    summarize the result as those tools would.
+
+    '''
+
+    parser = version_args(description = description)
+
+    parser.add_argument('infiles', nargs = '+', metavar = 'file',
+                        help = '''sketch files''')
+
+    parser.add_argument('--sum', dest = 'summ',
+                        default = 'h5',
+                        choices = [ 'h5', 'v5', 'h11', 'v11', 'v101',
+                                    'sketch' ],
+                        help = '''
+
+                        summary (default h5), or sketch to write the
+                        merged sketches for further merging
+
+                        ''')
+
+    args = parser.parse_args(argv)
+    args.prog = prog or parser.prog
+
+    return args
+
+META = ['elem', 'attr', 'stat', 'sketch']
+DATA = ['stat', 'sketch']
+
+def main(args):
+    '''Merge sketches from args.infiles, either all meta or all data, and
+    write the summary to stdout.
+
+    '''
+
+    try:
+        head, what, mem = merge(args.infiles)
+    except BadData as exn:
+        print(args.prog + ':', exn, file = sys.stderr)
+        exit(1)
+
+    module = (hrt_stat_meta if head == META else hrt_stat_data)
+    if args.summ == 'sketch':
+        module.dump(mem, what, sys.stdout)
+    else:
+        module.summarize(mem, args.summ, what, sys.stdout)
+
+def merge(infiles):
+    '''Return the head, the statistic name, and the merged sketches (by
+    elem, attr for meta), from infiles.
+
+    '''
+
+    head, what = None, None
+    meta, data = defaultdict(Sketch), Sketch()
+    for infile in infiles:
+        with open(infile, encoding = 'UTF-8') as ins:
+            first = next(ins, '').rstrip('\r\n').split('\t')
+            if first not in (META, DATA):
+                raise BadData('not a sketch file: {}'.format(infile))
+            if head is None:
+                head = first
+            elif first != head:
+                raise BadData('meta and data sketches: {}'.format(infile))
+
+            for line in ins:
+                *keys, stat, text = line.rstrip('\r\n').split('\t')
+                if what is None:
+                    what = stat
+                elif stat != what:
+                    raise BadData('different statistics: {} and {}'
+                                  .format(what, stat))
+
+                if head == META:
+                    meta[tuple(keys)].merge(Sketch.loads(text))
+                else:
+                    data.merge(Sketch.loads(text))
+
+    if head is None:
+        raise BadData('no sketch files')
+
+    return head, what, (meta if head == META else data)
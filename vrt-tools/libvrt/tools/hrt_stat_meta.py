@@ -6,6 +6,7 @@ from libvrt.args import BadCode, BadData
 from libvrt.args import nat
 from libvrt.args import transput_args
 from libvrt.stat import quant, sum_of_lengths, number_of_runs, max_length
+from libvrt.stat import Sketch
 
 from collections import defaultdict, Counter
 
@@ -60,10 +61,21 @@ def parsearguments(argv, *, prog = None):
 
     parser.add_argument('--sum', dest = 'summ',
                         default = None,
-                        choices = [ 'h5', 'v5', 'h11', 'v11', 'v101' ],
+                        choices = [ 'h5', 'v5', 'h11', 'v11', 'v101',
+                                    'sketch' ],
                         help = '''
 
-                        summarize instead of reporting each
+                        summarize instead of reporting each (sketch
+                        writes mergeable sketches for hrt-stat-merge)
+
+                        ''')
+
+    parser.add_argument('--sketch', action = 'store_true',
+                        help = '''
+
+                        summarize from bounded-memory sketches that
+                        are approximate for many observations
+                        (implied by --sum=sketch)
 
                         ''')
 
@@ -118,27 +130,33 @@ def main(args, ins, ous):
     '''
 
     meta = (triple for triple in parse_meta(args, ins))
+    stat, what = statistic(args)
+    if stat is None:
+        print('sorry, forgot to have a default stat', file = ous)
+        return
+
+    report_stats(meta, stat, what, args.summ, ous,
+                 sketch = args.sketch)
+
+def statistic(args):
+    '''Return the statistic function specified in args, and its name, or
+    (None, None) if none is specified.
+
+    '''
+
     if args.length:
-        report_stats(meta,
-                     len, 'len',
-                     args.summ, ous)
+        return len, 'len'
     elif args.num_such:
         regex = REX[args.num_such]
-        report_stats(meta,
-                     sum_of_lengths(regex), 'num_' + args.num_such,
-                     args.summ, ous)
+        return sum_of_lengths(regex), 'num_' + args.num_such
     elif args.num_runs:
         regex = REX[args.num_runs]
-        report_stats(meta,
-                     number_of_runs(regex), 'runs_' + args.num_runs,
-                     args.summ, ous)
+        return number_of_runs(regex), 'runs_' + args.num_runs
     elif args.max_length:
         regex = REX[args.max_length]
-        report_stats(meta,
-                     max_length(regex), 'maxlen_' + args.max_length,
-                     args.summ, ous)
+        return max_length(regex), 'maxlen_' + args.max_length
     else:
-        print('sorry, forgot to have a default stat', file = ous)
+        return None, None
 
 def parse_meta(args, ins):
     '''Yield each relevant meta line as a triple of the line number,
@@ -149,22 +167,18 @@ def parse_meta(args, ins):
     # if elemi or attri is non-empty, only report on elements and
     # attributes with those names (from --elem, --attr options)
 
-    elemi = set(name for name in
-                re.findall(r'\S+', ' '.join(args.elem).replace(',', ' ')))
-
-    attri = set(name for name in
-                re.findall(r'\S+', ' '.join(args.attr).replace(',', ' ')))
+    elemi, attri = selected(args)
 
     occurrences = 0
     for k, line in enumerate(ins, start = 1):
-        mo = re.match('<([a-z._]+)', line)
-        if not mo: continue
+        meta = parse_line(line)
+        if meta is None: continue
 
         occurrences += 1
-        elem = mo.group(1)
+        elem, pairs = meta
         if elemi and elem not in elemi: continue
         attr = dict((key, val)
-                    for key, val in re.findall(r'(\S+?)="(.*?)"', line)
+                    for key, val in pairs
                     if not attri or key in attri)
 
         yield k, elem, attr
@@ -172,10 +186,46 @@ def parse_meta(args, ins):
         if occurrences == args.limit:
             return
 
-def report_stats(meta, stat, what, summ, ous):
+def selected(args):
+    '''Return the sets of element and attribute names specified in args
+    (from --elem, --attr options), either possibly empty.
+
+    '''
+
+    elemi = set(name for name in
+                re.findall(r'\S+', ' '.join(args.elem).replace(',', ' ')))
+
+    attri = set(name for name in
+                re.findall(r'\S+', ' '.join(args.attr).replace(',', ' ')))
+
+    return elemi, attri
+
+def parse_line(line):
+    '''Return the element name and the attribute (name, value) pairs of
+    a meta line, or None if line is not a meta line.
+
+    '''
+
+    mo = re.match('<([a-z._]+)', line)
+    if not mo: return None
+
+    return mo.group(1), re.findall(r'(\S+?)="(.*?)"', line)
+
+def report_stats(meta, stat, what, summ, ous, *, sketch = False):
     '''Report on stat(value) for each attribute value in meta.
 
     '''
+    if summ and (sketch or summ == 'sketch'):
+        mem = defaultdict(Sketch)
+        for _, elem, attr in meta:
+            for key, val in attr.items():
+                mem[elem, key].add(stat(val))
+        if summ == 'sketch':
+            dump(mem, what, ous)
+        else:
+            summarize(mem, summ, what, ous)
+        return
+
     if summ:
         mem = defaultdict(Counter)
         for _, elem, attr in meta:
@@ -192,6 +242,13 @@ def report_stats(meta, stat, what, summ, ous):
             print(line, elem, key, stat(val),
                   sep = '\t', file = ous)
 
+def dump(mem, what, ous):
+    '''Write the sketch of each element attribute in mem.'''
+    print('elem', 'attr', 'stat', 'sketch', sep = '\t', file = ous)
+    for elem, attr in sorted(mem):
+        print(elem, attr, what, mem[elem, attr].dumps(),
+              sep = '\t', file = ous)
+
 def summarize(mem, summ, what, ous):
     head5 = ('min', 'lo', 'med', 'hi', 'max')
     head11 = ('min', 'd1', 'd2', 'd3', 'd4',
@@ -13,7 +13,9 @@ def parsearguments(argv, *, prog = None):
 
     Display in stdout a summary of the distribution of memory or time
     usage of completed tasks in array jobs in a log directory. The
-    information comes from SLURM accounting system. The summaries show
+    information comes from SLURM accounting system, or with --records
+    from the task records that game writes in the log directory (also
+    when the tasks were run with game --local). The summaries show
     columns of seven observed values at or near the five quartile
     points and next to the two extrema. (Observations coincide when
     observations are few.)
@@ -45,19 +47,50 @@ def parsearguments(argv, *, prog = None):
 
                        ''')
 
+    group.add_argument('--io', '-i',
+                       choices = 'BKMG',
+                       help = '''
+
+                       summarize i/o in bytes or desired multiples of
+                       1024 bytes (only with --records)
+
+                       ''')
+
+    parser.add_argument('--records', '-r',
+                        action = 'store_true',
+                        help = '''
+
+                        summarize the task records (*.tsv) in the log
+                        directory instead of asking SLURM accounting
+
+                        ''')
+
     args = parser.parse_args(argv)
     args.prog = prog or parser.prog
 
+    if args.io and not args.records:
+        parser.error('--io is only available with --records')
+
     return args
 
 def main(args):
     '''Identify array jobs from *file names* in args.logdir, compute and
     display a summary. This only works in the host of the SLURM, for
     log files named jobid-taskid-whatever.out, of which only distinct
-    jobids are extracted.
+    jobids are extracted (so not the localN jobids of game --local).
+
+    With args.records, summarize the task records in args.logdir
+    instead, wherever the tasks were run.
 
     '''
 
+    if args.records:
+        records = readrecords(args.logdir)
+        if args.memory: recmemory(records, unit = args.memory)
+        elif args.time: rectime(records)
+        elif args.io: recio(records, unit = args.io)
+        return
+
     jobs = {
         name.split('-')[0]
         for name
@@ -241,6 +274,111 @@ def sumtime1(job):
         # day) and sorting constants cannot do no harm
         print(*record, sep = '\t')
 
+def readrecords(logdir):
+    '''Read the task records in logdir, in files named
+    jobid-taskid-whatever.tsv (jobid is localN for a local job) that
+    consist of a head and a record,
+    into dicts of field name to value, and return those of completed
+    tasks (status 0, as sacct --state=cd).
+
+    '''
+
+    records = []
+    for path in glob.iglob(os.path.join(logdir, '*.tsv')):
+        if not re.match(r'(local)?\d+-\d+-', os.path.basename(path)):
+            continue
+        with open(path, encoding = 'UTF-8') as ins:
+            lines = [ line.rstrip('\r\n').split('\t') for line in ins ]
+        if len(lines) != 2 or 'maxrss' not in lines[0]:
+            raise BadData('not a task record: {}'.format(path))
+        records.append(dict(zip(*lines)))
+
+    return [ r for r in records if r['status'] == '0' ]
+
+def jobsof(records):
+    '''Group records by job, in order of the job number.'''
+
+    jobs = {}
+    for r in records: jobs.setdefault(r['job'], []).append(r)
+    return [ jobs[job]
+             for job in sorted(jobs, key = lambda job:
+                               int(job.replace('local', ''))) ]
+
+def reqkilos(memory):
+    '''Requested memory ("4G", "4096M") as ReqMem per node in K, as
+    sacct reports it.
+
+    '''
+
+    scale = dict(K = 1, M = 1024, G = 1024 * 1024)
+    return '{}Kn'.format(int(memory[:-1]) * scale[memory[-1]])
+
+def recmemory(records, *, unit):
+    print('JobID', 'ord', 'stat',
+          'MaxRSS', 'ReqMem', 'NCPUS',
+          'obs', sep = '\t')
+    for job in jobsof(records):
+        MAXS = equarts(sorted(('{}K'.format(r['maxrss']) for r in job),
+                              key = kilos))
+        REQS = equarts(sorted(reqkilos(r['reqmem']) for r in job))
+        for record in zip(equarts(sorted(r['job'] for r in job)),
+                          range(1, 8),
+                          ('Min', 'Min1', 'LoQ',
+                           'Med',
+                           'HiQ', 'Max1', 'Max'),
+                          form(MAXS, unit, req = REQS),
+                          form(REQS, unit, req = REQS),
+                          equarts(sorted(r['ncpus'] for r in job)),
+                          [len(job) for k in range(1, 8)]):
+            print(*record, sep = '\t')
+
+def rectime(records):
+    print('JobID', 'ord', 'stat',
+          'Elapsed', 'TotalCPU', 'Timelimit', 'NCPUS',
+          'obs', sep = '\t')
+    for job in jobsof(records):
+        cpus = (float(r['user']) + float(r['system']) for r in job)
+        for record in zip(equarts(sorted(r['job'] for r in job)),
+                          range(1, 8),
+                          ('Min', 'Min1', 'LoQ',
+                           'Med',
+                           'HiQ', 'Max1', 'Max'),
+                          map(clock, equarts(sorted(float(r['elapsed'])
+                                                    for r in job))),
+                          map(clock, equarts(sorted(cpus))),
+                          equarts(sorted(r['timelimit'] for r in job)),
+                          equarts(sorted(r['ncpus'] for r in job)),
+                          (len(job) for k in range(1, 8))):
+            print(*record, sep = '\t')
+
+def recio(records, *, unit):
+    names = ('rchar', 'wchar', 'read_bytes', 'write_bytes')
+    print('JobID', 'ord', 'stat', *names, 'obs', sep = '\t')
+    scale = dict(B = 1, K = 1024, M = 1024 ** 2, G = 1024 ** 3)[unit]
+    def scaled(n):
+        if unit == 'B': return str(n)
+        return '{}{}'.format(round(n / scale, 1), unit)
+    for job in jobsof(records):
+        for record in zip(equarts(sorted(r['job'] for r in job)),
+                          range(1, 8),
+                          ('Min', 'Min1', 'LoQ',
+                           'Med',
+                           'HiQ', 'Max1', 'Max'),
+                          *(map(scaled, equarts(sorted(int(r[name] or 0)
+                                                       for r in job)))
+                            for name in names),
+                          (len(job) for k in range(1, 8))):
+            print(*record, sep = '\t')
+
+def clock(seconds):
+    '''Format seconds as [d-]hh:mm:ss the way sacct does.'''
+
+    days, seconds = divmod(round(seconds), 24 * 3600)
+    hours, seconds = divmod(seconds, 3600)
+    minutes, seconds = divmod(seconds, 60)
+    return ('{}-'.format(days) if days else '') + (
+        '{:02d}:{:02d}:{:02d}'.format(hours, minutes, seconds))
+
 def equarts(data):
 
     '''Five observed quartiles in data, assumed sorted, extended with
@@ -10,7 +10,7 @@ import html, re, sys
 
 from libvrt.args import transput_args
 from libvrt.bad import BadData, BadCode
-from libvrt.pr1 import transput
+from libvrt.pr1 import transput, worker_args
 
 def _name(arg): return arg.encode('UTF-8')
 
@@ -64,6 +64,8 @@ def parsearguments(argv):
                        ''')
     parser.set_defaults(form = 'all')
 
+    worker_args(parser)
+
     args = parser.parse_args(argv)
 
     # default depends on args.form so here goes
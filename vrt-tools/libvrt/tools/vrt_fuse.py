@@ -0,0 +1,235 @@
+# -*- mode: Python; -*-
+
+'''Implement vrt-fuse.'''
+
+from importlib import import_module
+from importlib.machinery import SourceFileLoader
+from importlib.util import module_from_spec, spec_from_loader
+from threading import Lock, Thread
+import io, os, shlex, sys, time
+
+from libvrt.args import transput_args
+from libvrt.bad import BadData
+
+# Each stage that can be fused: module, or script in the directory
+# of the tools, and whether it reads and writes binary (not text).
+STAGES = {
+    'vrt-rename' : ('libvrt.tools.vrt_rename', True),
+    'vrt-drop' : ('libvrt.tools.vrt_drop', True),
+    'vrt-keep' : ('libvrt.tools.vrt_keep', True),
+    'vrt-simple-tear' : ('vrt-simple-tear', False),
+    'vrt-simple-mend' : ('vrt-simple-mend', False),
+    'vrt-conll09-mend' : ('vrt-conll09-mend', False),
+}
+
+def parsearguments():
+    description = '''
+
+    Run a pipeline of pure-Python VRT tools in one process, passing
+    the data from one stage to the next through OS pipes, without
+    intermediate files. Stages are {} and "tee file" which writes a
+    copy of the data at that point to the file.
+
+    '''.format(', '.join(STAGES))
+
+    parser = transput_args(description = description)
+
+    parser.add_argument('--stage', '-s', metavar = '"tool option*"',
+                        dest = 'stages', action = 'append',
+                        type = shlex.split, default = [],
+                        help = '''
+
+                        a stage of the pipeline, a tool name with its
+                        options in one (quoted) argument; repeat the
+                        option for each stage, in order
+
+                        ''')
+
+    parser.add_argument('--tick', action = 'store_true',
+                        help = '''
+
+                        report when each stage is done, as TDPipe
+                        does, "IN" the wall time since the previous
+                        report "OF" the time since start "PAST" the
+                        stage, to stdout (to stderr when the output
+                        goes to stdout)
+
+                        ''')
+
+    args = parser.parse_args()
+    args.prog = parser.prog
+    return args
+
+def main(args, ins, ous):
+    '''Set up each stage in its own thread, the first reading ins, the
+    last writing ous, the others connected by OS pipes, and wait for
+    them all to finish.
+
+    '''
+
+    if not args.stages:
+        raise BadData('no stages')
+
+    stages = [ _stage(argv) for argv in args.stages ]
+
+    # ticks go to stdout as in TDPipe, unless the data goes there
+    ticks = (_Ticks(sys.stderr if ous is sys.stdout.buffer else sys.stdout)
+             if args.tick else
+             None)
+    threads, done = [], [None] * len(stages)
+    source = ins
+    for k, (name, run, binary) in enumerate(stages):
+        if k + 1 < len(stages):
+            r, w = os.pipe()
+            sink, after = open(w, mode = 'bw'), open(r, mode = 'br')
+        else:
+            sink, after = ous, None
+
+        threads.append(Thread(target = _run,
+                              args = (k, name, run, binary,
+                                      source, sink,
+                                      (k > 0, k + 1 < len(stages)),
+                                      ticks, done)))
+        source = after
+
+    for thread in threads: thread.start()
+    for thread in threads: thread.join()
+
+    # report an error of the earliest stage that failed other than by
+    # a broken pipe, which is due to a later stage having failed
+    failed = sorted((isinstance(exn, BrokenPipeError), k)
+                    for k, (name, status, exn) in enumerate(done)
+                    if exn is not None)
+    for broken, k in failed[:1]:
+        name, status, exn = done[k]
+        if isinstance(exn, BadData):
+            raise BadData('{}: {}'.format(name, exn))
+        raise exn
+
+    return next((status for name, status, exn in done if status), 0)
+
+def _stage(argv):
+    '''Return name, the function to run the stage, and whether it reads
+    and writes binary, for the stage in argv.
+
+    '''
+
+    if not argv:
+        raise BadData('empty stage')
+
+    name, *options = argv
+    if name == 'tee':
+        if len(options) != 1:
+            raise BadData('tee: want one file name')
+        return 'tee {}'.format(options[0]), _tee(options[0]), True
+
+    if name not in STAGES:
+        raise BadData('cannot fuse: {}'.format(name))
+
+    where, binary = STAGES[name]
+    module = (import_module(where)
+              if where.startswith('libvrt.') else
+              _script(where))
+
+    # the tools read their options from sys.argv
+    saved = sys.argv
+    try:
+        sys.argv = [ name, *options ]
+        sub = module.parsearguments()
+    finally:
+        sys.argv = saved
+
+    if any(getattr(sub, key, None)
+           for key in ('infile', 'outfile', 'inplace', 'backup', 'sibling')):
+        raise BadData('{}: stage cannot name files'.format(name))
+
+    return name, (lambda ins, ous: module.main(sub, ins, ous)), binary
+
+def _script(name):
+    '''Load the tool script name from the directory of the tools, as a
+    module, without running it as the main program.
+
+    '''
+
+    here = os.path.dirname(os.path.dirname(os.path.dirname(
+        os.path.abspath(__file__))))
+    loader = SourceFileLoader(name.replace('-', '_'),
+                              os.path.join(here, name))
+    module = module_from_spec(spec_from_loader(loader.name, loader))
+    loader.exec_module(module)
+    return module
+
+def _tee(outfile):
+    '''Return a stage that copies binary ins to both outfile and ous.'''
+
+    def tee(ins, ous):
+        with open(outfile, mode = 'bw') as copy:
+            for block in iter(lambda: ins.read(1 << 16), b''):
+                copy.write(block)
+                ous.write(block)
+        return 0
+
+    return tee
+
+def _run(k, name, run, binary, ins, ous, pipes, ticks, done):
+    '''Run stage k, name, in the current thread, from ins to ous,
+    wrapped as text streams unless binary, and record its name, status
+    and any exception in done[k]. Close ins and ous when they are
+    pipes (as pipes tells), so that the stages on either side see end
+    of input or a broken pipe. Report the stage done to ticks if
+    ticks is not None.
+
+    '''
+
+    status, failure = 1, None
+    try:
+        if binary:
+            status = run(ins, ous)
+        else:
+            tins = io.TextIOWrapper(ins, encoding = 'UTF-8')
+            tous = io.TextIOWrapper(ous, encoding = 'UTF-8')
+            status = run(tins, tous)
+            tous.flush()
+            tins.detach()
+            tous.detach()
+    except Exception as exn:
+        failure = exn
+
+    for stream, pipe in zip((ins, ous), pipes):
+        if not pipe: continue
+        try:
+            stream.close()
+        except BrokenPipeError as exn:
+            failure = failure or exn
+
+    done[k] = (name, status, failure)
+    if ticks is not None:
+        ticks.tick(name)
+
+class _Ticks:
+    '''Report stages done to stream as tick in TDPipe does, in wall time
+    since the previous report and since start, so that the timings are
+    comparable to those of TDPipe. Stages run in their own threads,
+    hence the lock.
+
+    '''
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.start = self.last = time.monotonic()
+        self.lock = Lock()
+
+    def tick(self, name):
+        with self.lock:
+            now = time.monotonic()
+            add, self.last = now - self.last, now
+            print(time.strftime('%F %T'),
+                  'IN', _hms(add), 'OF', _hms(now - self.start),
+                  'PAST', name,
+                  file = self.stream, flush = True)
+
+def _hms(secs):
+    secs = int(secs)
+    return '{}:{:02d}:{:02d}'.format(secs // 3600,
+                                     secs // 60 % 60,
+                                     secs % 60)
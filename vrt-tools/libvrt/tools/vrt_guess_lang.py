@@ -17,7 +17,7 @@ import re, sys
 
 from libvrt.args import transput_args
 from libvrt.bad import BadData, BadCode
-from libvrt.pr1 import transput
+from libvrt.pr1 import transput, worker_args
 
 try:
     from outsidelib import HeLI
@@ -75,6 +75,8 @@ def parsearguments(argv):
 
                         ''')
 
+    worker_args(parser)
+
     args = parser.parse_args(argv)
     args.prog = parser.prog
     return args
@@ -14,6 +14,7 @@ import enum, os, re, sys, traceback
 from libvrt.args import transput_args
 from libvrt.bad import BadData, BadCode
 from libvrt.keeper import keeper
+from libvrt.mapped import mmap_args, mapped, lines, kept
 from libvrt.nameargs import bagtype, parsenames
 from libvrt.nameline import isnameline, parsenameline, makenameline
 
@@ -53,6 +54,8 @@ def parsearguments():
 
                         ''')
 
+    mmap_args(parser)
+
     args = parser.parse_args()
     args.prog = parser.prog
     return args
@@ -123,7 +126,8 @@ def main(args, ins, ous):
         before = parsenames(args.fields)
         after = parsenames([])
 
-    content = filterfalse(bytes.isspace, ins)
+    mm = mapped(ins) if args.mmap else None
+    content = filterfalse(bytes.isspace, ins if mm is None else lines(mm))
 
     head = islice(content, 100)
     for line in head:
@@ -152,6 +156,10 @@ def main(args, ins, ous):
         raise BadData('first 100 lines: no field names found')
 
     # broke out of head so found and shipped a name line
+    if mm is not None:
+        for block in kept(mm, mm.tell(), keep): ous.write(block)
+        return 0
+
     for line in filterfalse(isnameline, chain(head, content)):
         if line.startswith(b'<'):
             ous.write(line)
@@ -5,6 +5,7 @@
 from itertools import filterfalse, islice
 
 from libvrt.args import transput_args
+from libvrt.mapped import mmap_args, mapped, lines, spans, NAMES_OR_BLANK
 from libvrt.nameargs import maptype, parsemaps
 from libvrt.nameline import isnameline, parsenameline, rename, makenameline
 from libvrt.bad import BadData
@@ -27,6 +28,9 @@ def parsearguments():
                         commas or spaces, or repeat the option
 
                         ''')
+
+    mmap_args(parser)
+
     args = parser.parse_args()
     args.prog = parser.prog
     return args
@@ -36,10 +40,14 @@ def main(args, ins, ous):
     before first token line. Ship a new name line instead, then ship
     all but old name lines in what remains.
 
+    With --mmap, ship what remains of a regular file as spans of the
+    memory map between old name lines and blank lines.
+
     '''
 
     mapping = parsemaps(args.mapping)
-    content = filterfalse(bytes.isspace, ins)
+    mm = mapped(ins) if args.mmap else None
+    content = filterfalse(bytes.isspace, ins if mm is None else lines(mm))
 
     # expect name comment in early lines
     head = islice(content, 100)
@@ -56,6 +64,10 @@ def main(args, ins, ous):
         raise BadData('first 100 lines: no field names found')
 
     # broke out of head so found and shipped a name line
+    if mm is not None:
+        for span in spans(mm, mm.tell(), NAMES_OR_BLANK): ous.write(span)
+        return 0
+
     for line in filterfalse(isnameline, head): ous.write(line)
     for line in filterfalse(isnameline, content): ous.write(line)
 
@@ -14,7 +14,7 @@ import re, sys
 
 from libvrt.args import transput_args
 from libvrt.bad import BadData, BadCode
-from libvrt.pr1 import transput
+from libvrt.pr1 import transput, worker_args
 
 def _name(arg):
     if re.fullmatch('\w+', arg, re.ASCII):
@@ -63,6 +63,8 @@ def parsearguments(argv):
 
                         ''')
 
+    worker_args(parser)
+
     args = parser.parse_args(argv)
     args.prog = parser.prog
     return args
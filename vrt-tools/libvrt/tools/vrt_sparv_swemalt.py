@@ -13,7 +13,7 @@ import re, sys
 
 from libvrt.args import transput_args
 from libvrt.bad import BadData, BadCode
-from libvrt.pr1 import transput
+from libvrt.pr1 import transput, worker_args
 
 try:
     from outsidelib import MALTPARSER, SWEMALTDIR, SWEMALTMODEL
@@ -83,6 +83,8 @@ def parsearguments(argv):
 
     # TODO something about skipping sentences? maybe later
 
+    worker_args(parser)
+
     args = parser.parse_args(argv)
     args.prog = parser.prog
     return args
@@ -10,7 +10,7 @@ import sys
 
 from libvrt.args import transput_args
 from libvrt.bad import BadData, BadCode
-from libvrt.pr1 import transput
+from libvrt.pr1 import transput, worker_args
 
 def _name(arg): return arg.encode('UTF-8')
 
@@ -49,6 +49,8 @@ def parsearguments(argv):
 
                         ''')
 
+    worker_args(parser)
+
     args = parser.parse_args(argv)
     args.prog = parser.prog
     return args
@@ -25,7 +25,7 @@ for dir in data.u.tmp \
 	       data.u.tmpx \
 	       data.u.tmpx.resx \
 	       x \
-	       names lines tokens bytes
+	       names lines tokens bytes cost manifest gzip
 do
     test -d ${dir} && rm -r ${dir}
 done
@@ -61,11 +61,11 @@ ok_data_trip () {
 
 ok_have_names () {
     [ $(
-	  find $1 -type f |
+	  find $1 -type f -name '*.vrf' |
 	      xargs -n 1 head -n 2 |
 	      grep -c '<!-- #vrt positional-attributes:'
       ) = \
-	$( find $1 -type f | wc -l ) ]
+	$( find $1 -type f -name '*.vrf' | wc -l ) ]
 }
 
 # ADAPT! OR REMOVE!
@@ -226,3 +226,67 @@ then
 else
     date "+%F %T FAIL 8"
 fi
+
+### Test 9 ###
+
+date "+%F %T Test 9 data.n / cost/{tmp.n,res.n}"
+
+mkdir cost
+
+${PACK} --out=cost/tmp.n --cost=100 --model=1,0.1 data.n/
+${UNPACK} --out=cost/res.n cost/tmp.n/
+
+if ok_file_trip data.n cost/res.n &&
+	ok_data_trip data.n cost/res.n &&
+	ok_have_names cost/tmp.n &&
+	! ${PACK} --out=cost/tmp.m --tokens=100 --model=1,0.1 data.n/ \
+	  2> /dev/null &&
+	test ! -e cost/tmp.m
+then
+    date "+%F %T PASS 9"
+else
+    date "+%F %T FAIL 9"
+fi
+
+### Test 10 ###
+
+date "+%F %T Test 10 data.n / manifest/{tmp.n,res.n,scan.n,sel.n}"
+
+mkdir manifest
+
+${PACK} --out=manifest/tmp.n --tokens=100 data.n/
+${UNPACK} --out=manifest/res.n --jobs=3 manifest/tmp.n/
+${UNPACK} --out=manifest/scan.n --scan manifest/tmp.n/
+${UNPACK} --out=manifest/sel.n --select='three/*' manifest/tmp.n/
+
+if ok_file_trip data.n manifest/res.n &&
+	ok_data_trip data.n manifest/res.n &&
+	diff -r manifest/res.n manifest/scan.n &&
+	diff -r manifest/res.n/three manifest/sel.n/three &&
+	[ "$(ls manifest/sel.n)" = three ]
+then
+    date "+%F %T PASS 10"
+else
+    date "+%F %T FAIL 10"
+fi
+
+### Test 11 ###
+
+date "+%F %T Test 11 data.n / gzip/{tmp.n,res.n}"
+
+mkdir gzip
+
+${PACK} --out=gzip/tmp.n --tokens=100 data.n/
+${PACK} --out=gzip/tmp.z --tokens=100 --readers=3 --compress=gzip data.n/
+${UNPACK} --out=gzip/res.n gzip/tmp.z/
+
+if ok_file_trip data.n gzip/res.n &&
+	ok_data_trip data.n gzip/res.n &&
+	cmp gzip/tmp.n/manifest.tsv gzip/tmp.z/manifest.tsv &&
+	diff <(cd gzip/tmp.n ; find -name '*.vrf' | sort) \
+	     <(cd gzip/tmp.z ; find -name '*.vrf' | sort)
+then
+    date "+%F %T PASS 11"
+else
+    date "+%F %T FAIL 11"
+fi
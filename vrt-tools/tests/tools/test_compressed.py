@@ -0,0 +1,57 @@
+# -*- mode: Python; -*-
+
+'''Test that vrt tools read compressed fragments (as vrt-pack writes
+with --compress) as if they were not compressed.
+
+'''
+
+from subprocess import run, PIPE
+
+from libvrt.compressed import compressing, compression, decompressed
+from libvrt.chunk import ranges, lines
+
+def _document():
+    lines = [ '<!-- #vrt positional-attributes: word -->\n' ]
+    for s in range(100):
+        lines.append('<sentence>\n')
+        lines.extend('sana{}\n'.format(k) for k in range(s % 9 + 1))
+        lines.append('</sentence>\n')
+    return ''.join(lines).encode('UTF-8')
+
+def test_001(tmp_path):
+    with compressing(open(tmp_path / 'doc.vrf', mode = 'bw'),
+                     'gzip') as out:
+        out.write(_document())
+
+    with open(tmp_path / 'doc.vrf', mode = 'br') as ins:
+        assert compression(ins) == 'gzip'
+        with decompressed(ins) as inf:
+            assert inf.read() == _document()
+
+def test_002(tmp_path):
+    (tmp_path / 'doc.vrt').write_bytes(_document())
+    with compressing(open(tmp_path / 'doc.vrf', mode = 'bw'),
+                     'gzip') as out:
+        out.write(_document())
+
+    plain = run([ './vrt-add-id', str(tmp_path / 'doc.vrt') ],
+                stdout = PIPE,
+                stderr = PIPE,
+                timeout = 20)
+    assert not plain.returncode
+    packed = run([ './vrt-add-id', str(tmp_path / 'doc.vrf') ],
+                 stdout = PIPE,
+                 stderr = PIPE,
+                 timeout = 20)
+    assert not packed.returncode
+    assert not packed.stderr
+    assert packed.stdout == plain.stdout
+
+def test_003(tmp_path):
+    with compressing(open(tmp_path / 'doc.vrf', mode = 'bw'),
+                     'gzip') as out:
+        out.write(_document())
+
+    # a compressed file is one part, read whole
+    [(start, end)] = ranges(tmp_path / 'doc.vrf', 4)
+    assert b''.join(lines(tmp_path / 'doc.vrf', start, end)) == _document()
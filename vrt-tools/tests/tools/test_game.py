@@ -27,7 +27,7 @@
 # tmp_path. (Actually Path.cwd() but tmp_path serves as a handle.)
 
 import os
-from subprocess import run, Popen, PIPE, TimeoutExpired
+from subprocess import run, Popen, PIPE
 
 # Decorate with @have_sbatch to be able to run sbatch.
 from tests.tools.skippers import have_sbatch
@@ -312,3 +312,132 @@ def test_005c(tmp_path):
     assert len(tuple(logpath.glob('*-*-game.out'))) == 2
     assert (tmp_path / 'out-data1' / 'data1.out').exists()
     assert (tmp_path / 'out-data2' / 'data2.out').exists()
+
+def test_006a(tmp_path):
+    logpath = tmp_path / 'log'
+
+    # run locally, two tasks at a time, like test_005a:
+    # data1.txt contains 'yksi' => grep status 0
+    # data2.txt does not contain it => grep status 1
+
+    ((tmp_path / 'data1.txt')
+     .write_bytes( b'kolme\n'
+                   b'yksi\n' ))
+    ((tmp_path / 'data2.txt')
+     .write_bytes( b'kuusi\n'
+                   b'kaksi\n' ))
+    proc = run([ str(tmp_path.cwd() / 'game'),
+                 '--local', '2',
+                 '--log', 'log',
+                 '--out', '{}.out',
+                 'grep', 'yksi', '//',
+                 'data1.txt',
+                 'data2.txt' ],
+               cwd = str(tmp_path),
+               capture_output = True,
+               timeout = 30)
+
+    assert proc.returncode == 1
+    assert b'Running local job' in proc.stdout
+    assert b'billing' not in proc.stderr
+    assert len(tuple(logpath.glob('*-*-game.err'))) == 2
+    assert len(tuple(logpath.glob('*-*-game.out'))) == 2
+    assert (tmp_path / 'data1.out').read_bytes() == b'yksi\n'
+    assert tuple(tmp_path.glob('data2.out.*.tmp'))
+    assert not (tmp_path / 'data2.out').exists()
+
+    [log1] = logpath.glob('*-1-game.out')
+    assert b'WITH STATUS 0' in log1.read_bytes()
+    assert b'max rss: ' in log1.read_bytes()
+    [log2] = logpath.glob('*-2-game.out')
+    assert b'exit status: 1' in log2.read_bytes()
+
+def test_006b(tmp_path):
+    logpath = tmp_path / 'log'
+    proc = run([ str(tmp_path.cwd() / 'game'),
+                 '--local', '1',
+                 '--log', 'log',
+                 '--accept',
+                 '--out', 'out/{}.txt',
+                 'echo', 'hello', '//',
+                 'one', 'two', 'three' ],
+               cwd = str(tmp_path),
+               capture_output = True,
+               timeout = 30)
+
+    assert proc.returncode == 0
+    lines = proc.stdout.decode('UTF-8').splitlines()
+    assert lines[1].split('\t') == ['task', 'status', 'wall',
+                                    'maxrss', 'arg']
+    assert [ line.split('\t')[4] for line in lines[2:] ] == [
+        'one', 'two', 'three'
+    ]
+    assert len(tuple(logpath.glob('*-*-game.err'))) == 3
+    assert (tmp_path / 'out' / 'two.txt').read_bytes() == b'hello two\n'
+
+def test_006c(tmp_path):
+    proc = run([ './game', '--local', '0', 'echo' ],
+               capture_output = True,
+               timeout = 3)
+    assert proc.returncode
+    assert b'invalid number of tasks' in proc.stderr
+
+def test_007a(tmp_path):
+    # game-task records the resource usage of each task, for
+    # sumgame --records to summarize in the equarts layout
+    logpath = tmp_path / 'log'
+    proc = run([ str(tmp_path.cwd() / 'game'),
+                 '--local', '2',
+                 '--log', 'log',
+                 '-M', '30', '--MiB', '100',
+                 'test', '-n', '//',
+                 'one', 'two', '' ],
+               cwd = str(tmp_path),
+               capture_output = True,
+               timeout = 30)
+    assert proc.returncode == 1
+
+    records = sorted(logpath.glob('*-*-game.tsv'))
+    assert len(records) == 3
+    assert all(record.name.startswith('local') for record in records)
+    head, record = records[1].read_text().splitlines()
+    record = dict(zip(head.split('\t'), record.split('\t')))
+    assert record['task'] == '2'
+    assert record['status'] == '0'
+    assert record['timelimit'] == '0:30:00'
+    assert record['reqmem'] == '100M'
+    assert int(record['maxrss']) > 0
+
+    for option, names in (('--memory=K', b'MaxRSS\tReqMem'),
+                          ('--time', b'Elapsed\tTotalCPU\tTimelimit'),
+                          ('--io=B', b'rchar\twchar')):
+        proc = run([ str(tmp_path.cwd() / 'sumgame'),
+                     '--records', option, 'log' ],
+                   cwd = str(tmp_path),
+                   capture_output = True,
+                   timeout = 10)
+        assert proc.returncode == 0
+        head, *body = proc.stdout.splitlines()
+        assert names in head
+        assert len(body) == 7
+        # only the two completed tasks are observed
+        assert all(line.endswith(b'\t2') for line in body)
+
+    # without --records, local jobs are not looked up in sacct
+    proc = run([ str(tmp_path.cwd() / 'sumgame'), '--time', 'log' ],
+               cwd = str(tmp_path),
+               capture_output = True,
+               timeout = 10)
+    assert proc.returncode == 0
+    assert len(proc.stdout.splitlines()) == 1
+
+def test_007b(tmp_path):
+    record = tmp_path / 'record.tsv'
+    proc = run([ './game-task', '--record', str(record),
+                 '--job', '1', '--task', '2',
+                 '--', 'sh', '-c', 'exit 3' ],
+               capture_output = True,
+               timeout = 10)
+    assert proc.returncode == 3
+    head, body = record.read_text().splitlines()
+    assert body.startswith('1\t2\t3\t')
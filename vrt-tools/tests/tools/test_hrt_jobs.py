@@ -0,0 +1,52 @@
+# -*- mode: Python; -*-
+
+'''Test that hrt-check and hrt-stat write the same reports when they
+process parts of the input file in parallel (--jobs) as when they
+process the whole file at once, including line numbers and limits.
+
+'''
+
+from subprocess import run, PIPE
+
+def _document():
+    lines = []
+    for t in range(300):
+        lines.append('<text n="{}" title="{}">\n'.format(t, 'x' * (t % 13)))
+        lines.append('<paragraph>\n')
+        lines.append('sana ' * (t % 17) + '\n')
+        if t % 7 == 0: lines.append('ohjaus \x07 merkki\n')
+        if t % 11 == 0: lines.append('tavu\xadviiva\n')
+        if t % 23 == 0: lines.append('rivin \r keskellä\n')
+        lines.append('</paragraph>\n')
+        lines.append('</text>\n')
+    return ''.join(lines).encode('UTF-8')
+
+def test_001(tmp_path):
+    (tmp_path / 'one').mkdir()
+    (tmp_path / 'many').mkdir()
+    for name in ('one', 'many'):
+        (tmp_path / name / 'doc.hrt').write_bytes(_document())
+
+    for tool in ('./hrt-check', './hrt-stat'):
+        one = run([ tool, '--quiet',
+                    str(tmp_path / 'one' / 'doc.hrt') ],
+                  stdout = PIPE,
+                  stderr = PIPE,
+                  timeout = 20)
+        assert not one.returncode
+        many = run([ tool, '--quiet', '--jobs=3',
+                     str(tmp_path / 'many' / 'doc.hrt') ],
+                   stdout = PIPE,
+                   stderr = PIPE,
+                   timeout = 20)
+        assert not many.returncode
+        assert not many.stderr
+
+    reports = sorted(path.name for path in (tmp_path / 'one').iterdir())
+    assert 'doc.hrt.ctl' in reports
+    assert 'doc.hrt.data.len' in reports
+    assert reports == sorted(path.name for path in
+                             (tmp_path / 'many').iterdir())
+    for name in reports:
+        assert ((tmp_path / 'one' / name).read_bytes() ==
+                (tmp_path / 'many' / name).read_bytes())
@@ -0,0 +1,70 @@
+# -*- mode: Python; -*-
+
+'''Test that hrt-stat-meta and hrt-stat-data write mergeable sketches
+(--sum=sketch) that hrt-stat-merge summarizes as the tools would
+summarize the whole document. With few observations, the sketches are
+exact.
+
+'''
+
+from subprocess import run, PIPE
+
+def _fragment(n):
+    return ''.join(('<text title="{}" n="{}">\n'.format('x' * (n % 7), n),
+                    '<paragraph>\n',
+                    ' '.join(['sana'] * (n % 11)), '\n',
+                    '</paragraph>\n',
+                    '</text>\n'))
+
+def test_001(tmp_path):
+    one = ''.join(map(_fragment, range(0, 40)))
+    two = ''.join(map(_fragment, range(40, 100)))
+    (tmp_path / 'one.hrt').write_text(one, encoding = 'UTF-8')
+    (tmp_path / 'two.hrt').write_text(two, encoding = 'UTF-8')
+    (tmp_path / 'all.hrt').write_text(one + two, encoding = 'UTF-8')
+
+    for tool, kind in (('./hrt-stat-meta', 'meta'),
+                       ('./hrt-stat-data', 'data')):
+        for part in ('one', 'two'):
+            proc = run([ tool, '--len', '--sum=sketch',
+                         '--out', str(tmp_path / (part + kind + '.sk')),
+                         str(tmp_path / (part + '.hrt')) ],
+                       stdout = PIPE,
+                       stderr = PIPE,
+                       timeout = 5)
+            assert not proc.returncode
+            assert not proc.stderr
+
+        full = run([ tool, '--len', '--sum=h11',
+                     str(tmp_path / 'all.hrt') ],
+                   stdout = PIPE,
+                   stderr = PIPE,
+                   timeout = 5)
+        merged = run([ './hrt-stat-merge', '--sum=h11',
+                       str(tmp_path / ('one' + kind + '.sk')),
+                       str(tmp_path / ('two' + kind + '.sk')) ],
+                     stdout = PIPE,
+                     stderr = PIPE,
+                     timeout = 5)
+        assert not merged.returncode
+        assert not merged.stderr
+        assert merged.stdout
+        assert merged.stdout == full.stdout
+
+def test_002(tmp_path):
+    (tmp_path / 'one.hrt').write_text(_fragment(3), encoding = 'UTF-8')
+    for tool, name in (('./hrt-stat-meta', 'meta.sk'),
+                       ('./hrt-stat-data', 'data.sk')):
+        run([ tool, '--len', '--sum=sketch',
+              '--out', str(tmp_path / name),
+              str(tmp_path / 'one.hrt') ],
+            timeout = 5)
+
+    proc = run([ './hrt-stat-merge',
+                 str(tmp_path / 'meta.sk'),
+                 str(tmp_path / 'data.sk') ],
+               stdout = PIPE,
+               stderr = PIPE,
+               timeout = 5)
+    assert proc.returncode
+    assert b'meta and data sketches' in proc.stderr
@@ -11,6 +11,7 @@ empty line between sentences.
 '''
 
 from subprocess import run, PIPE
+import sys
 
 def test_001a():
     inf = b'\n'.join((b'<!-- #vrt positional-attributes: ref word -->',
@@ -350,3 +351,110 @@ def test_003d():
                     b'</text>',
                     b''))
     )
+
+def _many(count):
+    '''Return a VRT input of count sentences in alternating classes.'''
+    return b''.join((b'<!-- #vrt positional-attributes: ref word -->\n',
+                     b'<text>\n',
+                     *(b''.join((b'<sentence class="%s">\n'
+                                 % (b'one' if k % 3 else b'two'),
+                                 *(b'%d\tsana%dx%d\n' % (t + 1, k, t)
+                                   for t in range(1 + k % 5)),
+                                 b'</sentence>\n'))
+                       for k in range(count)),
+                     b'</text>\n'))
+
+def test_004a():
+    '''Many workers produce the same output as one.'''
+    inf = _many(1000)
+    one = run([ './vrt-test-pr1-data', '--word=word' ],
+              input = inf,
+              stdout = PIPE,
+              stderr = PIPE,
+              timeout = 5)
+    proc = run([ './vrt-test-pr1-data', '--word=word',
+                 '--workers=3', '--batch=7' ],
+               input = inf,
+               stdout = PIPE,
+               stderr = PIPE,
+               timeout = 5)
+    assert not proc.returncode
+    assert proc.stdout
+    assert not proc.stderr
+    assert proc.stdout == one.stdout
+
+def test_004b():
+    '''Many workers, with skipped sentences, produce the same output as
+    one.
+
+    '''
+    inf = _many(1000)
+    one = run([ './vrt-test-pr1-data', '--word=word', '--class=one' ],
+              input = inf,
+              stdout = PIPE,
+              stderr = PIPE,
+              timeout = 5)
+    proc = run([ './vrt-test-pr1-data', '--word=word', '--class=one',
+                 '--workers=4', '--batch=1' ],
+               input = inf,
+               stdout = PIPE,
+               stderr = PIPE,
+               timeout = 5)
+    assert not proc.returncode
+    assert proc.stdout
+    assert not proc.stderr
+    assert proc.stdout == one.stdout
+
+# run pr1 in a separate process with the implementation of
+# vrt-test-pr1-data but another external command, given as a shell
+# command line in argv[1] with environment variable N set to 3 for the
+# process and its copies
+_COMMAND = '''
+import os, sys
+from subprocess import Popen, PIPE
+from types import SimpleNamespace
+from libvrt.pr1 import transput
+import libvrt.tools.vrt_test_pr1 as imp
+env = dict(os.environ, N = '3')
+args = SimpleNamespace(word = b'word', todo = None,
+                       workers = int(sys.argv[2]), batch = 1)
+proc = Popen([ 'sh', '-c', sys.argv[1] ],
+             stdin = PIPE, stdout = PIPE, env = env)
+try:
+    transput(args, imp, proc, sys.stdin.buffer, sys.stdout.buffer,
+             env = env)
+except Exception as exn:
+    print('error:', exn, file = sys.stderr)
+    exit(1)
+'''
+
+def _command(shell, workers, inf):
+    return run([ sys.executable, '-c', _COMMAND, shell, str(workers) ],
+               input = inf,
+               stdout = PIPE,
+               stderr = PIPE,
+               timeout = 10)
+
+def test_004c():
+    '''A worker that ends its output early makes the tool fail rather
+    than wait forever.
+
+    '''
+    proc = _command('head -n 2 | cut -c -3', 2, _many(100))
+    assert proc.returncode
+    assert b'error: output of worker 1 ended early' in proc.stderr
+
+def test_004d():
+    '''Further workers are started in the same environment as the
+    first.
+
+    '''
+    inf = _many(100)
+    one = run([ './vrt-test-pr1-data', '--word=word' ],
+              input = inf,
+              stdout = PIPE,
+              stderr = PIPE,
+              timeout = 5)
+    proc = _command('cut -c -$N', 3, inf)
+    assert not proc.returncode
+    assert proc.stdout == one.stdout
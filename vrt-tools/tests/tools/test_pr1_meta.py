@@ -345,6 +345,30 @@ def test_003d():
                     b''))
     )
 
+def test_004():
+    '''Many workers produce the same output as one, including the
+    identifiers that count sentences in the order they are sent.
+
+    '''
+    with open(os.path.join(HERE, 'data', 'text-00.vrt'),
+              mode = 'br') as ins:
+        inf = ins.read()
+    one = run([ './vrt-test-pr1-meta', '--word=word' ],
+              input = inf,
+              stdout = PIPE,
+              stderr = PIPE,
+              timeout = 5)
+    proc = run([ './vrt-test-pr1-meta', '--word=word',
+                 '--workers=2', '--batch=1' ],
+               input = inf,
+               stdout = PIPE,
+               stderr = PIPE,
+               timeout = 5)
+    assert not proc.returncode
+    assert proc.stdout
+    assert not proc.stderr
+    assert proc.stdout == one.stdout
+
 def test_stderr_001():
     with open(os.path.join(HERE, 'data', 'text-00.vrt'),
               mode = 'br') as ins:
@@ -0,0 +1,47 @@
+# -*- mode: Python; -*-
+
+'''Test the lookup cache that vrt-tdp-alpha-lookup and fillup share.
+(The transducer itself is not available here, so a counting stand-in
+is used.)
+
+'''
+
+from libtdpalphalookup import Lookup, loadtable, maketable
+
+class Transducer:
+    def __init__(self):
+        self.looked = []
+
+    def lookup(self, form):
+        self.looked.append(form)
+        if form == 'xyz': return ()
+        return ((form + '<N><Sg><Nom>', 0.0), (form + '<A><Pos>', 1.5))
+
+def test_001():
+    '''Test that recent forms are not looked up again, and that the
+    least recent form is forgotten.'''
+
+    fst = Transducer()
+    cache = Lookup(fst, size = 2)
+    for form in ('talo', 'puu', 'talo', 'kivi', 'talo', 'puu'):
+        assert cache.lookup(form) == tuple(Transducer().lookup(form))
+    assert fst.looked == [ 'talo', 'puu', 'kivi', 'puu' ]
+
+def test_002(tmpdir):
+    '''Test that a table is loaded as made, including a form without
+    analyses, and used instead of the transducer.'''
+
+    table = tmpdir.join('table.tsv')
+    with open(str(table), mode = 'w', encoding = 'UTF-8') as ous:
+        maketable(Transducer(), ['talo', 'xyz'], ous)
+
+    assert loadtable(str(table)) == {
+        'talo' : tuple(Transducer().lookup('talo')),
+        'xyz' : ()
+    }
+
+    fst = Transducer()
+    cache = Lookup(fst, size = 0, table = str(table))
+    assert cache.lookup('xyz') == ()
+    assert cache.lookup('talo') == tuple(Transducer().lookup('talo'))
+    assert fst.looked == []
@@ -0,0 +1,90 @@
+# -*- mode: Python; -*-
+
+# Run hrt-udpipe and vrt-udpipe with tests/tools/bin/udpipe as a
+# stand-in for UDPipe, in place of the one that outsidelib would find
+# in a recognized environment, to check that batches and processes do
+# not change the output.
+
+import os, sys
+from subprocess import run
+
+UDPIPE = 'tests/tools/bin/udpipe'
+
+RUN = '''
+import runpy, sys, types
+outsidelib = types.ModuleType('outsidelib')
+outsidelib.UDPIPE = sys.argv[1]
+outsidelib.UDPIPEMODEL = 'model-{}'
+sys.modules['outsidelib'] = outsidelib
+sys.path.insert(0, '.')
+sys.argv = sys.argv[2:]
+runpy.run_path(sys.argv[0], run_name = '__main__')
+'''
+
+def udpipe(tool, *options, data, env = {}):
+    return run([ sys.executable, '-c', RUN, UDPIPE, tool, *options ],
+               input = data,
+               env = dict(os.environ, **env),
+               capture_output = True,
+               timeout = 20)
+
+TEXT = b''.join(
+    b'<paragraph id="%d">\n'
+    b'Tama on kappale %d.\n'
+    b'Se jatkuu tassa.\n'
+    b'</paragraph>\n' % (k, k)
+    for k in range(1, 21)
+) + b'Viimeinen rivi ilman rivinvaihtoa'
+
+def test_hrt_udpipe_processes():
+    base = udpipe('./hrt-udpipe', data = TEXT)
+    assert base.returncode == 0
+    assert b'\trivinvaihtoa\t' in base.stdout
+    assert base.stdout.count(b'<sentence>') == 21
+
+    for options in ([ '--processes', '3' ],
+                    [ '--processes', '2', '--batch-bytes', '50' ],
+                    [ '--processes', '4', '--batch-bytes', '0' ]):
+        proc = udpipe('./hrt-udpipe', *options, data = TEXT)
+        assert proc.returncode == 0, proc.stderr
+        assert proc.stdout == base.stdout
+
+def test_hrt_udpipe_processes_fail():
+    proc = udpipe('./hrt-udpipe', '--processes', '2',
+                  data = TEXT, env = dict(UDPIPE_MUTE = '1'))
+    assert proc.returncode != 0
+    assert b'ended before a text block' in proc.stderr
+
+VRT = b''.join((
+    b'<!-- #vrt positional-attributes: word -->\n',
+    *(b'<text id="%d">\n'
+      b'<sentence>\n'
+      b'Lause\n'
+      b'%d\n'
+      b'</sentence>\n'
+      b'<sentence>\n'
+      b'Toinen\n'
+      b'</sentence>\n'
+      b'</text>\n' % (k, k)
+      for k in range(1, 31))
+))
+
+def test_vrt_udpipe_batches():
+    base = udpipe('./vrt-udpipe', '--batch-bytes', '0', data = VRT)
+    assert base.returncode == 0
+    assert b'Lause\t1\tlause\tX\tx\t_\t0\troot\n' in base.stdout
+    assert base.stdout.count(b'<sentence>') == 60
+
+    for options in ([],
+                    [ '--batch-bytes', '100' ],
+                    [ '--batch-bytes', '1000000', '--batch-time', '0' ],
+                    [ '--processes', '3', '--batch-bytes', '100' ]):
+        proc = udpipe('./vrt-udpipe', *options, data = VRT)
+        assert proc.returncode == 0, proc.stderr
+        assert proc.stdout == base.stdout
+
+def test_udpipe_processes_zero():
+    for tool in ('./hrt-udpipe', './vrt-udpipe'):
+        proc = udpipe(tool, '--processes', '0', data = VRT)
+        assert proc.returncode == 2
+        assert b'bad number of processes' in proc.stderr
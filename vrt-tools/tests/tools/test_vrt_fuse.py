@@ -0,0 +1,81 @@
+from subprocess import Popen, PIPE
+
+from libvrt.nameline import makenameline
+
+from tests.tools import fake # sibling library module to provide fake data
+
+def test_000(tmpdir):
+    proc = Popen([ './vrt-fuse', '--help' ],
+                 stdin = None,
+                 stdout = PIPE,
+                 stderr = PIPE)
+    out, err = proc.communicate(timeout = 5)
+    assert out
+    assert not err
+    assert proc.returncode == 0
+
+def _run(*argv, send):
+    proc = Popen(argv,
+                 stdin = PIPE,
+                 stdout = PIPE,
+                 stderr = PIPE)
+    return (*proc.communicate(input = send, timeout = 5), proc.returncode)
+
+def test_001(tmpdir):
+    '''Test that fused stages write the same as piped tools, and tee
+    the same as the tools before it.'''
+
+    send = b''.join(fake.nameloop(120, b'word line loop'.split()))
+    tee = str(tmpdir.join('tee.vrt'))
+
+    out, err, status = _run('./vrt-fuse',
+                            '-s', 'vrt-rename -m line=lane',
+                            '-s', 'tee ' + tee,
+                            '-s', 'vrt-simple-tear',
+                            '-s', 'vrt-drop -f loop',
+                            '-s', 'vrt-keep -f word --rest',
+                            send = send)
+    assert not err
+    assert status == 0
+
+    want, _, _ = _run('./vrt-rename', '-m', 'line=lane', send = send)
+    assert open(tee, mode = 'br').read() == want
+    want, _, _ = _run('./vrt-simple-tear', send = want)
+    want, _, _ = _run('./vrt-drop', '-f', 'loop', send = want)
+    want, _, _ = _run('./vrt-keep', '-f', 'word', '--rest', send = want)
+    assert out == want
+
+def test_002(tmpdir):
+    '''Test that a failing stage is named.'''
+
+    send = makenameline(b'word line'.split()) + b'a\tb\n'
+    out, err, status = _run('./vrt-fuse',
+                            '-s', 'vrt-simple-mend',
+                            '-s', 'vrt-keep -f loop',
+                            send = send)
+    assert status == 1
+    assert b'vrt-keep: required loop' in err
+
+def test_003(tmpdir):
+    '''Test that ticks go to stdout, as in TDPipe, when the output goes
+    to a file, and to stderr when it goes to stdout.'''
+
+    send = b''.join(fake.nameloop(30, b'word line loop'.split()))
+    outf = str(tmpdir.join('out.vrt'))
+
+    out, err, status = _run('./vrt-fuse', '--tick', '-o', outf,
+                            '-s', 'vrt-drop -f loop',
+                            '-s', 'vrt-keep -f word',
+                            send = send)
+    assert status == 0
+    assert not err
+    ticks = [ line.split() for line in out.decode('UTF-8').splitlines() ]
+    assert all(tick[2::2][:3] == ['IN', 'OF', 'PAST'] for tick in ticks)
+    assert sorted(tick[-1] for tick in ticks) == ['vrt-drop', 'vrt-keep']
+
+    out, err, status = _run('./vrt-fuse', '--tick',
+                            '-s', 'vrt-keep -f word',
+                            send = send)
+    assert status == 0
+    assert open(outf, mode = 'br').read() == out
+    assert b' PAST vrt-keep\n' in err
@@ -85,3 +85,25 @@ def test_004(tmpdir):
     assert not err
     assert proc.returncode == 0
     assert out.decode() == want.decode()
+
+def test_005(tmpdir):
+    '''Test --mmap: same as reading a stream, even with blank lines
+    and no final newline.'''
+
+    old = b'word line loop'.split()
+    send = (b''.join(fake.nameloop(120, old)) +
+            b'\n  \n<s>\r\nx\ty\tz\r\n</s>')
+    infile = tmpdir.join('in.vrt')
+    infile.write_binary(send)
+    outs = []
+    for opts in ([], [ '--mmap' ]):
+        proc = Popen([ './vrt-keep', *[ '-f', 'loop,word' ], *opts, str(infile) ],
+                     stdin = None,
+                     stdout = PIPE,
+                     stderr = PIPE)
+        out, err = proc.communicate(timeout = 5)
+        assert not err
+        assert proc.returncode == 0
+        outs.append(out)
+    assert outs[0] == outs[1]
+    assert outs[0].endswith(b'\n</s>')